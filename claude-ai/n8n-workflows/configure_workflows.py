@@ -10,11 +10,16 @@ Usage:
 
 This script reads each workflow-*.json file, replaces placeholder database IDs
 with your actual values, and writes configured versions to the output directory.
+
+With --gateway-url, the Execute Command nodes are replaced by a single HTTP
+Request node that calls the long-running gateway (scripts/gateway.py), so no
+Python process is started per tool call.
 """
 
 import json
 import argparse
 import os
+import re
 from pathlib import Path
 import sys
 
@@ -30,7 +35,90 @@ def validate_database_id(db_id, name):
     return True
 
 
-def configure_workflow(input_file, notes_db, projects_db, output_dir, verbose=False):
+# Gateway endpoint for each script called by the workflows
+GATEWAY_ENDPOINTS = {
+    "search_notes": "search",
+    "read_note": "read",
+    "list_project_notes": "list",
+    "search_projects": "projects",
+    "create_note": "create",
+    "edit_note": "edit",
+    "archive_note": "archive",
+    "combine_notes": "combine",
+}
+
+
+def find_gateway_endpoint(workflow):
+    """Find the gateway endpoint matching the script a workflow runs."""
+    for node in workflow.get("nodes", []):
+        command = node.get("parameters", {}).get("command", "")
+        for script in re.findall(r"(\w+)\.py", command):
+            if script in GATEWAY_ENDPOINTS:
+                return GATEWAY_ENDPOINTS[script]
+    return None
+
+
+def to_gateway_workflow(workflow, gateway_url, gateway_token=None):
+    """
+    Rewrite a workflow to call the gateway instead of running a script.
+
+    The Webhook node is kept as-is (same path), and everything after it is
+    replaced by one HTTP Request node that forwards the webhook body.
+
+    Args:
+        workflow: Parsed workflow JSON
+        gateway_url: Base URL of the gateway (e.g. http://127.0.0.1:8765)
+        gateway_token: Optional value for the X-Gateway-Token header
+
+    Returns:
+        dict: The gateway variant, or None if the script isn't recognised
+    """
+    endpoint = find_gateway_endpoint(workflow)
+    webhook = next((n for n in workflow.get("nodes", [])
+                    if n.get("type") == "n8n-nodes-base.webhook"), None)
+    if endpoint is None or webhook is None:
+        return None
+
+    parameters = {
+        "method": "POST",
+        "url": f"{gateway_url.rstrip('/')}/{endpoint}",
+        "sendBody": True,
+        "specifyBody": "json",
+        "jsonBody": "={{ JSON.stringify($json.body) }}",
+        "options": {
+            # Script errors come back as 422 with the usual error envelope
+            "response": {"response": {"neverError": True}}
+        }
+    }
+    if gateway_token:
+        parameters["sendHeaders"] = True
+        parameters["headerParameters"] = {
+            "parameters": [{"name": "X-Gateway-Token", "value": gateway_token}]
+        }
+
+    x, y = webhook.get("position", [250, 300])
+    gateway_node = {
+        "parameters": parameters,
+        "id": f"gateway-{endpoint}",
+        "name": "Notion Gateway",
+        "type": "n8n-nodes-base.httpRequest",
+        "typeVersion": 4.2,
+        "position": [x + 220, y]
+    }
+
+    variant = dict(workflow)
+    variant["name"] = f"{workflow.get('name', 'Workflow')} (Gateway)"
+    variant["nodes"] = [webhook, gateway_node]
+    variant["connections"] = {
+        webhook["name"]: {
+            "main": [[{"node": "Notion Gateway", "type": "main", "index": 0}]]
+        }
+    }
+    return variant
+
+
+def configure_workflow(input_file, notes_db, projects_db, output_dir, verbose=False,
+                       gateway_url=None, gateway_token=None):
     """
     Configure a single workflow file.
 
@@ -40,6 +128,8 @@ def configure_workflow(input_file, notes_db, projects_db, output_dir, verbose=Fa
         projects_db: Projects database ID
         output_dir: Directory to write configured file
         verbose: Print detailed output
+        gateway_url: If set, emit the variant that calls the gateway
+        gateway_token: Optional X-Gateway-Token for the gateway variant
 
     Returns:
         dict with configuration result
@@ -93,6 +183,15 @@ def configure_workflow(input_file, notes_db, projects_db, output_dir, verbose=Fa
             "error": f"JSON error after replacement: {str(e)}"
         }
 
+    if gateway_url:
+        workflow = to_gateway_workflow(workflow, gateway_url, gateway_token)
+        if workflow is None:
+            return {
+                "file": input_file,
+                "success": False,
+                "error": "No gateway endpoint matches this workflow's script"
+            }
+
     # Create output directory if it doesn't exist
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
@@ -105,6 +204,8 @@ def configure_workflow(input_file, notes_db, projects_db, output_dir, verbose=Fa
 
         if verbose:
             print(f"  ✓ {Path(input_file).name}")
+            if gateway_url:
+                print(f"    - Calls gateway: {workflow['nodes'][1]['parameters']['url']}")
             if replacements["notes_db"] > 0:
                 print(f"    - Notes DB replaced in {replacements['notes_db']} locations")
             if replacements["projects_db"] > 0:
@@ -148,6 +249,14 @@ def main():
         default=".",
         help="Directory containing workflow JSON files (default: current directory)"
     )
+    parser.add_argument(
+        "--gateway-url",
+        help="Emit variants that call the gateway at this URL (e.g. http://127.0.0.1:8765)"
+    )
+    parser.add_argument(
+        "--gateway-token",
+        help="X-Gateway-Token to send to the gateway (if started with --token)"
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -187,7 +296,9 @@ def main():
             args.notes_db,
             args.projects_db,
             args.output_dir,
-            verbose=args.verbose
+            verbose=args.verbose,
+            gateway_url=args.gateway_url,
+            gateway_token=args.gateway_token
         )
         results.append(result)
 
@@ -208,6 +319,9 @@ def main():
         print(f"  2. Select all files from: {Path(args.output_dir).absolute()}/")
         print("  3. Click Import")
         print("  4. Test each workflow before activating\n")
+        if args.gateway_url:
+            print("🔌 These workflows call the gateway. Keep it running with:")
+            print("  python3 ~/.claude/scripts/notion/gateway.py --port <port>\n")
         return 0
     else:
         print(f"⚠️  Configured {successful} workflows, {failed} failed\n")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the markdown-to-blocks compiler.
+
+Converts synthetic markdown documents of growing size (default 1, 2, 4 and
+8 MB) and reports the conversion rate. The run fails (exit code 1) if the
+time per megabyte of the largest document exceeds that of the smallest by
+more than --tolerance, i.e. if conversion is not linear in the input size.
+
+Usage:
+    python3 bench_markdown.py
+    python3 bench_markdown.py --sizes 1 4 16 --repeat 5
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from markdown_blocks import parse_markdown_to_blocks
+
+WORDS = (
+    "project meeting notes roadmap budget review launch design research "
+    "customer feedback metrics hiring onboarding release backlog sprint"
+).split()
+
+def make_line(rng):
+    """Generate one markdown line with a realistic mix of syntax."""
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 20)))
+    kind = rng.random()
+    if kind < 0.05:
+        return f"## {text}"
+    if kind < 0.25:
+        return f"- {text} with **bold** and `code`"
+    if kind < 0.35:
+        return f"{rng.randint(1, 9)}. {text} see [docs](https://example.com/{rng.randint(1, 999)})"
+    if kind < 0.38:
+        return "---"
+    if kind < 0.40:
+        return f"```python\nprint('{text}')\n```"
+    if kind < 0.45:
+        return ""
+    return f"{text} with *emphasis* and a snake_case_word"
+
+def make_document(size_bytes, seed=0):
+    """Generate a markdown document of roughly size_bytes bytes."""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    while total < size_bytes:
+        line = make_line(rng)
+        lines.append(line)
+        total += len(line) + 1
+    return "\n".join(lines)
+
+def time_conversion(document, repeat):
+    """Return the best wall-clock time (seconds) of converting a document."""
+    best = None
+    blocks = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        blocks = len(parse_markdown_to_blocks(document))
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, blocks
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark markdown-to-blocks conversion")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 2, 4, 8],
+                        help="Document sizes in MB (default: 1 2 4 8)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size (best is kept)")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Allowed ratio of largest to smallest time per MB")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for size in sorted(args.sizes):
+        document = make_document(int(size * 1024 * 1024))
+        seconds, blocks = time_conversion(document, args.repeat)
+        results.append({
+            "size_mb": size,
+            "blocks": blocks,
+            "seconds": round(seconds, 4),
+            "mb_per_second": round(size / seconds, 2),
+            "seconds_per_mb": seconds / size
+        })
+
+    ratio = results[-1]["seconds_per_mb"] / results[0]["seconds_per_mb"]
+    linear = ratio <= args.tolerance
+
+    if args.json:
+        print(json.dumps({"results": results, "ratio": round(ratio, 3), "linear": linear}, indent=2))
+    else:
+        print(f"{'size (MB)':>10} {'blocks':>9} {'seconds':>9} {'MB/s':>8}")
+        for r in results:
+            print(f"{r['size_mb']:>10} {r['blocks']:>9} {r['seconds']:>9} {r['mb_per_second']:>8}")
+        verdict = "linear" if linear else "NOT linear"
+        print(f"\nTime per MB, largest vs smallest: {ratio:.2f}x ({verdict}, tolerance {args.tolerance}x)")
+
+    return 0 if linear else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
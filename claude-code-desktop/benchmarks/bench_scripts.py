@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark for the skill scripts.
+
+Starts the local fake Notion API (fake_notion.py) with a seeded synthetic
+workspace, runs each script operation as a subprocess against it, and
+reports the wall time and the number of API requests (and 429s) of each.
+Scripts run exactly as deployed; only the NOTION_SKILLS_* environment
+overrides point them at the fake server, a throwaway token file and a
+temporary cache directory.
+
+With --baseline, results are compared against a previous --save file and
+the run fails (exit code 1) if an operation makes more requests than
+before or takes more than --tolerance times as long, so regressions show
+up before deploy. The run also fails if any operation reports an error.
+
+Usage:
+    python3 bench_scripts.py
+    python3 bench_scripts.py --notes 300 --latency-ms 100 --rate 3
+    python3 bench_scripts.py --save baseline.json
+    python3 bench_scripts.py --baseline baseline.json --only read export
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from urllib.request import Request, urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_notion import create_server
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+
+# Fixed IDs, so request counts per endpoint group the same way on every run
+NOTES_DB_ID = str(uuid.uuid5(uuid.NAMESPACE_URL, "fake-notion/notes"))
+PROJECTS_DB_ID = str(uuid.uuid5(uuid.NAMESPACE_URL, "fake-notion/projects"))
+
+# Notes used by the operations that change them
+COMBINED_NOTES = 10
+IMPORTED_NOTES = 20
+
+# Top-level blocks added to the note read by the summary and outline operations
+LONG_NOTE_BLOCKS = 2000
+
+def make_markdown(blocks, label="Section"):
+    """Generate a markdown document of roughly the given number of blocks."""
+    lines = []
+    for i in range(blocks):
+        if i % 10 == 0:
+            lines.append(f"## {label} {i // 10 + 1}")
+        elif i % 3 == 0:
+            lines.append(f"- item {i} with **bold** text and `code`")
+        else:
+            lines.append(f"Paragraph {i} of the benchmark note, with a [link](https://example.com/{i}).")
+    return "\n".join(lines)
+
+def write_file(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return path
+
+def add_long_content(workspace, note_id, blocks):
+    """Append blocks of meeting-log-like content to a note, 100 at a time."""
+    lines = make_markdown(blocks, "Meeting").split("\n")
+    for i in range(0, len(lines), 100):
+        children = []
+        for line in lines[i:i + 100]:
+            block_type = "heading_2" if line.startswith("## ") else "paragraph"
+            text = line[3:] if block_type == "heading_2" else line
+            children.append({"type": block_type, block_type: {"rich_text": [{"type": "text", "text": {"content": text}}]}})
+        workspace.append_children(note_id, {"children": children})
+
+def note_ids(workspace):
+    """Get the IDs of unarchived notes, in seed order."""
+    return [pid for pid in workspace.databases[workspace.notes_db_id]
+            if not workspace.pages[pid]['properties']['Archived']['checkbox']]
+
+def build_operations(workspace, workdir):
+    """
+    Build the benchmarked operations against a seeded workspace.
+
+    Operations that change notes each get their own, so the order of the
+    list doesn't change what the others measure.
+
+    Args:
+        workspace: fake_notion.Workspace
+        workdir: Directory for content files and outputs
+
+    Returns:
+        list: (name, script, args) tuples, or (name, script, args, env) with
+              environment overrides for that operation
+    """
+    notes = note_ids(workspace)
+    projects = workspace.databases[workspace.projects_db_id]
+    if len(notes) < COMBINED_NOTES + 6 or not projects:
+        raise ValueError(f"The workspace needs at least {COMBINED_NOTES + 6} notes and one project")
+
+    read_id, append_id, replace_id, archive_id = notes[:4]
+    # Misspelled, so it is resolved by similarity rather than exact title
+    read_title = "".join(rt['plain_text'] for rt in workspace.pages[read_id]['properties']['Name']['title'])
+    misspelled_title = read_title[:2] + read_title[3:]
+    combined = notes[4:4 + COMBINED_NOTES]
+    long_id = notes[4 + COMBINED_NOTES]
+    add_long_content(workspace, long_id, LONG_NOTE_BLOCKS)
+    project = workspace.pages[projects[0]]
+    project_name = "".join(rt['plain_text'] for rt in project['properties']['Name']['title'])
+
+    # A cache directory below a regular file can never be created
+    unusable_cache = {"NOTION_SKILLS_CACHE_DIR": os.path.join(write_file(os.path.join(workdir, "not-a-dir"), ""), "cache")}
+
+    large_file = write_file(os.path.join(workdir, "large.md"), make_markdown(1000))
+    small_file = write_file(os.path.join(workdir, "small.md"), make_markdown(20, "Added"))
+    import_dir = os.path.join(workdir, "import")
+    os.makedirs(import_dir, exist_ok=True)
+    for i in range(IMPORTED_NOTES):
+        write_file(os.path.join(import_dir, f"Imported note {i + 1}.md"), make_markdown(150))
+    export_dir = os.path.join(workdir, "export")
+
+    return [
+        ("search", "search_notes.py", ["--query", "roadmap"]),
+        ("search projects", "search_projects.py", ["--name", project_name]),
+        ("list project notes", "list_project_notes.py", ["--project-id", project['id']]),
+        ("read (cold)", "read_note.py", ["--id", read_id]),
+        ("read (cached)", "read_note.py", ["--id", read_id]),
+        # The cache directory can't be created: reads must still succeed from the API
+        ("read (unusable cache)", "read_note.py", ["--id", read_id, "--format", "summary"], unusable_cache),
+        (f"read summary ({LONG_NOTE_BLOCKS} blocks)", "read_note.py",
+         ["--id", long_id, "--format", "summary", "--no-cache"]),
+        (f"read outline ({LONG_NOTE_BLOCKS} blocks)", "read_note.py",
+         ["--id", long_id, "--format", "outline", "--no-cache"]),
+        (f"read {COMBINED_NOTES} (batch)", "read_note.py", ["--id", *combined, "--format", "summary"]),
+        ("create 1000 blocks", "create_note.py", ["--title", "Benchmark note", "--content-file", large_file]),
+        ("edit append", "edit_note.py", ["--id", append_id, "--action", "append", "--content-file", small_file]),
+        ("edit replace", "edit_note.py", ["--id", replace_id, "--action", "replace", "--content-file", small_file]),
+        ("archive", "archive_note.py", ["--id", archive_id]),
+        ("archive bulk (dry run)", "archive_note.py", ["--bulk", "--project-id", project['id'], "--dry-run"]),
+        (f"combine {COMBINED_NOTES}", "combine_notes.py",
+         ["--source-ids", *combined, "--create-new", "Benchmark combined", "--no-archive"]),
+        ("export (full)", "export_notes.py", [export_dir]),
+        ("export (incremental)", "export_notes.py", [export_dir]),
+        (f"import {IMPORTED_NOTES}", "import_notes.py", [import_dir]),
+        ("mirror sync", "sync_mirror.py", ["--full"]),
+        ("search (mirror)", "search_notes.py", ["--query", "roadmap", "--local"]),
+        ("read by name (mirror)", "read_note.py", ["--name", misspelled_title]),
+        # No mirror can be opened: the name is looked up live
+        ("read by name (unusable cache)", "read_note.py", ["--name", read_title], unusable_cache),
+    ]
+
+def run_operation(name, script, args, env, base_url):
+    """
+    Run one script and measure it.
+
+    Returns:
+        dict: {"operation", "seconds", "requests", "throttled", "success", "error"}
+    """
+    post(f"{base_url}/_stats/reset")
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, os.path.join(SCRIPTS_DIR, script), *args],
+        env=env, capture_output=True, text=True
+    )
+    seconds = time.perf_counter() - start
+    stats = get(f"{base_url}/_stats")
+
+    try:
+        output = json.loads(process.stdout)
+    except ValueError:
+        output = {"success": False, "error": (process.stderr or process.stdout).strip()[-500:]}
+
+    return {
+        "operation": name,
+        "seconds": round(seconds, 3),
+        "requests": stats['requests'],
+        "throttled": stats['throttled'],
+        "by_endpoint": stats['by_endpoint'],
+        "success": bool(output.get('success')) and process.returncode == 0,
+        "error": output.get('error')
+    }
+
+def get(url):
+    with urlopen(url) as response:
+        return json.loads(response.read())
+
+def post(url):
+    with urlopen(Request(url, data=b'', method='POST')) as response:
+        return json.loads(response.read())
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results with a baseline run.
+
+    Returns:
+        list: Regression messages (empty if none)
+    """
+    previous = {r['operation']: r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        before = previous.get(result['operation'])
+        if not before:
+            continue
+        result['baseline_seconds'] = before['seconds']
+        result['baseline_requests'] = before['requests']
+        if result['requests'] > before['requests']:
+            regressions.append(f"{result['operation']}: {before['requests']} -> {result['requests']} requests")
+        if result['seconds'] > before['seconds'] * tolerance:
+            regressions.append(f"{result['operation']}: {before['seconds']}s -> {result['seconds']}s")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the skill scripts against a local fake Notion API")
+    parser.add_argument("--notes", type=int, default=100, help="Notes in the synthetic workspace")
+    parser.add_argument("--projects", type=int, default=10, help="Projects in the synthetic workspace")
+    parser.add_argument("--blocks", type=int, default=30, help="Blocks per note")
+    parser.add_argument("--latency-ms", type=float, default=50, help="Simulated latency per request")
+    parser.add_argument("--rate", type=float, default=0,
+                        help="Server rate limit in requests/second, answered with 429 (0 = none)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--client-rate", type=float, default=None,
+                        help="Override the scripts' rate limit (default: the real 3 requests/second)")
+    parser.add_argument("--only", nargs="+", help="Run only operations whose name starts with one of these")
+    parser.add_argument("--save", help="Write the results to this file, for use as a baseline")
+    parser.add_argument("--baseline", help="Compare against a file written with --save")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Allowed ratio of wall time to the baseline's")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    server, workspace, _ = create_server(
+        notes_db_id=NOTES_DB_ID, projects_db_id=PROJECTS_DB_ID,
+        projects=args.projects, notes=args.notes, blocks=args.blocks,
+        latency_ms=args.latency_ms, rate=args.rate, error_rate=args.error_rate
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-scripts-") as workdir:
+        env = dict(
+            os.environ,
+            NOTION_SKILLS_BASE_URL=f"{base_url}/v1",
+            NOTION_SKILLS_CONFIG_FILE=write_file(os.path.join(workdir, "env.conf"), "NOTION_TOKEN=fake\n"),
+            NOTION_SKILLS_CACHE_DIR=os.path.join(workdir, "cache"),
+            NOTION_SKILLS_NOTES_DB_ID=NOTES_DB_ID,
+            NOTION_SKILLS_PROJECTS_DB_ID=PROJECTS_DB_ID
+        )
+        if args.client_rate:
+            env["NOTION_SKILLS_RATE_LIMIT"] = str(args.client_rate)
+
+        for name, script, script_args, *overrides in build_operations(workspace, workdir):
+            if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                continue
+            op_env = dict(env, **overrides[0]) if overrides else env
+            results.append(run_operation(name, script, script_args, op_env, base_url))
+
+    server.shutdown()
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+    failed = [r['operation'] for r in results if not r['success']]
+
+    settings = {k: getattr(args, k) for k in ("notes", "projects", "blocks", "latency_ms", "rate",
+                                              "error_rate", "client_rate")}
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+
+    if args.json:
+        print(json.dumps({"settings": settings, "results": results,
+                          "failed": failed, "regressions": regressions}, indent=2))
+    else:
+        print(f"{'operation':<24} {'seconds':>9} {'requests':>9} {'429s':>6}  baseline")
+        for r in results:
+            baseline = ""
+            if 'baseline_seconds' in r:
+                baseline = f"{r['baseline_seconds']}s / {r['baseline_requests']} requests"
+            status = "" if r['success'] else f"  FAILED: {r['error']}"
+            print(f"{r['operation']:<24} {r['seconds']:>9} {r['requests']:>9} {r['throttled']:>6}  {baseline}{status}")
+        for message in regressions:
+            print(f"Regression: {message}")
+
+    return 1 if failed or regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark for the skill scripts.
+
+Every skill invocation starts a fresh Python process, so the time spent
+importing a script and its modules is paid on every call. This runs
+`python -X importtime -c "import <script>"` for each entry point in
+scripts/, keeps the fastest of --repeat runs and reports the script's
+cumulative import time (interpreter startup and site packages excluded)
+with its most expensive imports.
+
+The run fails (exit code 1) if a script takes longer to import than its
+budget (--budget-ms, with a larger allowance for the long-running gateway),
+if it imports a module that must only be loaded on first use or on one path
+(LAZY_MODULES, SCRIPT_LAZY_MODULES), or, with --baseline, if it takes more
+than --tolerance times as long as in a previous --save file.
+
+Usage:
+    python3 bench_startup.py
+    python3 bench_startup.py --only read_note search_notes --top 10
+    python3 bench_startup.py --save startup.json
+    python3 bench_startup.py --baseline startup.json --budget-ms 30
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts")
+
+# Cumulative import time allowed per script
+DEFAULT_BUDGET_MS = 50
+
+# Scripts that start once and keep running get a larger allowance
+BUDGET_OVERRIDES_MS = {"gateway": 150}
+
+# Modules the scripts load only when they are first needed: the HTTP
+# transport (common.get_transport), the thread pool (common.map_concurrent)
+# and the block differ (blocks.diff_blocks)
+LAZY_MODULES = ("requests", "urllib3", "concurrent.futures", "difflib")
+
+# Modules a script loads only on one of its paths: the local mirror (and
+# SQLite) is only needed for --local
+SCRIPT_LAZY_MODULES = {
+    "search_notes": ("mirror", "sqlite3"),
+    "list_project_notes": ("mirror", "sqlite3"),
+    "search_projects": ("mirror", "sqlite3"),
+}
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s*\|\s*(\d+)\s*\| (\s*)(\S+)\s*$')
+
+def entry_points():
+    """Get the module names of the scripts that can be run directly."""
+    names = []
+    for filename in sorted(os.listdir(SCRIPTS_DIR)):
+        if not filename.endswith(".py"):
+            continue
+        with open(os.path.join(SCRIPTS_DIR, filename), encoding='utf-8') as f:
+            if 'if __name__ == "__main__":' in f.read():
+                names.append(filename[:-3])
+    return names
+
+def parse_importtime(output, module):
+    """
+    Extract a module's import tree from `python -X importtime` output.
+
+    Args:
+        output: stderr of the interpreter
+        module: Top-level module that was imported
+
+    Returns:
+        tuple: (cumulative microseconds, [(self microseconds, name)]) for
+               the module and everything it imported
+    """
+    imports = []
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        if not indent:
+            # Top-level imports before the script (encodings, site, ...)
+            if name == module:
+                imports.append((int(self_us), name))
+                return int(cumulative_us), imports
+            imports = []
+            continue
+        imports.append((int(self_us), name))
+    raise ValueError(f"{module} does not appear in the import time output")
+
+def measure(module, repeat):
+    """
+    Import a script in fresh interpreters and keep the fastest run.
+
+    The first run also writes the bytecode cache, as the deployed scripts
+    have one after their first call.
+
+    Returns:
+        dict: {"script", "import_ms", "top", "modules"}
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+
+    best = None
+    for _ in range(repeat + 1):
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=SCRIPTS_DIR, env=env, capture_output=True, text=True
+        )
+        if process.returncode != 0:
+            raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip() else
+                               f"exit code {process.returncode}")
+        run = parse_importtime(process.stderr, module)
+        if best is None or run[0] < best[0]:
+            best = run
+
+    cumulative_us, imports = best
+    return {
+        "script": module,
+        "import_ms": round(cumulative_us / 1000, 1),
+        "top": [{"module": name, "self_ms": round(us / 1000, 1)}
+                for us, name in sorted(imports, reverse=True)],
+        "modules": sorted({name for _, name in imports})
+    }
+
+def check(result, budget_ms, baseline, tolerance):
+    """
+    Check one script's result against its budget, the lazy modules and a baseline.
+
+    Returns:
+        list: Failure messages (empty if none)
+    """
+    failures = []
+    budget = BUDGET_OVERRIDES_MS.get(result['script'], budget_ms)
+    result['budget_ms'] = budget
+    if result['import_ms'] > budget:
+        failures.append(f"{result['script']}: {result['import_ms']} ms over the {budget} ms budget")
+
+    lazy = LAZY_MODULES + SCRIPT_LAZY_MODULES.get(result['script'], ())
+    eager = [m for m in result['modules'] if m in lazy or m.split('.')[0] in lazy]
+    if eager:
+        failures.append(f"{result['script']}: imports {', '.join(eager)} at startup")
+
+    before = baseline.get(result['script'])
+    if before:
+        result['baseline_ms'] = before['import_ms']
+        if result['import_ms'] > before['import_ms'] * tolerance:
+            failures.append(f"{result['script']}: {before['import_ms']} ms -> {result['import_ms']} ms")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure and budget the import time of the skill scripts")
+    parser.add_argument("--only", nargs="+", help="Measure only these scripts (module names)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per script; the fastest is kept")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Allowed import time per script (default: {DEFAULT_BUDGET_MS})")
+    parser.add_argument("--top", type=int, default=5, help="Most expensive imports to list per script")
+    parser.add_argument("--save", help="Write the results to this file, for use as a baseline")
+    parser.add_argument("--baseline", help="Compare against a file written with --save")
+    parser.add_argument("--tolerance", type=float, default=1.5,
+                        help="Allowed ratio of import time to the baseline's")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = {r['script']: r for r in json.load(f).get('results', [])}
+
+    results = []
+    failures = []
+    for module in args.only or entry_points():
+        try:
+            result = measure(module, max(1, args.repeat))
+        except (RuntimeError, ValueError) as e:
+            failures.append(f"{module}: failed to import: {e}")
+            continue
+        failures.extend(check(result, args.budget_ms, baseline, args.tolerance))
+        result['top'] = result['top'][:args.top]
+        del result['modules']
+        results.append(result)
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+
+    if args.json:
+        print(json.dumps({"python": sys.version.split()[0], "results": results, "failures": failures}, indent=2))
+    else:
+        print(f"{'script':<20} {'import ms':>10} {'budget':>7} {'baseline':>9}  slowest imports (self ms)")
+        for r in results:
+            slowest = ", ".join(f"{t['module']} {t['self_ms']}" for t in r['top'])
+            print(f"{r['script']:<20} {r['import_ms']:>10} {r['budget_ms']:>7g} {r.get('baseline_ms', ''):>9}  {slowest}")
+        for message in failures:
+            print(f"Failed: {message}")
+
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
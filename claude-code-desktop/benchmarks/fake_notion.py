@@ -0,0 +1,599 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the parts of the Notion API the skill scripts use.
+
+Serves an in-memory workspace with a Notes and a Projects database:
+- POST   /v1/databases/{id}/query       (title/relation/checkbox/timestamp
+                                          filters, and/or, sorts, cursors)
+- GET    /v1/pages/{id}
+- POST   /v1/pages
+- PATCH  /v1/pages/{id}
+- GET    /v1/blocks/{id}/children       (cursors, page_size)
+- PATCH  /v1/blocks/{id}/children       (append, optional "after")
+- PATCH  /v1/blocks/{id}
+- DELETE /v1/blocks/{id}
+
+Simulated latency and 429 responses make it usable for benchmarks.
+Request counters are exposed at GET /_stats and reset with POST /_stats/reset.
+
+Usage:
+    python3 fake_notion.py --port 8799 --notes 500 --projects 20 --blocks 40
+
+    # In another shell, point the scripts at it:
+    export NOTION_SKILLS_BASE_URL=http://127.0.0.1:8799/v1
+    export NOTION_SKILLS_CONFIG_FILE=/path/to/env.conf   # any NOTION_TOKEN=...
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from common import NOTES_DB_ID, PROJECTS_DB_ID
+
+MAX_PAGE_SIZE = 100
+MAX_CHILDREN = 100
+
+RICH_TEXT_TYPES = (
+    'paragraph', 'heading_1', 'heading_2', 'heading_3',
+    'bulleted_list_item', 'numbered_list_item', 'to_do',
+    'toggle', 'quote', 'callout', 'code'
+)
+
+WORDS = (
+    "alpha beta gamma delta meeting notes project roadmap budget review "
+    "design research draft idea plan weekly retro launch customer feedback "
+    "migration backlog sprint release metrics hiring onboarding summary"
+).split()
+
+def _iso(dt):
+    """Format a datetime the way Notion does (minute precision)."""
+    return dt.replace(second=0, microsecond=0).strftime("%Y-%m-%dT%H:%M:00.000Z")
+
+def _now():
+    return datetime.now(timezone.utc)
+
+def _rich_text(content):
+    return [{
+        "type": "text",
+        "text": {"content": content, "link": None},
+        "annotations": {"bold": False, "italic": False, "strikethrough": False,
+                        "underline": False, "code": False, "color": "default"},
+        "plain_text": content,
+        "href": None
+    }]
+
+def _normalize_rich_text(rich_text):
+    """Fill in plain_text/annotations for rich text sent by a client."""
+    result = []
+    for rt in rich_text or []:
+        content = rt.get('text', {}).get('content', rt.get('plain_text', ''))
+        link = rt.get('text', {}).get('link')
+        annotations = {"bold": False, "italic": False, "strikethrough": False,
+                       "underline": False, "code": False, "color": "default"}
+        annotations.update(rt.get('annotations', {}))
+        result.append({
+            "type": "text",
+            "text": {"content": content, "link": link},
+            "annotations": annotations,
+            "plain_text": content,
+            "href": link.get('url') if link else None
+        })
+    return result
+
+class ApiError(Exception):
+    """An error response in Notion's error shape."""
+
+    def __init__(self, status, code, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.code = code
+        self.message = message
+        self.headers = headers or {}
+
+class Workspace:
+    """In-memory pages, databases and block trees."""
+
+    def __init__(self, notes_db_id, projects_db_id):
+        self.notes_db_id = notes_db_id
+        self.projects_db_id = projects_db_id
+        self.pages = {}
+        self.databases = {notes_db_id: [], projects_db_id: []}
+        self.blocks = {}
+        self.children = {}
+        self.block_owner = {}
+        self.lock = threading.RLock()
+
+    # ------------------------------------------------------------------
+    # Seeding
+    # ------------------------------------------------------------------
+
+    def seed(self, projects=10, notes=100, blocks=20, nested=0.1, seed=1):
+        """Generate a synthetic workspace of the requested size."""
+        rng = random.Random(seed)
+        base = _now() - timedelta(days=365)
+
+        project_ids = []
+        for i in range(projects):
+            name = f"Project {i + 1} {rng.choice(WORDS).title()}"
+            page = self._new_page(self.projects_db_id, name, base + timedelta(hours=i))
+            page['properties']['Status'] = {
+                "id": "status", "type": "status",
+                "status": {"name": rng.choice(["Planned", "Doing", "Done"])}
+            }
+            project_ids.append(page['id'])
+
+        for i in range(notes):
+            title = " ".join(rng.choice(WORDS) for _ in range(3)).title() + f" {i + 1}"
+            created = base + timedelta(minutes=30 * i)
+            page = self._new_page(self.notes_db_id, title, created)
+            if project_ids and rng.random() < 0.8:
+                page['properties']['Project']['relation'] = [{"id": rng.choice(project_ids)}]
+            if rng.random() < 0.1:
+                page['properties']['Archived']['checkbox'] = True
+            for j in range(blocks):
+                block = self._seed_block(rng, j)
+                if rng.random() < nested:
+                    block['type'] = 'toggle'
+                    block['toggle'] = {"rich_text": _rich_text(f"Toggle {j}")}
+                    block.pop('paragraph', None)
+                    block.pop('heading_2', None)
+                    block.pop('bulleted_list_item', None)
+                    block['toggle']['children'] = [self._seed_block(rng, k) for k in range(3)]
+                self._insert_children(page['id'], [block], None, page['id'])
+
+    def _seed_block(self, rng, index):
+        if index % 10 == 0:
+            block_type = 'heading_2'
+            text = f"Section {index // 10 + 1}"
+        elif rng.random() < 0.3:
+            block_type = 'bulleted_list_item'
+            text = " ".join(rng.choice(WORDS) for _ in range(6))
+        else:
+            block_type = 'paragraph'
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))
+        return {"object": "block", "type": block_type, block_type: {"rich_text": _rich_text(text)}}
+
+    def _new_page(self, database_id, title, created=None):
+        created = created or _now()
+        page_id = str(uuid.uuid4())
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": _iso(created),
+            "last_edited_time": _iso(created),
+            "archived": False,
+            "url": f"https://www.notion.so/{page_id.replace('-', '')}",
+            "parent": {"type": "database_id", "database_id": database_id},
+            "properties": {
+                "Name": {"id": "title", "type": "title", "title": _rich_text(title)},
+                "Archived": {"id": "archived", "type": "checkbox", "checkbox": False},
+                "Project": {"id": "project", "type": "relation", "relation": []}
+            }
+        }
+        self.pages[page_id] = page
+        self.databases.setdefault(database_id, []).append(page_id)
+        self.children[page_id] = []
+        return page
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _touch(self, page_id):
+        page = self.pages.get(page_id)
+        if page:
+            page['last_edited_time'] = _iso(_now())
+
+    def _insert_children(self, parent_id, new_blocks, after, owner_id, depth=0):
+        if depth > 2:
+            raise ApiError(400, "validation_error", "Block nesting is limited to 2 levels")
+        siblings = self.children.setdefault(parent_id, [])
+        position = len(siblings)
+        if after:
+            if after not in siblings:
+                raise ApiError(400, "validation_error", f"Block {after} is not a child of {parent_id}")
+            position = siblings.index(after) + 1
+        created = []
+        for raw in new_blocks:
+            block_type = raw.get('type')
+            if not block_type or block_type not in raw:
+                raise ApiError(400, "validation_error", "Block is missing its type payload")
+            content = json.loads(json.dumps(raw[block_type]))
+            nested = content.pop('children', None) or raw.get('children')
+            if 'rich_text' in content:
+                content['rich_text'] = _normalize_rich_text(content['rich_text'])
+                if any(len(rt['plain_text']) > 2000 for rt in content['rich_text']):
+                    raise ApiError(400, "validation_error", "Rich text content exceeds 2000 characters")
+            block = {
+                "object": "block",
+                "id": str(uuid.uuid4()),
+                "type": block_type,
+                block_type: content,
+                "has_children": False,
+                "archived": False,
+                "created_time": _iso(_now()),
+                "last_edited_time": _iso(_now())
+            }
+            self.blocks[block['id']] = block
+            self.block_owner[block['id']] = owner_id
+            self.children[block['id']] = []
+            siblings.insert(position, block['id'])
+            position += 1
+            if nested:
+                self._insert_children(block['id'], nested, None, owner_id, depth + 1)
+            created.append(block)
+        if parent_id in self.blocks and siblings:
+            self.blocks[parent_id]['has_children'] = True
+        return created
+
+    def _block_view(self, block_id):
+        block = self.blocks[block_id]
+        block['has_children'] = bool(self.children.get(block_id))
+        return block
+
+    def _paginate(self, ids, query):
+        start = int(query.get('start_cursor') or 0)
+        size = min(int(query.get('page_size') or MAX_PAGE_SIZE), MAX_PAGE_SIZE)
+        chunk = ids[start:start + size]
+        has_more = start + size < len(ids)
+        return chunk, has_more, (str(start + size) if has_more else None)
+
+    # ------------------------------------------------------------------
+    # Filters
+    # ------------------------------------------------------------------
+
+    def _matches(self, page, flt):
+        if not flt:
+            return True
+        if 'and' in flt:
+            return all(self._matches(page, f) for f in flt['and'])
+        if 'or' in flt:
+            return any(self._matches(page, f) for f in flt['or'])
+        if 'timestamp' in flt:
+            field = flt['timestamp']
+            return self._compare_date(page.get(field), flt.get(field, {}))
+        prop = page['properties'].get(flt.get('property'), {})
+        if 'title' in flt:
+            title = "".join(rt['plain_text'] for rt in prop.get('title', [])).lower()
+            cond = flt['title']
+            if 'contains' in cond:
+                return cond['contains'].lower() in title
+            if 'equals' in cond:
+                return cond['equals'].lower() == title
+            return True
+        if 'checkbox' in flt:
+            return bool(prop.get('checkbox')) == flt['checkbox'].get('equals')
+        if 'relation' in flt:
+            ids = [r['id'] for r in prop.get('relation', [])]
+            cond = flt['relation']
+            if 'contains' in cond:
+                return cond['contains'] in ids
+            if cond.get('is_empty'):
+                return not ids
+            return True
+        raise ApiError(400, "validation_error", f"Unsupported filter: {json.dumps(flt)}")
+
+    @staticmethod
+    def _compare_date(value, cond):
+        for op, bound in cond.items():
+            if op == 'on_or_after' and not value >= bound[:16]:
+                return False
+            if op == 'after' and not value > bound:
+                return False
+            if op == 'before' and not value < bound:
+                return False
+            if op == 'on_or_before' and not value[:16] <= bound[:16]:
+                return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    def query_database(self, database_id, body, query):
+        if database_id not in self.databases:
+            raise ApiError(404, "object_not_found", f"Could not find database with ID: {database_id}")
+        ids = [pid for pid in self.databases[database_id]
+               if not self.pages[pid]['archived'] and self._matches(self.pages[pid], body.get('filter'))]
+        for sort in reversed(body.get('sorts') or []):
+            key = sort.get('timestamp')
+            if key:
+                ids.sort(key=lambda pid: self.pages[pid][key],
+                         reverse=sort.get('direction') == 'descending')
+        chunk, has_more, cursor = self._paginate(ids, {
+            'start_cursor': body.get('start_cursor'),
+            'page_size': body.get('page_size')
+        })
+        return {"object": "list", "results": [self.pages[pid] for pid in chunk],
+                "has_more": has_more, "next_cursor": cursor}
+
+    def get_page(self, page_id):
+        if page_id not in self.pages:
+            raise ApiError(404, "object_not_found", f"Could not find page with ID: {page_id}")
+        return self.pages[page_id]
+
+    def create_page(self, body):
+        database_id = body.get('parent', {}).get('database_id')
+        if database_id not in self.databases:
+            raise ApiError(404, "object_not_found", f"Could not find database with ID: {database_id}")
+        children = body.get('children') or []
+        if len(children) > MAX_CHILDREN:
+            raise ApiError(400, "validation_error", "body.children.length should be ≤ 100")
+        title = "".join(rt.get('text', {}).get('content', '')
+                        for rt in body.get('properties', {}).get('Name', {}).get('title', []))
+        page = self._new_page(database_id, title)
+        self.update_page(page['id'], body)
+        self._insert_children(page['id'], children, None, page['id'])
+        return page
+
+    def update_page(self, page_id, body):
+        page = self.get_page(page_id)
+        for name, value in (body.get('properties') or {}).items():
+            prop = page['properties'].setdefault(name, {"id": name.lower()})
+            if 'checkbox' in value:
+                prop.update({"type": "checkbox", "checkbox": bool(value['checkbox'])})
+            elif 'title' in value:
+                prop.update({"type": "title", "title": _normalize_rich_text(value['title'])})
+            elif 'relation' in value:
+                prop.update({"type": "relation", "relation": [{"id": r['id']} for r in value['relation']]})
+            elif 'multi_select' in value:
+                prop.update({"type": "multi_select", "multi_select": value['multi_select']})
+        if 'archived' in body:
+            page['archived'] = bool(body['archived'])
+        self._touch(page_id)
+        return page
+
+    def list_children(self, block_id, query):
+        if block_id not in self.children:
+            raise ApiError(404, "object_not_found", f"Could not find block with ID: {block_id}")
+        chunk, has_more, cursor = self._paginate(self.children[block_id], query)
+        return {"object": "list", "results": [self._block_view(b) for b in chunk],
+                "has_more": has_more, "next_cursor": cursor}
+
+    def append_children(self, block_id, body):
+        if block_id not in self.children:
+            raise ApiError(404, "object_not_found", f"Could not find block with ID: {block_id}")
+        children = body.get('children') or []
+        if len(children) > MAX_CHILDREN:
+            raise ApiError(400, "validation_error", "body.children.length should be ≤ 100")
+        owner = self.block_owner.get(block_id, block_id)
+        created = self._insert_children(block_id, children, body.get('after'), owner)
+        self._touch(owner)
+        return {"object": "list", "results": created, "has_more": False, "next_cursor": None}
+
+    def update_block(self, block_id, body):
+        if block_id not in self.blocks:
+            raise ApiError(404, "object_not_found", f"Could not find block with ID: {block_id}")
+        block = self.blocks[block_id]
+        block_type = block['type']
+        if block_type in body:
+            content = body[block_type]
+            if 'rich_text' in content:
+                content = dict(content, rich_text=_normalize_rich_text(content['rich_text']))
+            block[block_type].update(content)
+        block['last_edited_time'] = _iso(_now())
+        self._touch(self.block_owner.get(block_id))
+        return block
+
+    def delete_block(self, block_id):
+        if block_id not in self.blocks:
+            raise ApiError(404, "object_not_found", f"Could not find block with ID: {block_id}")
+        block = self.blocks.pop(block_id)
+        for siblings in self.children.values():
+            if block_id in siblings:
+                siblings.remove(block_id)
+                break
+        block['archived'] = True
+        self._touch(self.block_owner.get(block_id))
+        return block
+
+    def route(self, method, path, query, body):
+        """Dispatch a request to the matching endpoint."""
+        parts = [p for p in path.split('/') if p]
+        if parts[:1] != ['v1']:
+            raise ApiError(404, "invalid_request_url", "Invalid request URL.")
+        parts = parts[1:]
+        with self.lock:
+            if method == 'POST' and len(parts) == 3 and parts[0] == 'databases' and parts[2] == 'query':
+                return self.query_database(parts[1], body, query)
+            if parts[:1] == ['pages']:
+                if method == 'POST' and len(parts) == 1:
+                    return self.create_page(body)
+                if method == 'GET' and len(parts) == 2:
+                    return self.get_page(parts[1])
+                if method == 'PATCH' and len(parts) == 2:
+                    return self.update_page(parts[1], body)
+            if parts[:1] == ['blocks']:
+                if len(parts) == 3 and parts[2] == 'children':
+                    if method == 'GET':
+                        return self.list_children(parts[1], query)
+                    if method == 'PATCH':
+                        return self.append_children(parts[1], body)
+                if len(parts) == 2:
+                    if method == 'PATCH':
+                        return self.update_block(parts[1], body)
+                    if method == 'DELETE':
+                        return self.delete_block(parts[1])
+        raise ApiError(400, "invalid_request_url", f"Unsupported endpoint: {method} {path}")
+
+class Stats:
+    """Thread-safe request counters."""
+
+    ID_PATTERN = re.compile(r'[0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{12}|YOUR_\w+')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = 0
+            self.throttled = 0
+            self.by_endpoint = {}
+
+    def record(self, method, path, throttled=False):
+        endpoint = f"{method} {self.ID_PATTERN.sub('{id}', path)}"
+        with self.lock:
+            self.requests += 1
+            self.throttled += int(throttled)
+            self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return {"requests": self.requests, "throttled": self.throttled,
+                    "by_endpoint": dict(self.by_endpoint)}
+
+class Throttle:
+    """Server-side token bucket that answers 429 when clients go too fast."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def allow(self):
+        if not self.rate:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+def make_handler(workspace, stats, throttle, latency, error_rate, token):
+    rng = random.Random()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, payload, headers=None):
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _handle(self, method):
+            parsed = urlparse(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            raw = self.rfile.read(length) if length else b''
+
+            if parsed.path == '/_stats':
+                return self._send(200, stats.snapshot())
+            if parsed.path == '/_stats/reset':
+                stats.reset()
+                return self._send(200, {"ok": True})
+
+            if latency:
+                time.sleep(latency)
+
+            if token and self.headers.get('Authorization') != f"Bearer {token}":
+                stats.record(method, parsed.path)
+                return self._send(401, {"object": "error", "status": 401, "code": "unauthorized",
+                                        "message": "API token is invalid."})
+
+            if not throttle.allow() or (error_rate and rng.random() < error_rate):
+                stats.record(method, parsed.path, throttled=True)
+                return self._send(429, {"object": "error", "status": 429, "code": "rate_limited",
+                                        "message": "You have been rate limited."},
+                                  {"Retry-After": "1"})
+
+            stats.record(method, parsed.path)
+            try:
+                body = json.loads(raw) if raw else {}
+                query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+                result = workspace.route(method, parsed.path, query, body)
+                self._send(200, result)
+            except ApiError as e:
+                self._send(e.status, {"object": "error", "status": e.status,
+                                      "code": e.code, "message": e.message}, e.headers)
+            except (ValueError, KeyError) as e:
+                self._send(400, {"object": "error", "status": 400,
+                                 "code": "invalid_json", "message": str(e)})
+
+        def do_GET(self):
+            self._handle('GET')
+
+        def do_POST(self):
+            self._handle('POST')
+
+        def do_PATCH(self):
+            self._handle('PATCH')
+
+        def do_DELETE(self):
+            self._handle('DELETE')
+
+    return Handler
+
+def create_server(port=0, notes_db_id=None, projects_db_id=None, projects=10, notes=100,
+                  blocks=20, nested=0.1, latency_ms=0, rate=0, burst=10, error_rate=0.0,
+                  token=None, seed=1):
+    """
+    Build a seeded fake Notion server (not yet serving).
+
+    Database IDs default to those of common.py (including the
+    NOTION_SKILLS_*_DB_ID overrides), so the scripts find their databases.
+
+    Returns:
+        tuple: (server, workspace, stats)
+    """
+    workspace = Workspace(notes_db_id or NOTES_DB_ID, projects_db_id or PROJECTS_DB_ID)
+    workspace.seed(projects=projects, notes=notes, blocks=blocks, nested=nested, seed=seed)
+    stats = Stats()
+    throttle = Throttle(rate, burst)
+    handler = make_handler(workspace, stats, throttle, latency_ms / 1000.0, error_rate, token)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server, workspace, stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local fake Notion API")
+    parser.add_argument("--port", type=int, default=8799, help="Port to listen on")
+    parser.add_argument("--notes", type=int, default=100, help="Number of notes to seed")
+    parser.add_argument("--projects", type=int, default=10, help="Number of projects to seed")
+    parser.add_argument("--blocks", type=int, default=20, help="Blocks per note")
+    parser.add_argument("--nested", type=float, default=0.1, help="Fraction of blocks that are toggles with children")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency per request")
+    parser.add_argument("--rate", type=float, default=0, help="Requests/second before answering 429 (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=10, help="Burst size for --rate")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--token", help="Require this bearer token")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the synthetic workspace")
+    args = parser.parse_args()
+
+    server, workspace, _ = create_server(
+        port=args.port, projects=args.projects, notes=args.notes, blocks=args.blocks,
+        nested=args.nested, latency_ms=args.latency_ms, rate=args.rate, burst=args.burst,
+        error_rate=args.error_rate, token=args.token, seed=args.seed
+    )
+    print(f"Fake Notion API on http://127.0.0.1:{server.server_address[1]}/v1 "
+          f"({len(workspace.pages)} pages, {len(workspace.blocks)} blocks)", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
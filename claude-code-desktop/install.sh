@@ -229,7 +229,7 @@ phase_verify_installation() {
 
     # Check Python scripts exist and are executable
     print_info "Checking Python scripts..."
-    for script in search_notes.py read_note.py list_project_notes.py create_note.py edit_note.py archive_note.py combine_notes.py search_projects.py common.py; do
+    for script in search_notes.py read_note.py list_project_notes.py create_note.py edit_note.py archive_note.py combine_notes.py search_projects.py projects.py notes.py blocks.py block_cache.py markdown_blocks.py mirror.py sync_mirror.py gateway.py import_notes.py import_keep.py export_notes.py metrics_report.py common.py; do
         if [ -f ~/.claude/scripts/notion/$script ]; then
             print_success "Found $script"
         else
@@ -4,103 +4,25 @@ Archive or unarchive a Notion note.
 
 This script toggles the Archived property (checkbox) for a note in the
 Ultimate Brain system.
+
+Bulk mode archives or unarchives many notes at once: either a list of IDs,
+or every note matching a filter (project, created/edited before a date,
+title pattern). Notes already in the target state are skipped, and the
+remaining updates run concurrently under the shared rate limiter.
 """
 
 import argparse
-import requests
+import fnmatch
+import re
 import sys
-import subprocess
-import json
+from datetime import datetime
 from common import (
-    NOTES_DB_ID, NOTION_BASE_URL, get_headers,
-    build_title_filter, build_project_filter, build_archived_filter, combine_filters,
-    output_success, output_error, extract_title
+    ApiError, NOTION_BASE_URL, api_request,
+    build_title_filter, build_project_filter, build_timestamp_filter, combine_filters,
+    output_success, output_error, extract_title, map_concurrent
 )
-
-def find_note_by_name(note_name, project_name=None, include_archived=False):
-    """
-    Find a note by name (and optionally by project).
-
-    Args:
-        note_name: Name of the note to find
-        project_name: Optional project name to limit search
-        include_archived: Whether to include archived notes in search
-
-    Returns:
-        tuple: (note_id, current_archived_status)
-    """
-    headers = get_headers()
-    title_filter = build_title_filter(note_name)
-
-    # If project name provided, resolve it first
-    project_id = None
-    if project_name:
-        import os
-        script_path = "/root/.claude/scripts/notion/search_projects.py"
-        if not os.path.exists(script_path):
-            fallback_paths = [
-                "/root/notion/scripts/skills/search_projects.py",
-                os.path.expanduser("~/.claude/scripts/notion/search_projects.py")
-            ]
-            for path in fallback_paths:
-                if os.path.exists(path):
-                    script_path = path
-                    break
-
-        try:
-            result = subprocess.run(
-                ["python3", script_path,
-                 "--name", project_name, "--limit", "1"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                if data['success']:
-                    project_id = data['data']['projects'][0]['id']
-        except:
-            pass
-
-    project_filter = build_project_filter(project_id) if project_id else None
-    archived_filter = build_archived_filter(include_archived=include_archived)
-    combined_filter = combine_filters(title_filter, archived_filter, project_filter)
-
-    body = {"page_size": 20}
-    if combined_filter:
-        body["filter"] = combined_filter
-
-    url = f"{NOTION_BASE_URL}/databases/{NOTES_DB_ID}/query"
-
-    try:
-        response = requests.post(url, headers=headers, json=body, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        output_error(f"API request failed: {str(e)}")
-
-    results = response.json().get('results', [])
-
-    if not results:
-        output_error(f"No notes found matching '{note_name}'")
-
-    # Check for exact match
-    exact_matches = [r for r in results if extract_title(r).lower() == note_name.lower()]
-    if exact_matches:
-        page = exact_matches[0]
-        archived_status = page.get('properties', {}).get('Archived', {}).get('checkbox', False)
-        return page['id'], archived_status
-
-    # If multiple matches, ask for clarification
-    if len(results) > 1:
-        matches = [extract_title(r) for r in results[:5]]
-        output_error(
-            f"Multiple notes match '{note_name}'. Please be more specific:",
-            {"matches": matches}
-        )
-
-    page = results[0]
-    archived_status = page.get('properties', {}).get('Archived', {}).get('checkbox', False)
-    return page['id'], archived_status
+from notes import NoteLookupError, find_note_by_name, is_archived, iter_notes, set_archived
+from projects import ProjectLookupError, resolve_project
 
 def get_note_archived_status(note_id):
     """
@@ -112,17 +34,15 @@ def get_note_archived_status(note_id):
     Returns:
         bool: Current archived status
     """
-    headers = get_headers()
     url = f"{NOTION_BASE_URL}/pages/{note_id}"
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = api_request("GET", url)
         response.raise_for_status()
-    except requests.exceptions.RequestException as e:
+    except ApiError as e:
         output_error(f"Failed to fetch note: {str(e)}")
 
-    page = response.json()
-    return page.get('properties', {}).get('Archived', {}).get('checkbox', False)
+    return is_archived(response.json())
 
 def archive_note(note_id=None, note_name=None, project_name=None, action="archive"):
     """
@@ -135,30 +55,30 @@ def archive_note(note_id=None, note_name=None, project_name=None, action="archiv
         action: "archive" or "unarchive"
     """
     # Resolve note name to ID if needed
-    current_archived_status = None
     if note_name and not note_id:
         # Include archived notes in search if we're trying to unarchive
         include_archived = (action == "unarchive")
-        note_id, current_archived_status = find_note_by_name(note_name, project_name, include_archived)
+        try:
+            note_id = find_note_by_name(note_name, project_name, include_archived)
+        except NoteLookupError as e:
+            output_error(e.message, e.details)
 
     if not note_id:
         output_error("Either --id or --name must be provided")
 
     # Get current status and note metadata
-    headers = get_headers()
     url = f"{NOTION_BASE_URL}/pages/{note_id}"
 
     try:
-        response = requests.get(url, headers=headers, timeout=10)
+        response = api_request("GET", url)
         response.raise_for_status()
-    except requests.exceptions.RequestException as e:
+    except ApiError as e:
         output_error(f"Failed to fetch note: {str(e)}")
 
     page = response.json()
     note_title = extract_title(page)
 
-    if current_archived_status is None:
-        current_archived_status = page.get('properties', {}).get('Archived', {}).get('checkbox', False)
+    current_archived_status = is_archived(page)
 
     # Determine new status
     if action == "archive":
@@ -181,18 +101,9 @@ def archive_note(note_id=None, note_name=None, project_name=None, action="archiv
         })
 
     # Update the archived property
-    update_data = {
-        "properties": {
-            "Archived": {
-                "checkbox": new_status
-            }
-        }
-    }
-
     try:
-        response = requests.patch(url, headers=headers, json=update_data, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
+        set_archived(note_id, new_status)
+    except ApiError as e:
         output_error(f"Failed to update note: {str(e)}")
 
     output_success({
@@ -206,20 +117,226 @@ def archive_note(note_id=None, note_name=None, project_name=None, action="archiv
         "message": f"Note successfully {'archived' if new_status else 'unarchived'}"
     })
 
+# ============================================================================
+# BULK MODE
+# ============================================================================
+
+def parse_date(value, option):
+    """
+    Validate an ISO 8601 date (or date-time) given on the command line.
+
+    Args:
+        value: Date string, e.g. "2024-06-30"
+        option: Option name for the error message
+
+    Returns:
+        str: The date, unchanged
+    """
+    try:
+        datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        output_error(f"Invalid date for {option}: '{value}'. Use YYYY-MM-DD.")
+    return value
+
+def title_pattern_filter(pattern):
+    """
+    Build the server-side part of a title glob pattern.
+
+    Notion can only filter titles with "contains", so the longest literal
+    run of the pattern is sent to narrow the query; the full pattern is
+    matched locally (see title_matches).
+
+    Args:
+        pattern: Glob pattern, e.g. "Meeting*2023*"
+
+    Returns:
+        dict: Filter object, or None if the pattern has no literal text
+    """
+    # A [...] class matches one character, so it splits literal runs like * does
+    literal = max(re.split(r'[*?]', re.sub(r'\[[^\]]*\]', '*', pattern)), key=len).strip()
+    return build_title_filter(literal) if literal else None
+
+def title_matches(page, pattern):
+    """Check a note title against a case-insensitive glob pattern."""
+    return fnmatch.fnmatchcase(extract_title(page).lower(), pattern.lower())
+
+def fetch_note(note_id):
+    """
+    Fetch a note page for bulk mode.
+
+    Returns:
+        tuple: (page object or None, error message or None)
+    """
+    try:
+        response = api_request("GET", f"{NOTION_BASE_URL}/pages/{note_id}")
+        response.raise_for_status()
+    except ApiError as e:
+        return None, f"Failed to fetch note: {str(e)}"
+    return response.json(), None
+
+def update_archived(note, archived):
+    """
+    Apply one bulk update and describe the outcome.
+
+    Args:
+        note: {"id", "name"} of the note
+        archived: New value of the Archived property
+
+    Returns:
+        dict: The note with "status" ("updated" or "failed") and any error
+    """
+    try:
+        set_archived(note['id'], archived)
+    except ApiError as e:
+        return dict(note, status="failed", error=str(e))
+    return dict(note, status="updated")
+
+def bulk_archive(note_ids=None, project_id=None, project_name=None,
+                 created_before=None, edited_before=None, title_pattern=None,
+                 action="archive", limit=None, dry_run=False):
+    """
+    Archive or unarchive many notes, by ID list or by filter.
+
+    With note_ids, each note is fetched (concurrently) to learn its current
+    state. Otherwise the Notes database is paged through with the filters
+    combined, restricted to notes not yet in the target state.
+
+    Args:
+        note_ids: List of note IDs
+        project_id: Only notes in this project
+        project_name: Only notes in this project (resolved to an ID)
+        created_before: Only notes created before this ISO date
+        edited_before: Only notes last edited before this ISO date
+        title_pattern: Only notes whose title matches this glob (case-insensitive)
+        action: "archive" or "unarchive"
+        limit: Maximum number of notes to update
+        dry_run: If True, report the matching notes without updating them
+    """
+    if action not in ("archive", "unarchive"):
+        output_error(f"Unknown action: {action}")
+    new_status = action == "archive"
+
+    filters_given = any([project_id, project_name, created_before, edited_before, title_pattern])
+    if note_ids and filters_given:
+        output_error("Use either --ids or filters, not both")
+    if not note_ids and not filters_given:
+        output_error("Bulk mode needs --ids or at least one filter "
+                     "(--project-name, --project-id, --created-before, --edited-before, --title-pattern)")
+
+    notes = []
+    unchanged = []
+
+    if note_ids:
+        note_ids = list(dict.fromkeys(note_ids))
+        for note_id, (page, error) in zip(note_ids, map_concurrent(fetch_note, note_ids)):
+            if error:
+                notes.append({"id": note_id, "name": None, "status": "failed", "error": error})
+            elif is_archived(page) == new_status:
+                unchanged.append({"id": note_id, "name": extract_title(page), "status": "no_change"})
+            else:
+                notes.append({"id": note_id, "name": extract_title(page)})
+    else:
+        if project_name and not project_id:
+            try:
+                project_id = resolve_project(project_name, include_archived=True)['id']
+            except ProjectLookupError as e:
+                output_error(e.message, e.details)
+
+        # Only query notes that still need the change
+        combined_filter = combine_filters(
+            build_project_filter(project_id) if project_id else None,
+            build_timestamp_filter("created_time", parse_date(created_before, "--created-before")) if created_before else None,
+            build_timestamp_filter("last_edited_time", parse_date(edited_before, "--edited-before")) if edited_before else None,
+            title_pattern_filter(title_pattern) if title_pattern else None,
+            {"property": "Archived", "checkbox": {"equals": not new_status}}
+        )
+
+        try:
+            for page in iter_notes(combined_filter):
+                if title_pattern and not title_matches(page, title_pattern):
+                    continue
+                notes.append({"id": page['id'], "name": extract_title(page)})
+                if limit and len(notes) >= limit:
+                    break
+        except ApiError as e:
+            output_error(f"API request failed: {str(e)}")
+
+    failed = [n for n in notes if n.get('status') == "failed"]
+    pending = [n for n in notes if 'status' not in n]
+    if limit:
+        pending = pending[:limit]
+
+    if dry_run:
+        results = [dict(n, status="would_update") for n in pending]
+    else:
+        results = map_concurrent(lambda note: update_archived(note, new_status), pending)
+
+    results = failed + results + unchanged
+    updated = sum(1 for r in results if r['status'] == "updated")
+    failures = sum(1 for r in results if r['status'] == "failed")
+
+    report = {
+        "action": action,
+        "mode": "bulk",
+        "dry_run": dry_run,
+        "matched": len(pending) + len(unchanged) + len(failed),
+        "updated": updated,
+        "unchanged": len(unchanged),
+        "failed": failures,
+        "notes": results
+    }
+
+    if failures and not updated and not dry_run:
+        output_error(f"Failed to {action} {failures} note(s)", report)
+
+    output_success(report)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
         description="Archive or unarchive a note in the Ultimate Brain system"
     )
     parser.add_argument("--id", help="Note ID to archive/unarchive")
     parser.add_argument("--name", help="Note name to search for")
-    parser.add_argument("--project-name", help="Optional project name for name search")
+    parser.add_argument("--project-name", help="Project name (narrows --name search, or selects notes with --bulk)")
     parser.add_argument("--action", choices=["archive", "unarchive"], default="archive",
                         help="Action to perform (default: archive)")
 
+    bulk = parser.add_argument_group("bulk mode")
+    bulk.add_argument("--bulk", action="store_true",
+                      help="Archive/unarchive every note matching the filters below")
+    bulk.add_argument("--ids", nargs='+', help="Note IDs to archive/unarchive (space-separated)")
+    bulk.add_argument("--project-id", help="Only notes in this project")
+    bulk.add_argument("--created-before", help="Only notes created before this date (YYYY-MM-DD)")
+    bulk.add_argument("--edited-before", help="Only notes last edited before this date (YYYY-MM-DD)")
+    bulk.add_argument("--title-pattern", help="Only notes whose title matches this glob, e.g. 'Standup*'")
+    bulk.add_argument("--limit", type=int, help="Maximum number of notes to update")
+    bulk.add_argument("--dry-run", action="store_true", help="List the matching notes without updating them")
+
     args = parser.parse_args()
 
+    has_filters = any([args.project_id, args.created_before, args.edited_before, args.title_pattern])
+    if args.bulk and (args.id or args.name):
+        output_error("--bulk can't be combined with --id or --name")
+    if has_filters and not args.bulk:
+        output_error("Filters select notes only in bulk mode: add --bulk (use --dry-run to preview)")
+
     if not args.id and not args.name:
-        output_error("Either --id or --name must be provided")
+        # Filters (including --project-name) select notes only with an explicit --bulk
+        if args.ids or args.bulk:
+            if args.bulk and not (has_filters or args.project_name or args.ids):
+                output_error("--bulk needs --ids or at least one filter")
+            bulk_archive(
+                note_ids=args.ids,
+                project_id=args.project_id,
+                project_name=args.project_name,
+                created_before=args.created_before,
+                edited_before=args.edited_before,
+                title_pattern=args.title_pattern,
+                action=args.action,
+                limit=args.limit,
+                dry_run=args.dry_run
+            )
+        output_error("Either --id, --name, --ids or --bulk with filters must be provided")
 
     archive_note(
         note_id=args.id,
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Persistent on-disk cache of note block trees.
+
+Block trees are stored per note (keyed on the undashed, lowercase ID, so
+both ID forms share an entry) together with the page's last_edited_time.
+read_note.py already fetches the page, so an unchanged note can be served
+from the cache without fetching any block children. The cache is a SQLite
+database in WAL mode, so the many short-lived processes n8n spawns can read
+and write it at the same time. Its total size is bounded by evicting the
+least recently used notes.
+
+Cache errors never fail a read: they are treated as a miss.
+"""
+
+import json
+import sqlite3
+import time
+
+from common import get_cache_path, is_fresh_since_edit, note_key, trace_phase
+
+BLOCK_CACHE_FILE = "blocks.sqlite3"
+
+# Total size (UTF-8 bytes) of cached block JSON before least-recently-used notes are evicted
+BLOCK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS block_trees (
+    note_id TEXT PRIMARY KEY,
+    last_edited_time TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL,
+    blocks TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_block_trees_accessed ON block_trees (accessed_at);
+"""
+
+def connect(path=None):
+    """
+    Open the block cache, creating the schema if needed.
+
+    Args:
+        path: Database path (defaults to BLOCK_CACHE_FILE in the cache directory)
+
+    Returns:
+        sqlite3.Connection
+    """
+    conn = sqlite3.connect(path or get_cache_path(BLOCK_CACHE_FILE), timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+@trace_phase("read block cache")
+def get_blocks(note_id, last_edited_time, path=None):
+    """
+    Get a note's cached block tree if it still matches the page.
+
+    A cached tree is used only if it was stored for the same last_edited_time
+    and fetched at least a minute after that edit (see is_fresh_since_edit).
+
+    Args:
+        note_id: Note ID
+        last_edited_time: The page's current last_edited_time
+        path: Optional database path
+
+    Returns:
+        list: Block tree as returned by fetch_block_tree, or None on a miss
+    """
+    note_id = note_key(note_id)
+    try:
+        conn = connect(path)
+        try:
+            row = conn.execute(
+                "SELECT last_edited_time, fetched_at, blocks FROM block_trees WHERE note_id = ?",
+                (note_id,)
+            ).fetchone()
+            if row is None or row[0] != last_edited_time or not is_fresh_since_edit(row[0], row[1]):
+                return None
+            with conn:
+                conn.execute(
+                    "UPDATE block_trees SET accessed_at = ? WHERE note_id = ?",
+                    (time.time(), note_id)
+                )
+            return json.loads(row[2])
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError, ValueError):
+        # OSError: the cache directory can't be created or opened
+        return None
+
+@trace_phase("write block cache")
+def put_blocks(note_id, last_edited_time, blocks, fetched_at, path=None,
+               max_bytes=BLOCK_CACHE_MAX_BYTES):
+    """
+    Store a note's block tree, evicting least-recently-used notes over the size bound.
+
+    Args:
+        note_id: Note ID
+        last_edited_time: The page's last_edited_time when the tree was fetched
+        blocks: Block tree as returned by fetch_block_tree
+        fetched_at: Epoch seconds when fetching started
+        path: Optional database path
+        max_bytes: Size bound for all cached trees, in UTF-8 bytes
+    """
+    data = json.dumps(blocks, ensure_ascii=False, separators=(',', ':'))
+    size = len(data.encode('utf-8'))
+    if size > max_bytes:
+        return
+
+    note_id = note_key(note_id)
+    try:
+        conn = connect(path)
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO block_trees "
+                    "(note_id, last_edited_time, fetched_at, accessed_at, size, blocks) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (note_id, last_edited_time, fetched_at, time.time(), size, data)
+                )
+                evict(conn, max_bytes)
+        finally:
+            conn.close()
+    except (sqlite3.Error, OSError):
+        pass
+
+def evict(conn, max_bytes=BLOCK_CACHE_MAX_BYTES):
+    """
+    Delete least-recently-used trees until the cache fits in max_bytes.
+
+    Args:
+        conn: Open cache connection (inside the caller's transaction)
+        max_bytes: Size bound for all cached trees, in UTF-8 bytes
+
+    Returns:
+        int: Number of trees evicted
+    """
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM block_trees").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+
+    evicted = []
+    for note_id, size in conn.execute("SELECT note_id, size FROM block_trees ORDER BY accessed_at"):
+        if total <= max_bytes:
+            break
+        evicted.append((note_id,))
+        total -= size
+    conn.executemany("DELETE FROM block_trees WHERE note_id = ?", evicted)
+    return len(evicted)
@@ -0,0 +1,597 @@
+#!/usr/bin/env python3
+"""
+Block content helpers shared by the Notion skill scripts.
+
+This module provides:
+- Paginated fetching of a block's children, eagerly or page by page
+- Concurrent fetching of whole block trees (nested toggles, lists, callouts),
+  or a lazy depth-first walk for readers that stop early
+- Concurrent deletion of a block's children
+- Minimal diffs between a block list and new content (update/insert/delete)
+- Pipelined appends of lazily produced blocks in 100-block batches
+- Plain-text and markdown rendering of block lists
+"""
+
+from common import (
+    ApiError, NOTION_BASE_URL, MAX_CONCURRENCY, api_request, extract_block_text,
+    map_concurrent, iter_in_background, trace_phase
+)
+
+# Blocks whose children are separate pages rather than part of the note
+CHILD_PAGE_TYPES = ("child_page", "child_database")
+
+# Block types whose content can be changed in place with PATCH /blocks/{id}
+UPDATABLE_TYPES = (
+    "paragraph", "heading_1", "heading_2", "heading_3",
+    "bulleted_list_item", "numbered_list_item", "to_do",
+    "toggle", "quote", "callout", "code"
+)
+
+# Block types that carry no content of their own
+EMPTY_TYPES = ("divider",)
+
+# Maximum number of blocks per append request
+APPEND_BATCH_SIZE = 100
+
+# Rich text annotations and their default values
+DEFAULT_ANNOTATIONS = (
+    ("bold", False), ("italic", False), ("strikethrough", False),
+    ("underline", False), ("code", False), ("color", "default")
+)
+
+# Markdown prefix for each block type in text renderings
+MARKDOWN_PREFIXES = {
+    "heading_1": "# ",
+    "heading_2": "## ",
+    "heading_3": "### ",
+    "bulleted_list_item": "- ",
+    "numbered_list_item": "1. ",
+    "quote": "> ",
+}
+
+def iter_block_children(block_id):
+    """
+    Iterate over the direct children of a block (or page), one page at a time.
+
+    The next page is requested only when the iteration reaches it, so a
+    caller that stops early doesn't pay for the rest of a long note.
+
+    Args:
+        block_id: Block or page ID
+
+    Yields:
+        dict: Block objects in document order
+
+    Raises:
+        ApiError: If an API request fails
+    """
+    url = f"{NOTION_BASE_URL}/blocks/{block_id}/children"
+    params = {"page_size": 100}
+
+    while True:
+        response = api_request("GET", url, params=params)
+        response.raise_for_status()
+        data = response.json()
+        yield from data.get('results', [])
+
+        if not data.get('has_more', False):
+            return
+        params["start_cursor"] = data.get('next_cursor')
+
+def fetch_block_children(block_id):
+    """
+    Fetch all direct children of a block (or page), following pagination.
+
+    Args:
+        block_id: Block or page ID
+
+    Returns:
+        list: Block objects in document order
+
+    Raises:
+        ApiError: If an API request fails
+    """
+    return list(iter_block_children(block_id))
+
+def has_nested_blocks(block):
+    """Check whether a block has children that belong to the note's content."""
+    return block.get('has_children', False) and block.get('type') not in CHILD_PAGE_TYPES
+
+@trace_phase("fetch blocks")
+def fetch_block_tree(block_id, max_workers=MAX_CONCURRENCY):
+    """
+    Fetch a block's children and all of their descendants.
+
+    The tree is fetched one level at a time: every block with children at a
+    given depth is expanded concurrently, so a note loads in one wave per
+    nesting level. Each expanded block gets a "children" list in document order.
+
+    Args:
+        block_id: Block or page ID
+        max_workers: Maximum number of child fetches in flight
+
+    Returns:
+        list: Top-level block objects, with nested "children"
+
+    Raises:
+        ApiError: If an API request fails
+    """
+    blocks = fetch_block_children(block_id)
+    wave = [b for b in blocks if has_nested_blocks(b)]
+
+    while wave:
+        children = map_concurrent(fetch_block_children, [b['id'] for b in wave], max_workers)
+        next_wave = []
+        for block, block_children in zip(wave, children):
+            block['children'] = block_children
+            next_wave.extend(c for c in block_children if has_nested_blocks(c))
+        wave = next_wave
+
+    return blocks
+
+def walk_block_tree(block_id):
+    """
+    Walk a block's descendants depth-first in document order, fetching lazily.
+
+    Yields the same blocks in the same order as
+    iter_blocks(fetch_block_tree(block_id)), but children are fetched one
+    request at a time as the walk reaches them.
+
+    Args:
+        block_id: Block or page ID
+
+    Yields:
+        dict: Each block object (without "children")
+
+    Raises:
+        ApiError: If an API request fails
+    """
+    for block in iter_block_children(block_id):
+        yield block
+        if has_nested_blocks(block):
+            yield from walk_block_tree(block['id'])
+
+def delete_block(block_id):
+    """
+    Delete (archive) one block, along with its children.
+
+    Args:
+        block_id: Block ID
+
+    Returns:
+        str: Error message, or None if the block was deleted
+    """
+    try:
+        response = api_request("DELETE", f"{NOTION_BASE_URL}/blocks/{block_id}")
+        response.raise_for_status()
+    except ApiError as e:
+        return f"{block_id}: {str(e)}"
+    return None
+
+def delete_blocks(block_ids, max_workers=MAX_CONCURRENCY):
+    """
+    Delete blocks with bounded concurrency under the shared rate limiter.
+
+    Args:
+        block_ids: Block IDs to delete
+        max_workers: Maximum number of deletes in flight
+
+    Returns:
+        tuple: (number of blocks deleted, list of error messages)
+    """
+    results = map_concurrent(delete_block, block_ids, max_workers)
+    errors = [error for error in results if error]
+    return len(results) - len(errors), errors
+
+@trace_phase("clear blocks")
+def clear_block_children(block_id, max_workers=MAX_CONCURRENCY):
+    """
+    Delete every child of a block (or page), following pagination.
+
+    Only top-level children are deleted; nested blocks go with their parent.
+
+    Args:
+        block_id: Block or page ID
+        max_workers: Maximum number of deletes in flight
+
+    Returns:
+        tuple: (number of blocks deleted, list of error messages)
+
+    Raises:
+        ApiError: If listing the children fails
+    """
+    children = fetch_block_children(block_id)
+    return delete_blocks([block['id'] for block in children], max_workers)
+
+def rich_text_signature(rich_text):
+    """
+    Normalize rich text into comparable (content, style) runs.
+
+    Adjacent runs with the same link and annotations are merged, so text the
+    API has split differently still compares equal.
+
+    Args:
+        rich_text: Rich text objects, from the API or built locally
+
+    Returns:
+        tuple: ((content, style), ...) runs
+    """
+    runs = []
+    for rt in rich_text:
+        if rt.get('type', 'text') == 'text':
+            text = rt.get('text', {})
+            content = text.get('content', '')
+            annotations = rt.get('annotations', {})
+            style = ((text.get('link') or {}).get('url'),) + tuple(
+                annotations.get(key, default) for key, default in DEFAULT_ANNOTATIONS
+            )
+        else:
+            # Mentions and equations never match locally built text
+            content = rt.get('plain_text', '')
+            style = (rt.get('type'),)
+
+        if runs and runs[-1][1] == style:
+            runs[-1][0] += content
+        elif content:
+            runs.append([content, style])
+    return tuple((content, style) for content, style in runs)
+
+def block_signature(block):
+    """
+    Summarize a block's content so API blocks and new blocks can be compared.
+
+    Args:
+        block: Block object from the API or a block payload to be created
+
+    Returns:
+        tuple: Hashable signature (equal signatures mean identical content)
+    """
+    block_type = block.get('type')
+    data = block.get(block_type) or {}
+    has_children = bool(block.get('has_children') or block.get('children') or data.get('children'))
+
+    if block_type not in UPDATABLE_TYPES and block_type not in EMPTY_TYPES:
+        # Images, tables, etc. are never recreated, so never treat them as equal
+        return (block_type, block.get('id'))
+
+    return (
+        block_type,
+        rich_text_signature(data.get('rich_text', [])),
+        data.get('language'),
+        data.get('checked'),
+        has_children
+    )
+
+def _can_update(old_block, new_block):
+    """Check whether an existing block can be turned into a new one in place."""
+    return (
+        old_block.get('type') == new_block.get('type')
+        and old_block.get('type') in UPDATABLE_TYPES
+        and not old_block.get('has_children')
+        and not new_block[new_block['type']].get('children')
+    )
+
+def diff_blocks(old_blocks, new_blocks):
+    """
+    Plan the fewest block operations that turn old_blocks into new_blocks.
+
+    Unchanged runs are left alone. Changed blocks of the same type are
+    updated in place (keeping their IDs, comments and backlinks); other new
+    blocks are inserted after the preceding kept block, and leftover old
+    blocks are deleted.
+
+    Args:
+        old_blocks: Current top-level block objects from the API
+        new_blocks: Block payloads the page should end up with
+
+    Returns:
+        dict: {"updates": [(block_id, payload)], "inserts": [(after, blocks)],
+               "deletes": [block_id], "unchanged": int}. "after" is a block
+               ID, None (append at the end), or the index of an earlier insert
+               whose last block is the anchor.
+    """
+    from difflib import SequenceMatcher
+
+    old_sigs = [block_signature(b) for b in old_blocks]
+    new_sigs = [block_signature(b) for b in new_blocks]
+    opcodes = SequenceMatcher(None, old_sigs, new_sigs, autojunk=False).get_opcodes()
+
+    # Blocks can only be inserted after an existing block, so new content
+    # before the first block is folded into a replace of that block
+    if old_blocks and len(opcodes) > 1 and opcodes[0][0] == 'insert':
+        j2 = opcodes[0][4]
+        _, _, equal_i2, _, equal_j2 = opcodes[1]
+        opcodes = [('replace', 0, 1, 0, j2 + 1)] + (
+            [('equal', 1, equal_i2, j2 + 1, equal_j2)] if equal_i2 > 1 else []
+        ) + opcodes[2:]
+
+    plan = {"updates": [], "inserts": [], "deletes": [], "unchanged": 0}
+    anchor = None
+
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            plan['unchanged'] += i2 - i1
+            anchor = old_blocks[i2 - 1]['id']
+            continue
+
+        i = i1
+        pending = []
+        for new_block in new_blocks[j1:j2]:
+            old_block = old_blocks[i] if i < i2 else None
+            if old_block is not None and _can_update(old_block, new_block):
+                if pending:
+                    plan['inserts'].append((anchor, pending))
+                    pending = []
+                block_type = new_block['type']
+                plan['updates'].append((old_block['id'], {block_type: new_block[block_type]}))
+                anchor = old_block['id']
+                i += 1
+                continue
+
+            if anchor is None and old_block is not None:
+                # Nothing to insert after yet: insert after this block, then delete it
+                plan['deletes'].append(old_block['id'])
+                anchor = old_block['id']
+                i += 1
+            pending.append(new_block)
+
+        if pending:
+            plan['inserts'].append((anchor, pending))
+            anchor = len(plan['inserts']) - 1
+        plan['deletes'].extend(b['id'] for b in old_blocks[i:i2])
+
+    return plan
+
+def update_block(item):
+    """
+    Update one block's content in place.
+
+    Args:
+        item: (block_id, payload) tuple, payload like {"paragraph": {...}}
+
+    Returns:
+        str: Error message, or None if the block was updated
+    """
+    block_id, payload = item
+    try:
+        response = api_request("PATCH", f"{NOTION_BASE_URL}/blocks/{block_id}", json=payload)
+        response.raise_for_status()
+    except ApiError as e:
+        return f"{block_id}: {str(e)}"
+    return None
+
+def insert_blocks(parent_id, blocks, after=None):
+    """
+    Insert blocks into a parent, after a given child (or at the end).
+
+    Args:
+        parent_id: Block or page ID
+        blocks: Block payloads, in order
+        after: ID of the child to insert after (None appends at the end)
+
+    Returns:
+        str: ID of the last block inserted (None if nothing was inserted)
+
+    Raises:
+        ApiError: If an API request fails
+    """
+    url = f"{NOTION_BASE_URL}/blocks/{parent_id}/children"
+    last_id = None
+
+    for i in range(0, len(blocks), APPEND_BATCH_SIZE):
+        chunk = blocks[i:i + APPEND_BATCH_SIZE]
+        body = {"children": chunk}
+        if after:
+            body["after"] = after
+        response = api_request("PATCH", url, json=body)
+        response.raise_for_status()
+
+        # The next chunk goes after the last block just created
+        results = response.json().get('results', [])
+        if results:
+            last_id = results[-1]['id']
+            if after:
+                after = last_id
+
+    return last_id
+
+def iter_block_batches(blocks, size=APPEND_BATCH_SIZE):
+    """
+    Group blocks into lists of at most size blocks, consuming them lazily.
+
+    Args:
+        blocks: Iterable of block payloads
+        size: Maximum batch size
+
+    Yields:
+        list: Consecutive blocks
+    """
+    batch = []
+    for block in blocks:
+        batch.append(block)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def stream_block_batches(blocks):
+    """
+    Produce 100-block batches in a background thread.
+
+    Batches are built (e.g. parsed from a file) while earlier ones upload,
+    with at most two batches waiting at a time.
+
+    Args:
+        blocks: Iterable of block payloads (may be a lazy generator)
+
+    Returns:
+        iterator: Lists of at most APPEND_BATCH_SIZE blocks
+    """
+    return iter_in_background(iter_block_batches(blocks))
+
+@trace_phase("append blocks")
+def append_block_batches(parent_id, batches, after=None):
+    """
+    Append batches of blocks to a parent in order.
+
+    Args:
+        parent_id: Block or page ID
+        batches: Iterable of block lists (at most APPEND_BATCH_SIZE each)
+        after: ID of the child to insert after (None appends at the end)
+
+    Returns:
+        int: Number of blocks appended
+
+    Raises:
+        ApiError: If an API request fails
+    """
+    appended = 0
+    for batch in batches:
+        last_id = insert_blocks(parent_id, batch, after)
+        if after:
+            after = last_id
+        appended += len(batch)
+    return appended
+
+@trace_phase("sync blocks")
+def sync_block_children(parent_id, new_blocks, max_workers=MAX_CONCURRENCY):
+    """
+    Make a page's top-level blocks match new_blocks with a minimal diff.
+
+    Inserts run first (in order, anchored on kept blocks), then updates and
+    deletes run concurrently under the shared rate limiter.
+
+    Args:
+        parent_id: Block or page ID
+        new_blocks: Block payloads the page should end up with
+        max_workers: Maximum number of updates/deletes in flight
+
+    Returns:
+        tuple: (counts dict with blocks_added, blocks_updated, blocks_removed
+                and blocks_unchanged, list of error messages)
+
+    Raises:
+        ApiError: If listing or inserting fails
+    """
+    plan = diff_blocks(fetch_block_children(parent_id), new_blocks)
+
+    added = 0
+    last_ids = []
+    for after, blocks in plan['inserts']:
+        if isinstance(after, int):
+            after = last_ids[after]
+        last_ids.append(insert_blocks(parent_id, blocks, after))
+        added += len(blocks)
+
+    update_errors = [e for e in map_concurrent(update_block, plan['updates'], max_workers) if e]
+    removed, delete_errors = delete_blocks(plan['deletes'], max_workers)
+
+    counts = {
+        "blocks_added": added,
+        "blocks_updated": len(plan['updates']) - len(update_errors),
+        "blocks_removed": removed,
+        "blocks_unchanged": plan['unchanged']
+    }
+    return counts, update_errors + delete_errors
+
+def iter_blocks(blocks):
+    """
+    Walk a block tree depth-first in document order.
+
+    Args:
+        blocks: Block objects, optionally with nested "children"
+
+    Yields:
+        dict: Each block object
+    """
+    for block in blocks:
+        yield block
+        yield from iter_blocks(block.get('children', []))
+
+def format_block_tree(blocks):
+    """
+    Convert a block tree into the compact records returned by read_note.
+
+    Args:
+        blocks: Block objects, optionally with nested "children"
+
+    Returns:
+        list: extract_block_text() records, with nested "children" where present
+    """
+    formatted = []
+    for block in blocks:
+        block_data = extract_block_text(block)
+        if block.get('children'):
+            block_data['children'] = format_block_tree(block['children'])
+        formatted.append(block_data)
+    return formatted
+
+def block_to_markdown(block_data):
+    """
+    Render one extract_block_text() record as markdown.
+
+    Args:
+        block_data: {"type", "text", ...} record
+
+    Returns:
+        str: Markdown text (empty for blocks without text)
+    """
+    block_type = block_data.get('type')
+    block_text = block_data.get('text', '')
+
+    if block_type == 'code':
+        language = block_data.get('language', 'plain text')
+        return f"```{language}\n{block_text}\n```"
+    if block_type == 'divider':
+        return "---"
+    if block_type in MARKDOWN_PREFIXES:
+        return f"{MARKDOWN_PREFIXES[block_type]}{block_text}"
+    return block_text
+
+def blocks_to_markdown(blocks, depth=0):
+    """
+    Render a block tree as markdown, indenting nested blocks under their parent.
+
+    Args:
+        blocks: Block objects, optionally with nested "children"
+        depth: Nesting level (two spaces of indentation per level)
+
+    Returns:
+        str: Markdown text
+    """
+    indent = "  " * depth
+    parts = []
+    for block in blocks:
+        text = block_to_markdown(extract_block_text(block))
+        lines = [indent + line for line in text.split("\n")] if text else []
+        if block.get('children'):
+            nested = blocks_to_markdown(block['children'], depth + 1)
+            if nested:
+                lines.append(nested)
+        if lines:
+            parts.append("\n".join(lines))
+
+    # Top-level blocks are separated by blank lines, nested ones are kept tight
+    return ("\n\n" if depth == 0 else "\n").join(parts)
+
+def blocks_to_plain_text(blocks):
+    """
+    Join the text of blocks into one plain-text string (one block per line).
+
+    Nested children are included in document order. Placeholder text for
+    blocks without content (e.g. "[table block]") is skipped.
+
+    Args:
+        blocks: Block objects from the API, optionally with nested "children"
+
+    Returns:
+        str: Plain text
+    """
+    lines = []
+    for block in iter_blocks(blocks):
+        block_data = extract_block_text(block)
+        text = block_data.get('text', '')
+        if text and not (text.startswith('[') and text.endswith(' block]')):
+            lines.append(text)
+    return "\n".join(lines)
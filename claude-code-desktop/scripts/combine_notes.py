@@ -5,69 +5,69 @@ Combine multiple Notion notes into one.
 This script reads multiple source notes, combines their content, and either
 appends to an existing note or creates a new note. Source notes are
 automatically archived after successful combination.
+
+Any number of notes can be combined: sources are read concurrently (a few
+notes ahead of the writer), stitched back in the requested order and
+written to the target in 100-block batches, so memory stays bounded.
 """
 
 import argparse
-import requests
 import sys
-import time
-import subprocess
-import json
 from common import (
-    NOTES_DB_ID, NOTION_BASE_URL, get_headers,
-    output_success, output_error, extract_title, extract_block_text
+    ApiError, NOTION_BASE_URL, api_request,
+    output_success, output_error, extract_title, note_key,
+    map_concurrent, iter_concurrent
 )
+from blocks import fetch_block_children, iter_block_batches, append_block_batches
+from notes import create_note_page, set_archived
 
-def read_note_content(note_id):
+def fetch_note_page(note_id):
     """
-    Read all content blocks from a note.
+    Fetch a note's page object.
 
     Args:
-        note_id: Note ID to read
+        note_id: Note ID
 
     Returns:
-        dict: {"title": str, "blocks": list}
+        tuple: (page object or None, error message or None)
     """
-    headers = get_headers()
-
-    # Get note metadata
-    page_url = f"{NOTION_BASE_URL}/pages/{note_id}"
     try:
-        response = requests.get(page_url, headers=headers, timeout=10)
+        response = api_request("GET", f"{NOTION_BASE_URL}/pages/{note_id}")
         response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        output_error(f"Failed to fetch note {note_id}: {str(e)}")
+    except ApiError as e:
+        return None, f"Failed to fetch note {note_id}: {str(e)}"
+    return response.json(), None
 
-    page = response.json()
-    title = extract_title(page)
+def iter_combined_blocks(source_notes, preserve_titles=True, separator=True):
+    """
+    Produce the combined content of the source notes, in order.
 
-    # Get note blocks
-    blocks_url = f"{NOTION_BASE_URL}/blocks/{note_id}/children?page_size=100"
-    all_blocks = []
+    Source blocks are fetched concurrently, a few notes ahead of the consumer.
 
-    try:
-        while blocks_url:
-            response = requests.get(blocks_url, headers=headers, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            all_blocks.extend(data.get('results', []))
-
-            # Handle pagination
-            if data.get('has_more'):
-                next_cursor = data.get('next_cursor')
-                blocks_url = f"{NOTION_BASE_URL}/blocks/{note_id}/children?page_size=100&start_cursor={next_cursor}"
-            else:
-                blocks_url = None
-
-            time.sleep(0.3)  # Rate limiting
-    except requests.exceptions.RequestException as e:
-        output_error(f"Failed to fetch blocks for note {note_id}: {str(e)}")
+    Args:
+        source_notes: List of {"id", "title"} dicts, in combination order
+        preserve_titles: Add source note titles as headings
+        separator: Add dividers between notes
 
-    return {
-        "id": note_id,
-        "title": title,
-        "blocks": all_blocks
-    }
+    Yields:
+        dict: Block objects ready for creation
+
+    Raises:
+        ApiError: If fetching a note's blocks fails
+    """
+    note_blocks = iter_concurrent(fetch_block_children, [n['id'] for n in source_notes])
+
+    for i, (note, blocks) in enumerate(zip(source_notes, note_blocks)):
+        # Add title as heading if requested
+        if preserve_titles:
+            yield create_title_block(note['title'])
+
+        # Add note blocks
+        yield from blocks_to_notion_format(blocks)
+
+        # Add separator between notes (but not after last one)
+        if separator and i < len(source_notes) - 1:
+            yield create_divider_block()
 
 def blocks_to_notion_format(blocks):
     """
@@ -174,100 +174,42 @@ def create_divider_block():
         "divider": {}
     }
 
-def append_blocks_to_note(note_id, blocks):
+def create_new_note(title, batches):
     """
-    Append blocks to an existing note.
-
-    Args:
-        note_id: Target note ID
-        blocks: List of block objects to append
-
-    Returns:
-        int: Number of blocks added
-    """
-    headers = get_headers()
-    url = f"{NOTION_BASE_URL}/blocks/{note_id}/children"
-    blocks_added = 0
-
-    # Notion API has a limit of 100 blocks per request
-    for i in range(0, len(blocks), 100):
-        chunk = blocks[i:i+100]
-        body = {"children": chunk}
-
-        try:
-            response = requests.patch(url, headers=headers, json=body, timeout=30)
-            response.raise_for_status()
-            blocks_added += len(chunk)
-            time.sleep(0.3)  # Rate limiting
-        except requests.exceptions.RequestException as e:
-            output_error(f"Failed to append blocks: {str(e)}")
-
-    return blocks_added
-
-def create_new_note(title, blocks):
-    """
-    Create a new note with given blocks.
+    Create a new note from batches of blocks.
 
     Args:
         title: Note title
-        blocks: List of block objects
+        batches: Iterable of block lists (at most 100 each)
 
     Returns:
         dict: Created note info
-    """
-    headers = get_headers()
-    url = f"{NOTION_BASE_URL}/pages"
-
-    # Build page creation payload
-    page_data = {
-        "parent": {
-            "database_id": NOTES_DB_ID
-        },
-        "properties": {
-            "Name": {
-                "title": [
-                    {
-                        "type": "text",
-                        "text": {
-                            "content": title
-                        }
-                    }
-                ]
-            },
-            "Archived": {
-                "checkbox": False
-            }
-        }
-    }
 
-    # Add children (content blocks) if any
-    # Note: API limit is 100 children in creation, need to handle excess separately
-    initial_blocks = blocks[:100]
-    remaining_blocks = blocks[100:]
-
-    if initial_blocks:
-        page_data["children"] = initial_blocks
-
-    # Create the page
-    try:
-        response = requests.post(url, headers=headers, json=page_data, timeout=30)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        output_error(f"Failed to create note: {str(e)}")
+    Raises:
+        ApiError: If a request fails; once the page exists, the error's
+                  note_id attribute is its ID
+    """
+    # The API accepts at most 100 children on creation; the rest are appended
+    batches = iter(batches)
+    initial_blocks = next(batches, [])
+    if not initial_blocks:
+        output_error("No content found in source notes to combine")
 
-    page = response.json()
+    page = create_note_page(title, initial_blocks)
     note_id = page.get('id')
 
-    # Append remaining blocks if any
-    blocks_added = len(initial_blocks)
-    if remaining_blocks:
-        blocks_added += append_blocks_to_note(note_id, remaining_blocks)
+    try:
+        blocks_created = len(initial_blocks) + append_block_batches(note_id, batches)
+    except ApiError as e:
+        # The page holds part of the content; the caller reports it
+        e.note_id = note_id
+        raise
 
     return {
         "id": note_id,
-        "name": title,
+        "name": title.strip(),
         "url": page.get('url', ''),
-        "blocks_created": blocks_added
+        "blocks_created": blocks_created
     }
 
 def archive_note(note_id):
@@ -276,24 +218,17 @@ def archive_note(note_id):
 
     Args:
         note_id: Note ID to archive
-    """
-    headers = get_headers()
-    url = f"{NOTION_BASE_URL}/pages/{note_id}"
-
-    update_data = {
-        "properties": {
-            "Archived": {
-                "checkbox": True
-            }
-        }
-    }
 
+    Returns:
+        bool: True if the note was archived
+    """
     try:
-        response = requests.patch(url, headers=headers, json=update_data, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
+        set_archived(note_id, True)
+    except ApiError as e:
         # Don't fail the whole operation if archiving fails
         print(f"Warning: Failed to archive note {note_id}: {str(e)}", file=sys.stderr)
+        return False
+    return True
 
 def combine_notes(source_ids, target_id=None, new_note_title=None,
                   preserve_titles=True, archive_sources=True, separator=True):
@@ -311,86 +246,70 @@ def combine_notes(source_ids, target_id=None, new_note_title=None,
     if not source_ids or len(source_ids) < 1:
         output_error("At least one source note ID is required")
 
-    if len(source_ids) > 5:
-        output_error("Maximum 5 notes can be combined at once")
-
     if not target_id and not new_note_title:
         output_error("Either --target-id or --create-new must be provided")
 
     if target_id and new_note_title:
         output_error("Cannot use both --target-id and --create-new. Choose one.")
 
-    # Read all source notes
-    source_notes = []
-    for source_id in source_ids:
-        note_data = read_note_content(source_id)
-        source_notes.append(note_data)
-        time.sleep(0.3)  # Rate limiting
-
-    # Build combined blocks
-    combined_blocks = []
-
-    for i, note in enumerate(source_notes):
-        # Add title as heading if requested
-        if preserve_titles:
-            combined_blocks.append(create_title_block(note['title']))
+    if target_id and note_key(target_id) in {note_key(source_id) for source_id in source_ids}:
+        output_error("The target note cannot also be a source note")
 
-        # Add note blocks
-        note_blocks = blocks_to_notion_format(note['blocks'])
-        combined_blocks.extend(note_blocks)
+    # Fetch every source (and the target) up front, so a bad ID fails
+    # before anything is written
+    page_ids = list(source_ids) + ([target_id] if target_id else [])
+    pages = map_concurrent(fetch_note_page, page_ids)
+    errors = [error for _, error in pages if error]
+    if errors:
+        output_error(errors[0], {"failed": len(errors)} if len(errors) > 1 else None)
 
-        # Add separator between notes (but not after last one)
-        if separator and i < len(source_notes) - 1:
-            combined_blocks.append(create_divider_block())
+    source_notes = [
+        {"id": source_id, "title": extract_title(page)}
+        for source_id, (page, _) in zip(source_ids, pages)
+    ]
 
-    if not combined_blocks:
-        output_error("No content found in source notes to combine")
-
-    # Execute combination
+    # Stream the combined content into the target in 100-block batches
+    batches = iter_block_batches(iter_combined_blocks(source_notes, preserve_titles, separator))
     result = {}
 
-    if new_note_title:
-        # Create new note mode
-        new_note = create_new_note(new_note_title, combined_blocks)
-        result = {
-            "action": "create_combined",
-            "target_note": new_note,
-            "source_notes": [{"id": n['id'], "title": n['title']} for n in source_notes],
-            "blocks_combined": len(combined_blocks)
-        }
-    else:
-        # Append to existing note mode
-        blocks_added = append_blocks_to_note(target_id, combined_blocks)
-
-        # Get target note info
-        headers = get_headers()
-        url = f"{NOTION_BASE_URL}/pages/{target_id}"
-        try:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            target_title = extract_title(response.json())
-        except:
-            target_title = "Unknown"
-
-        result = {
-            "action": "append_combined",
-            "target_note": {
-                "id": target_id,
-                "name": target_title
-            },
-            "source_notes": [{"id": n['id'], "title": n['title']} for n in source_notes],
-            "blocks_added": blocks_added
-        }
+    try:
+        if new_note_title:
+            # Create new note mode
+            new_note = create_new_note(new_note_title, batches)
+            result = {
+                "action": "create_combined",
+                "target_note": new_note,
+                "source_notes": source_notes,
+                "blocks_combined": new_note['blocks_created']
+            }
+        else:
+            # Append to existing note mode
+            blocks_added = append_block_batches(target_id, batches)
+            if not blocks_added:
+                output_error("No content found in source notes to combine")
+
+            result = {
+                "action": "append_combined",
+                "target_note": {
+                    "id": target_id,
+                    "name": extract_title(pages[-1][0])
+                },
+                "source_notes": source_notes,
+                "blocks_added": blocks_added
+            }
+    except ApiError as e:
+        output_error(
+            f"Failed to combine notes: {str(e)}. Source notes were not archived.",
+            {"target_note_id": target_id or getattr(e, 'note_id', None)}
+        )
 
     # Archive source notes if requested
     archived_notes = []
     if archive_sources:
-        for note in source_notes:
-            archive_note(note['id'])
-            archived_notes.append(note['id'])
-            time.sleep(0.3)  # Rate limiting
+        archived = map_concurrent(archive_note, [note['id'] for note in source_notes])
+        archived_notes = [note['id'] for note, ok in zip(source_notes, archived) if ok]
 
-    result["archived_sources"] = archived_notes if archive_sources else []
+    result["archived_sources"] = archived_notes
 
     output_success(result)
 
@@ -399,7 +318,7 @@ if __name__ == "__main__":
         description="Combine multiple notes into one"
     )
     parser.add_argument("--source-ids", nargs='+', required=True,
-                        help="Source note IDs to combine (space-separated, max 5)")
+                        help="Source note IDs to combine (space-separated)")
     parser.add_argument("--target-id", help="Target note ID to append to")
     parser.add_argument("--create-new", help="Create new note with this title")
     parser.add_argument("--no-preserve-titles", action="store_true",
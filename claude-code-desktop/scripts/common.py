@@ -5,14 +5,33 @@ Common utilities for Notion skill scripts.
 This module provides:
 - Credential loading
 - API headers configuration
+- Pooled HTTP transport shared by all API calls (requests, or the standard
+  library's http.client for faster startup)
+- Adaptive rate limiting with 429/Retry-After handling
+- Bounded concurrency helper for independent API calls
+- Background producer for pipelining parsing with uploads
+- Local cache directory and atomic JSON file helpers
+- Opt-in tracing of API calls and script phases
+- Per-invocation metrics appended to a rotating local log
 - Database ID constants
 - Text extraction helpers
 - JSON output formatting
 - Error response formatting
 """
 
+import atexit
+import contextvars
+import itertools
 import json
+import os
+import queue
+import re
 import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
 
 # ============================================================================
 # CONSTANTS
@@ -27,6 +46,55 @@ PROJECTS_DB_ID = "YOUR_PROJECTS_DATABASE_ID_HERE"
 NOTION_API_VERSION = "2022-06-28"
 NOTION_BASE_URL = "https://api.notion.com/v1"
 
+# Environment overrides, used to point the scripts at a local stand-in API
+# (see benchmarks/fake_notion.py)
+NOTES_DB_ID = os.environ.get("NOTION_SKILLS_NOTES_DB_ID", NOTES_DB_ID)
+PROJECTS_DB_ID = os.environ.get("NOTION_SKILLS_PROJECTS_DB_ID", PROJECTS_DB_ID)
+NOTION_BASE_URL = os.environ.get("NOTION_SKILLS_BASE_URL", NOTION_BASE_URL).rstrip('/')
+CONFIG_FILE = os.environ.get("NOTION_SKILLS_CONFIG_FILE", "/etc/keep-to-notion/env.conf")
+
+# HTTP transport configuration
+# Timeouts are (connect, read) in seconds
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+REQUEST_TIMEOUT = (CONNECT_TIMEOUT, READ_TIMEOUT)
+POOL_MAXSIZE = 10
+
+# "requests" (default) or "urllib" (standard library only, loads faster; for
+# short command-line runs). Falls back to urllib if requests isn't installed
+TRANSPORT = os.environ.get("NOTION_SKILLS_TRANSPORT", "requests").strip().lower()
+
+# Rate limiting (Notion allows an average of 3 requests/second with bursts)
+RATE_LIMIT_PER_SECOND = float(os.environ.get("NOTION_SKILLS_RATE_LIMIT", 3.0))
+RATE_LIMIT_BURST = 10
+MAX_RETRIES = 5
+
+# Concurrency for independent API calls (still bounded by the rate limiter)
+MAX_CONCURRENCY = 4
+
+# Opt-in tracing: "1" adds a "_meta.trace" section to the JSON output; any
+# other value is a file (or an existing directory) to write a Chrome trace to
+TRACE_SETTING = os.environ.get("NOTION_SKILLS_TRACE", "")
+
+# Most spans listed in "_meta.trace" (the totals always cover all of them)
+MAX_TRACE_SPANS = 500
+
+# Metrics log: every script run appends one JSONL record (see
+# metrics_report.py). "0" turns it off; any other value is the log path
+METRICS_SETTING = os.environ.get("NOTION_SKILLS_METRICS", "")
+METRICS_FILE = "metrics.jsonl"
+METRICS_MAX_BYTES = 5 * 1024 * 1024
+METRICS_BACKUPS = 3
+
+# Local cache directory (project map, mirrors, block cache)
+CACHE_DIR = os.environ.get(
+    "NOTION_SKILLS_CACHE_DIR",
+    os.path.expanduser("~/.cache/notion-skills")
+)
+
+# Default staleness bound (seconds) for --local reads from the mirror
+MIRROR_MAX_STALENESS = 15 * 60
+
 # ============================================================================
 # CREDENTIAL LOADING
 # ============================================================================
@@ -42,14 +110,14 @@ def load_credentials():
         SystemExit: If token cannot be loaded
     """
     try:
-        with open('/etc/keep-to-notion/env.conf') as f:
+        with open(CONFIG_FILE) as f:
             for line in f:
                 if line.startswith('NOTION_TOKEN='):
                     return line.split('=', 1)[1].strip()
         output_error("NOTION_TOKEN not found in config file")
         sys.exit(1)
     except FileNotFoundError:
-        output_error("Config file not found: /etc/keep-to-notion/env.conf")
+        output_error(f"Config file not found: {CONFIG_FILE}")
         sys.exit(1)
 
 def get_headers():
@@ -66,10 +134,540 @@ def get_headers():
         "Content-Type": "application/json"
     }
 
+# ============================================================================
+# HTTP TRANSPORT
+# ============================================================================
+
+class RateLimiter:
+    """
+    Thread-safe token bucket that adapts to Notion's rate limit.
+
+    Requests draw one token each; tokens refill at the current rate up to
+    the burst size, so short bursts go out immediately and a caller only
+    waits when it actually has another request to send. A 429 halves the
+    rate and pauses all callers for the Retry-After period; each success
+    afterwards nudges the rate back towards the configured average.
+    """
+
+    def __init__(self, rate=RATE_LIMIT_PER_SECOND, burst=RATE_LIMIT_BURST):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = max(-self.tokens / self.rate if self.tokens < 0 else 0.0,
+                       self.blocked_until - now)
+        if wait > 0:
+            time.sleep(wait)
+        return max(wait, 0.0)
+
+    def throttled(self, retry_after):
+        """
+        Record a 429 response.
+
+        Args:
+            retry_after: Seconds the API asked us to wait
+        """
+        with self.lock:
+            self.rate = max(self.max_rate / 8, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def succeeded(self):
+        """Record a successful response, recovering the rate after a 429."""
+        if self.rate < self.max_rate:
+            with self.lock:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 10)
+
+_rate_limiter = RateLimiter()
+
+def get_rate_limiter():
+    """
+    Get the process-wide rate limiter shared by all API calls.
+
+    Returns:
+        RateLimiter: The shared limiter
+    """
+    return _rate_limiter
+
+def _retry_after_seconds(response, attempt):
+    """Seconds to wait after a 429, from Retry-After or exponential backoff."""
+    try:
+        return max(float(response.headers.get('Retry-After')), 0.0)
+    except (TypeError, ValueError):
+        return min(2 ** attempt * 0.5, 30.0)
+
+class ApiError(OSError):
+    """
+    A Notion API request failed: network error, timeout or error status.
+
+    Raised by api_request() and ApiResponse.raise_for_status() whichever
+    transport is used. Like requests' exceptions it is an OSError, so
+    handlers that also catch OSError must catch ApiError first.
+
+    Attributes:
+        response: The ApiResponse for error statuses, else None
+    """
+
+    def __init__(self, message, response=None):
+        super().__init__(message)
+        self.response = response
+
+class ApiTimeout(ApiError):
+    """A Notion API request timed out."""
+
+class ApiResponse:
+    """
+    Response of a Notion API request, the same for every transport.
+
+    Attributes:
+        status_code: HTTP status
+        reason: HTTP reason phrase
+        headers: Case-insensitive response headers
+        content: Response body bytes
+        url: Request URL
+        request_bytes: Size of the request body
+    """
+
+    def __init__(self, status_code, reason, headers, content, url, request_bytes=0):
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.request_bytes = request_bytes
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        try:
+            return json.loads(self.content)
+        except ValueError as e:
+            raise ApiError(f"Invalid JSON in response: {str(e)}", self) from e
+
+    def raise_for_status(self):
+        """
+        Raise ApiError for 4xx/5xx statuses (worded like requests' HTTPError).
+        """
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise ApiError(f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", self)
+
+class RequestsTransport:
+    """Pooled keep-alive connections through a requests.Session."""
+
+    name = "requests"
+
+    def __init__(self, headers):
+        # Imported here: requests takes most of a script's startup time
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.exceptions = requests.exceptions
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def send(self, method, url, params=None, json=None, timeout=REQUEST_TIMEOUT):
+        try:
+            response = self.session.request(method, url, params=params, json=json, timeout=timeout)
+        except self.exceptions.Timeout as e:
+            raise ApiTimeout(str(e)) from e
+        except self.exceptions.RequestException as e:
+            raise ApiError(str(e)) from e
+        body = response.request.body
+        return ApiResponse(
+            response.status_code, response.reason, response.headers,
+            response.content, response.url, len(body) if body else 0
+        )
+
+class UrllibTransport:
+    """
+    Keep-alive connections from the standard library (http.client), one per thread.
+
+    Loads in a fraction of the time of requests, which matters for short
+    command-line runs. Proxy settings from the environment are not used.
+    """
+
+    name = "urllib"
+
+    def __init__(self, headers):
+        self.headers = dict(headers)
+        self.local = threading.local()
+
+    def _connection(self, scheme, host):
+        import http.client
+
+        connections = self.local.__dict__.setdefault('connections', {})
+        key = (scheme, host)
+        if key not in connections:
+            connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            connections[key] = connection_class(host, timeout=CONNECT_TIMEOUT)
+        return connections[key]
+
+    def _close(self, scheme, host):
+        connection = self.local.__dict__.get('connections', {}).pop((scheme, host), None)
+        if connection:
+            connection.close()
+
+    def send(self, method, url, params=None, json=None, timeout=REQUEST_TIMEOUT):
+        import http.client
+        import socket
+        from urllib.parse import urlencode, urlsplit
+
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        if params:
+            path += ("&" if parts.query else "?") + urlencode(params)
+        body = None
+        headers = dict(self.headers)
+        if json is not None:
+            body = _json_dumps(json).encode('utf-8')
+        else:
+            headers.pop("Content-Type", None)
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+
+        # A kept-alive connection may have been closed by the server; a
+        # request that fails on one is retried once on a fresh connection
+        for attempt in range(2):
+            connection = self._connection(parts.scheme, parts.netloc)
+            reused = connection.sock is not None
+            try:
+                if connection.sock is None:
+                    connection.connect()
+                connection.sock.settimeout(read_timeout)
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                content = response.read()
+            except socket.timeout as e:
+                self._close(parts.scheme, parts.netloc)
+                raise ApiTimeout(f"Request timed out: {method} {url}") from e
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as e:
+                self._close(parts.scheme, parts.netloc)
+                if reused and attempt == 0:
+                    continue
+                raise ApiError(f"Connection failed: {str(e)}") from e
+            except (OSError, http.client.HTTPException) as e:
+                self._close(parts.scheme, parts.netloc)
+                raise ApiError(f"Connection failed: {str(e)}") from e
+
+            if response.will_close:
+                self._close(parts.scheme, parts.netloc)
+            full_url = f"{parts.scheme}://{parts.netloc}{path}"
+            return ApiResponse(response.status, response.reason, response.headers,
+                               content, full_url, len(body) if body else 0)
+
+def _json_dumps(data):
+    # UrllibTransport.send's json argument shadows the module
+    return json.dumps(data, allow_nan=False)
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport():
+    """
+    Get the process-wide pooled Notion API transport.
+
+    The transport is created on first use and reused for every request, so
+    keep-alive connections to api.notion.com are shared across calls.
+    NOTION_SKILLS_TRANSPORT picks requests (default) or urllib.
+
+    Returns:
+        RequestsTransport or UrllibTransport: Transport with auth headers
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                headers = get_headers()
+                transport = None
+                if TRANSPORT != "urllib":
+                    try:
+                        transport = RequestsTransport(headers)
+                    except ImportError:
+                        pass
+                _transport = transport or UrllibTransport(headers)
+    return _transport
+
+def api_request(method, url, **kwargs):
+    """
+    Send a request to the Notion API through the pooled session.
+
+    Every request passes through the shared rate limiter. Rate-limited
+    (429) responses are retried up to MAX_RETRIES times after waiting for
+    the Retry-After period, and conflicts (409, e.g. concurrent writes to one
+    parent block) after a backoff; neither request was applied, so retrying
+    is safe even for POST/PATCH/DELETE.
+
+    Args:
+        method: HTTP method ("GET", "POST", "PATCH", "DELETE")
+        url: Full request URL
+        **kwargs: json (request body), params (query string) and timeout
+
+    Returns:
+        ApiResponse: The API response (status is not checked)
+
+    Raises:
+        ApiError: If the request could not be completed (ApiTimeout on timeouts)
+    """
+    kwargs.setdefault('timeout', REQUEST_TIMEOUT)
+    transport = get_transport()
+    limiter = get_rate_limiter()
+    trace = get_trace()
+    metrics = get_metrics()
+    started = time.perf_counter()
+    waited = 0.0
+    throttled = 0
+
+    attempt = 0
+    try:
+        while True:
+            waited += limiter.acquire()
+            response = transport.send(method, url, **kwargs)
+            if response.status_code == 429:
+                throttled += 1
+            if response.status_code not in (409, 429) or attempt >= MAX_RETRIES:
+                break
+            if response.status_code == 429:
+                limiter.throttled(_retry_after_seconds(response, attempt))
+            else:
+                backoff = _retry_after_seconds(response, attempt)
+                time.sleep(backoff)
+                waited += backoff
+            attempt += 1
+    except ApiError as e:
+        if trace:
+            trace.add_request(method, url, started, None, attempt, waited, error=str(e))
+        if metrics:
+            metrics.add_request(method, url, None, attempt, throttled,
+                                timed_out=isinstance(e, ApiTimeout))
+        raise
+
+    if response.status_code != 429:
+        limiter.succeeded()
+    if trace:
+        trace.add_request(method, url, started, response, attempt, waited)
+    if metrics:
+        metrics.add_request(method, url, response, attempt, throttled)
+    return response
+
+def map_concurrent(func, items, max_workers=MAX_CONCURRENCY):
+    """
+    Apply func to every item with bounded concurrency.
+
+    Args:
+        func: Function taking one item
+        items: Iterable of items
+        max_workers: Maximum number of calls in flight
+
+    Returns:
+        list: Results in the same order as items
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        futures = [_submit_in_context(executor, func, item) for item in items]
+        return [future.result() for future in futures]
+
+def _submit_in_context(executor, func, item):
+    # Worker threads see the caller's context (e.g. its trace)
+    return executor.submit(contextvars.copy_context().run, func, item)
+
+def iter_concurrent(func, items, max_workers=MAX_CONCURRENCY):
+    """
+    Lazily apply func to items with bounded concurrency, yielding results in order.
+
+    Unlike map_concurrent, at most max_workers calls run ahead of the
+    consumer, so results can be processed (e.g. uploaded) as they arrive
+    without holding all of them in memory.
+
+    Args:
+        func: Function taking one item
+        items: Iterable of items
+        max_workers: Maximum number of calls in flight
+
+    Yields:
+        Results in the same order as items
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque(_submit_in_context(executor, func, item) for item in itertools.islice(items, max_workers))
+        while pending:
+            result = pending.popleft().result()
+            for item in itertools.islice(items, 1):
+                pending.append(_submit_in_context(executor, func, item))
+            yield result
+
+def iter_in_background(iterable, max_buffered=2):
+    """
+    Consume an iterable in a background thread, yielding its items in order.
+
+    At most max_buffered items wait in the queue, so memory stays bounded
+    while the producer works ahead of the consumer (e.g. parsing the next
+    batch of blocks while the current one uploads). Exceptions raised by the
+    producer are re-raised in the consumer.
+
+    Args:
+        iterable: Iterable to consume
+        max_buffered: Maximum number of items produced ahead of the consumer
+
+    Yields:
+        Items of iterable
+    """
+    items = queue.Queue(maxsize=max_buffered)
+    stopped = threading.Event()
+
+    def put(entry):
+        # Give up once the consumer has gone away, instead of blocking forever
+        while not stopped.is_set():
+            try:
+                items.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put((True, item)):
+                    return
+            put((False, None))
+        except Exception as e:
+            put((False, e))
+
+    context = contextvars.copy_context()
+    threading.Thread(target=context.run, args=(produce,), daemon=True).start()
+    try:
+        while True:
+            has_item, item = items.get()
+            if not has_item:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        stopped.set()
+
+# ============================================================================
+# LOCAL CACHE FILES
+# ============================================================================
+
+def get_cache_path(filename):
+    """
+    Get the path of a file in the local cache directory, creating the directory.
+
+    Args:
+        filename: File name inside CACHE_DIR
+
+    Returns:
+        str: Absolute path
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+def read_json_file(path, default=None):
+    """
+    Read a JSON file, returning a default if it is missing or unreadable.
+
+    Args:
+        path: File path
+        default: Value returned when the file can't be read
+
+    Returns:
+        Parsed JSON data or default
+    """
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def write_json_atomic(path, data):
+    """
+    Write JSON to a file atomically (write to a temp file, then rename).
+
+    Concurrent readers see either the old or the new file, never a partial one.
+
+    Args:
+        path: Destination file path
+        data: JSON-serialisable data
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+# ============================================================================
+# TIMESTAMPS
+# ============================================================================
+
+def parse_notion_time(value):
+    """
+    Convert a Notion ISO timestamp to epoch seconds.
+
+    Args:
+        value: Timestamp like "2024-12-06T10:15:00.000Z"
+
+    Returns:
+        float: Epoch seconds, or None if value is empty/invalid
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+def is_fresh_since_edit(last_edited_time, fetched_at):
+    """
+    Check whether data fetched at fetched_at reflects a page's last edit.
+
+    Notion reports last_edited_time with minute precision, so a copy taken
+    within the same minute as the edit may miss later edits in that minute.
+
+    Args:
+        last_edited_time: The page's last_edited_time (ISO string)
+        fetched_at: Epoch seconds when the copy was taken
+
+    Returns:
+        bool: True if the copy is guaranteed to include the last edit
+    """
+    edited = parse_notion_time(last_edited_time)
+    return edited is not None and fetched_at is not None and fetched_at >= edited + 60
+
 # ============================================================================
 # TEXT EXTRACTION
 # ============================================================================
 
+def note_key(note_id):
+    """Normalize a page ID so dashed and undashed forms compare equal."""
+    return note_id.replace('-', '').lower()
+
 def extract_title(page):
     """
     Extract title from a Notion page object.
@@ -87,6 +685,10 @@ def extract_title(page):
             return title_array[0].get('plain_text', 'Untitled')
     return "Untitled"
 
+def extract_archived(page):
+    """Extract the Archived checkbox from a page (False if missing)."""
+    return bool(page.get('properties', {}).get('Archived', {}).get('checkbox', False))
+
 def extract_block_text(block):
     """
     Extract plain text from a Notion block.
@@ -129,10 +731,522 @@ def extract_block_text(block):
     else:
         return {"type": block_type, "text": f"[{block_type} block]"}
 
+# ============================================================================
+# TRACING
+# ============================================================================
+
+# Note, block and database IDs in request paths
+_ID_PATTERN = re.compile(r'[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}')
+
+class Trace:
+    """
+    Spans recorded during one script invocation.
+
+    Every API call adds an "http" span (endpoint template, status, bytes,
+    retries and time spent waiting on the rate limiter or retry backoff),
+    and trace_phase() adds "phase" spans around steps such as resolving a
+    project or fetching blocks. Times are milliseconds since the trace began.
+
+    Attributes:
+        output: "meta" (add to the JSON envelope) or a trace file path
+        name: Script or function name, used for trace file names
+    """
+
+    def __init__(self, output="meta", name="script", started=None):
+        self.output = output
+        self.name = name
+        self.started = time.perf_counter() if started is None else started
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def add(self, name, category, start, end=None, **fields):
+        """Record a span that ran from start to end (perf_counter values)."""
+        end = time.perf_counter() if end is None else end
+        span = {
+            "name": name,
+            "cat": category,
+            "start_ms": round((start - self.started) * 1000, 2),
+            "duration_ms": round((end - start) * 1000, 2),
+            "thread": threading.current_thread().name
+        }
+        span.update(fields)
+        with self.lock:
+            self.spans.append(span)
+
+    def add_request(self, method, url, start, response, retries, waited, error=None):
+        """Record an API call (response is None if it raised)."""
+        self.add(
+            endpoint_template(method, url), "http", start,
+            status=response.status_code if response is not None else None,
+            bytes_sent=response.request_bytes if response is not None else 0,
+            bytes_received=len(response.content) if response is not None else 0,
+            retries=retries,
+            wait_ms=round(waited * 1000, 2),
+            **({"error": error} if error else {})
+        )
+
+    def summary(self):
+        """
+        Summarize the trace for the "_meta.trace" section.
+
+        Returns:
+            dict: Total time, API call totals per endpoint and the spans
+        """
+        with self.lock:
+            spans = sorted(self.spans, key=lambda s: s['start_ms'])
+        http = [s for s in spans if s['cat'] == "http"]
+        by_endpoint = {}
+        for span in http:
+            by_endpoint[span['name']] = by_endpoint.get(span['name'], 0) + 1
+
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+            "http": {
+                "calls": len(http),
+                "retries": sum(s['retries'] for s in http),
+                "errors": sum(1 for s in http if not s['status'] or s['status'] >= 400),
+                "wait_ms": round(sum(s['wait_ms'] for s in http), 2),
+                "bytes_sent": sum(s['bytes_sent'] for s in http),
+                "bytes_received": sum(s['bytes_received'] for s in http),
+                "by_endpoint": by_endpoint
+            },
+            "spans": spans[:MAX_TRACE_SPANS],
+            "spans_dropped": max(0, len(spans) - MAX_TRACE_SPANS)
+        }
+
+    def to_chrome(self):
+        """
+        Convert the trace to Chrome's trace event format.
+
+        The file opens in chrome://tracing, Perfetto or speedscope as a
+        timeline with one row per thread.
+
+        Returns:
+            dict: {"traceEvents": [...]}
+        """
+        with self.lock:
+            spans = list(self.spans)
+        pid = os.getpid()
+        thread_ids = {}
+        events = []
+        for span in spans:
+            tid = thread_ids.setdefault(span['thread'], len(thread_ids) + 1)
+            events.append({
+                "name": span['name'],
+                "cat": span['cat'],
+                "ph": "X",
+                "ts": round(span['start_ms'] * 1000),
+                "dur": round(span['duration_ms'] * 1000),
+                "pid": pid,
+                "tid": tid,
+                "args": {k: v for k, v in span.items()
+                         if k not in ("name", "cat", "start_ms", "duration_ms", "thread")}
+            })
+        for thread, tid in thread_ids.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": thread}})
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+_current_trace = contextvars.ContextVar("notion_skills_trace", default=None)
+
+def trace_output(setting):
+    """
+    Interpret a NOTION_SKILLS_TRACE value.
+
+    Args:
+        setting: "1"/"true"/"meta", a file or directory path, or empty
+
+    Returns:
+        str: "meta", a path, or None if tracing is off
+    """
+    setting = (setting or "").strip()
+    if setting.lower() in ("", "0", "false", "no", "off"):
+        return None
+    if setting.lower() in ("1", "true", "yes", "on", "meta"):
+        return "meta"
+    return setting
+
+def start_trace(output="meta", name="script", started=None):
+    """
+    Start tracing the current invocation (this thread and the workers it starts).
+
+    Args:
+        output: "meta" or a trace file path (see Trace)
+        name: Script or function name
+        started: perf_counter() value the trace begins at (default: now)
+
+    Returns:
+        Trace: The new trace
+    """
+    trace = Trace(output, name, started)
+    _current_trace.set(trace)
+    return trace
+
+def get_trace():
+    """
+    Get the trace of the current invocation.
+
+    Returns:
+        Trace: The active trace, or None when tracing is off
+    """
+    return _current_trace.get()
+
+@contextmanager
+def trace_phase(name):
+    """
+    Record a phase span around a block of code (or a function, as a decorator).
+
+    Does nothing when tracing is off.
+
+    Args:
+        name: Phase name, e.g. "resolve project"
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, "phase", start)
+
+def endpoint_template(method, url):
+    """
+    Get the endpoint of an API URL with IDs replaced, e.g. "GET /blocks/{id}/children".
+
+    Args:
+        method: HTTP method
+        url: Full request URL
+
+    Returns:
+        str: Method and path template
+    """
+    path = url.split('?', 1)[0]
+    if path.startswith(NOTION_BASE_URL):
+        path = path[len(NOTION_BASE_URL):]
+    return f"{method} {_ID_PATTERN.sub('{id}', path)}"
+
+def _finish_trace(result):
+    """End the current trace, adding it to the envelope or writing its file."""
+    trace = _current_trace.get()
+    if trace is None:
+        return result
+    _current_trace.set(None)
+
+    if trace.output == "meta":
+        return dict(result, _meta={"trace": trace.summary()})
+
+    path = trace.output
+    if os.path.isdir(path):
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S-%f')
+        path = os.path.join(path, f"trace-{trace.name}-{stamp}.json")
+    try:
+        write_json_atomic(path, trace.to_chrome())
+    except OSError as e:
+        print(f"Failed to write trace file {path}: {str(e)}", file=sys.stderr)
+    return result
+
+def _process_started():
+    """
+    Get the perf_counter() value at which this process started.
+
+    Read from /proc on Linux (10 ms resolution); elsewhere the time
+    common.py was imported is used instead.
+    """
+    try:
+        with open('/proc/self/stat') as f:
+            start_ticks = int(f.read().rsplit(')', 1)[1].split()[19])
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        age = uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+        return time.perf_counter() - max(age, 0.0)
+    except (OSError, ValueError, IndexError):
+        return time.perf_counter()
+
+_started = _process_started()
+
+# A script run from the command line is traced from process start, so the
+# first span shows interpreter startup and imports
+if trace_output(TRACE_SETTING):
+    start_trace(
+        trace_output(TRACE_SETTING),
+        name=os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0],
+        started=_started
+    ).add("startup", "phase", _started)
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+class RunMetrics:
+    """
+    Counters of one script invocation, appended to the metrics log at its end.
+
+    Unlike a Trace, only totals are kept, so metrics are always on.
+
+    Attributes:
+        script: Script (module) name
+        args: Option names the script was run with, without their values
+        via: "cli" or "in_process" (run_captured, e.g. the gateway)
+    """
+
+    COUNTERS = ("api_calls", "retries", "throttled", "timeouts", "errors", "bytes_sent", "bytes_received")
+
+    def __init__(self, script, args, via="cli", started=None):
+        self.script = script
+        self.args = args
+        self.via = via
+        self.started = time.perf_counter() if started is None else started
+        self.counts = dict.fromkeys(self.COUNTERS, 0)
+        self.endpoints = {}
+        self.status = None
+        self.exit_code = None
+        self.lock = threading.Lock()
+
+    def add_request(self, method, url, response, retries, throttled, timed_out=False):
+        """Count an API call (response is None if it raised)."""
+        endpoint = endpoint_template(method, url)
+        with self.lock:
+            self.counts['api_calls'] += 1
+            self.counts['retries'] += retries
+            self.counts['throttled'] += throttled
+            self.counts['timeouts'] += int(timed_out)
+            self.counts['errors'] += int(response is None or response.status_code >= 400)
+            self.counts['bytes_sent'] += response.request_bytes if response is not None else 0
+            self.counts['bytes_received'] += len(response.content) if response is not None else 0
+            self.endpoints[endpoint] = self.endpoints.get(endpoint, 0) + 1
+
+    def finish(self, status, exit_code):
+        """Set the outcome ("success", "error", "exception", ...) unless already set."""
+        if self.status is None:
+            self.status = status
+            self.exit_code = exit_code
+
+    def record(self):
+        """
+        Build the metrics log record.
+
+        Returns:
+            dict: {"ts", "script", "args", "via", "wall_ms", "status",
+                "exit_code", counters..., "endpoints"}
+        """
+        with self.lock:
+            record = {
+                "ts": datetime.now().astimezone().isoformat(timespec='seconds'),
+                "script": self.script,
+                "args": self.args,
+                "via": self.via,
+                "wall_ms": round((time.perf_counter() - self.started) * 1000, 1),
+                "status": self.status or "exit",
+                "exit_code": self.exit_code
+            }
+            record.update(self.counts)
+            record["endpoints"] = dict(self.endpoints)
+        return record
+
+_current_metrics = contextvars.ContextVar("notion_skills_metrics", default=None)
+
+def metrics_log_path():
+    """
+    Get the metrics log file.
+
+    Returns:
+        str: Path from NOTION_SKILLS_METRICS, the default file in the cache
+            directory, or None if metrics are turned off
+    """
+    setting = METRICS_SETTING.strip()
+    if setting.lower() in ("0", "false", "no", "off"):
+        return None
+    if setting and setting.lower() not in ("1", "true", "yes", "on"):
+        return setting
+    return os.path.join(CACHE_DIR, METRICS_FILE)
+
+def start_metrics(script, args, via="cli", started=None):
+    """
+    Start counting the current invocation (this thread and the workers it starts).
+
+    Returns:
+        RunMetrics: The new counters
+    """
+    metrics = RunMetrics(script, args, via, started)
+    _current_metrics.set(metrics)
+    return metrics
+
+def get_metrics():
+    """
+    Get the metrics of the current invocation.
+
+    Returns:
+        RunMetrics: The active counters, or None
+    """
+    return _current_metrics.get()
+
+def discard_metrics():
+    """Don't log the current invocation (e.g. the metrics report itself)."""
+    global _process_metrics
+    if _current_metrics.get() is _process_metrics:
+        _process_metrics = None
+    _current_metrics.set(None)
+
+def args_shape(argv):
+    """
+    Get the option names of a command line, leaving out all values.
+
+    Args:
+        argv: Arguments, e.g. ["--id", "abc", "--format=summary"]
+
+    Returns:
+        list: Sorted option names, e.g. ["--format", "--id"]
+    """
+    names = set()
+    for arg in argv:
+        if arg.startswith('--'):
+            names.add(arg.split('=', 1)[0])
+        elif arg.startswith('-') and len(arg) > 1 and not arg[1].isdigit():
+            names.add(arg[:2])
+    return sorted(names)
+
+def append_metrics(record, path=None):
+    """
+    Append a record to the metrics log, rotating the log when it gets large.
+
+    The log is rotated like logging's RotatingFileHandler (metrics.jsonl.1
+    is the newest old file). Errors are ignored: metrics never make a
+    script fail.
+
+    Args:
+        record: Metrics record
+        path: Log file (default: metrics_log_path())
+    """
+    path = path or metrics_log_path()
+    if not path:
+        return
+    line = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        try:
+            if os.path.getsize(path) + len(line) > METRICS_MAX_BYTES:
+                for index in range(METRICS_BACKUPS - 1, 0, -1):
+                    if os.path.exists(f"{path}.{index}"):
+                        os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+                os.replace(path, f"{path}.1")
+        except OSError:
+            # Not there yet, or another process rotated it first
+            pass
+        # One O_APPEND write per record, so concurrent runs don't interleave
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+_in_process_runs = False
+
+def _write_process_metrics():
+    metrics = _process_metrics
+    # A process that served in-process runs (the gateway) logged those instead
+    if metrics and not _in_process_runs:
+        append_metrics(metrics.record())
+
+def _metrics_excepthook(exc_type, exc, tb):
+    if _process_metrics:
+        _process_metrics.finish(f"exception:{exc_type.__name__}", 1)
+    _previous_excepthook(exc_type, exc, tb)
+
+# Scripts run from the command line (from this directory) are measured from
+# process start and logged when the process exits
+_process_metrics = None
+_previous_excepthook = sys.excepthook
+if (metrics_log_path() and sys.argv[0] and
+        os.path.dirname(os.path.abspath(sys.argv[0])) == os.path.dirname(os.path.abspath(__file__))):
+    _process_metrics = start_metrics(
+        os.path.splitext(os.path.basename(sys.argv[0]))[0],
+        args_shape(sys.argv[1:]),
+        started=_started
+    )
+    sys.excepthook = _metrics_excepthook
+    atexit.register(_write_process_metrics)
+
 # ============================================================================
 # OUTPUT FORMATTING
 # ============================================================================
 
+class ScriptExit(SystemExit):
+    """
+    Raised by output_success/output_error to end a script.
+
+    Behaves exactly like sys.exit() for command-line use, and carries the
+    JSON envelope so that long-running callers (the HTTP gateway) can run
+    script functions in-process and return the result.
+
+    Attributes:
+        result: The {"success": ..., "data"/"error": ...} envelope
+    """
+
+    def __init__(self, code, result):
+        super().__init__(code)
+        self.result = result
+
+_output_state = threading.local()
+
+def run_captured(func, *args, **kwargs):
+    """
+    Run a script function without printing, returning its JSON envelope.
+
+    Capture is per thread, so concurrent callers don't interfere. Each call
+    runs in its own context: with NOTION_SKILLS_TRACE set (or a trace
+    started by the caller), it gets a trace of its own.
+
+    Args:
+        func: Script function that ends with output_success/output_error
+        *args, **kwargs: Passed to func
+
+    Returns:
+        dict: The envelope func would have printed
+    """
+    return contextvars.copy_context().run(_run_captured, func, *args, **kwargs)
+
+def _run_captured(func, *args, **kwargs):
+    global _in_process_runs
+    _in_process_runs = True
+
+    output = trace_output(TRACE_SETTING)
+    if output and get_trace() is None:
+        start_trace(output, name=func.__name__)
+    metrics = None
+    if metrics_log_path():
+        used = sorted(k for k, v in kwargs.items() if v not in (None, False, "", []))
+        metrics = start_metrics(func.__module__, used, via="in_process")
+
+    _output_state.capture = True
+    try:
+        func(*args, **kwargs)
+        return _finish_run({"success": False, "error": f"{func.__name__} returned without a result"}, 1)
+    except ScriptExit as e:
+        return e.result
+    finally:
+        _output_state.capture = False
+        if metrics:
+            metrics.finish("exception", 1)
+            append_metrics(metrics.record())
+
+def _finish_run(result, code):
+    """Record the outcome of the current invocation and end its trace."""
+    metrics = get_metrics()
+    if metrics:
+        metrics.finish("success" if code == 0 else "error", code)
+    return _finish_trace(result)
+
+def _emit(result, code):
+    result = _finish_run(result, code)
+    if not getattr(_output_state, 'capture', False):
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    raise ScriptExit(code, result)
+
 def output_success(data):
     """
     Output successful JSON response and exit.
@@ -141,8 +1255,7 @@ def output_success(data):
         data: Dictionary to output as JSON
     """
     result = {"success": True, "data": data}
-    print(json.dumps(result, indent=2, ensure_ascii=False))
-    sys.exit(0)
+    _emit(result, 0)
 
 def output_error(message, details=None):
     """
@@ -155,8 +1268,7 @@ def output_error(message, details=None):
     result = {"success": False, "error": message}
     if details:
         result["details"] = details
-    print(json.dumps(result, indent=2, ensure_ascii=False))
-    sys.exit(1)
+    _emit(result, 1)
 
 # ============================================================================
 # FILTER BUILDERS
@@ -209,6 +1321,22 @@ def build_title_filter(search_term):
         "title": {"contains": search_term}
     }
 
+def build_timestamp_filter(timestamp, before):
+    """
+    Build filter for pages created or edited before a date.
+
+    Args:
+        timestamp: "created_time" or "last_edited_time"
+        before: ISO 8601 date or date-time
+
+    Returns:
+        dict: Filter object
+    """
+    return {
+        "timestamp": timestamp,
+        timestamp: {"before": before}
+    }
+
 def combine_filters(*filters):
     """
     Combine multiple filters with AND logic.
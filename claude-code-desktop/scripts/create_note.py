@@ -8,136 +8,27 @@ allowing the user to manually connect it to projects in Notion.
 """
 
 import argparse
-import requests
 import sys
-import time
-from common import (
-    NOTES_DB_ID, NOTION_BASE_URL, get_headers,
-    output_success, output_error
-)
+from common import ApiError, output_success, output_error
+from notes import create_note_page
+from markdown_blocks import open_markdown, iter_markdown_blocks
+from blocks import stream_block_batches, append_block_batches
 
-def parse_markdown_to_blocks(content):
+def create_page(title, children):
     """
-    Parse markdown-like text into Notion blocks.
+    Create the note page, with up to 100 initial content blocks.
 
     Args:
-        content: Text content to parse
+        title: Title of the note
+        children: Initial block objects (at most 100)
 
     Returns:
-        list: List of block objects
+        dict: The created page object
     """
-    blocks = []
-    lines = content.split('\n')
-    i = 0
-
-    while i < len(lines):
-        line = lines[i]
-
-        # Check for code block
-        if line.strip().startswith('```'):
-            language = line.strip()[3:].strip() or 'plain text'
-            code_lines = []
-            i += 1
-            while i < len(lines) and not lines[i].strip().startswith('```'):
-                code_lines.append(lines[i])
-                i += 1
-            i += 1  # Skip closing ```
-
-            blocks.append({
-                "object": "block",
-                "type": "code",
-                "code": {
-                    "rich_text": [{"type": "text", "text": {"content": '\n'.join(code_lines)}}],
-                    "language": language
-                }
-            })
-            continue
-
-        # Check for heading 1
-        if line.startswith('# '):
-            blocks.append({
-                "object": "block",
-                "type": "heading_1",
-                "heading_1": {
-                    "rich_text": [{"type": "text", "text": {"content": line[2:]}}]
-                }
-            })
-            i += 1
-            continue
-
-        # Check for heading 2
-        if line.startswith('## '):
-            blocks.append({
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [{"type": "text", "text": {"content": line[3:]}}]
-                }
-            })
-            i += 1
-            continue
-
-        # Check for heading 3
-        if line.startswith('### '):
-            blocks.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [{"type": "text", "text": {"content": line[4:]}}]
-                }
-            })
-            i += 1
-            continue
-
-        # Check for bulleted list
-        if line.startswith('- ') or line.startswith('* '):
-            blocks.append({
-                "object": "block",
-                "type": "bulleted_list_item",
-                "bulleted_list_item": {
-                    "rich_text": [{"type": "text", "text": {"content": line[2:]}}]
-                }
-            })
-            i += 1
-            continue
-
-        # Check for numbered list
-        import re
-        if re.match(r'^\d+\.\s', line):
-            match = re.match(r'^\d+\.\s(.*)$', line)
-            if match:
-                blocks.append({
-                    "object": "block",
-                    "type": "numbered_list_item",
-                    "numbered_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": match.group(1)}}]
-                    }
-                })
-            i += 1
-            continue
-
-        # Check for divider
-        if line.strip() in ('---', '***', '___'):
-            blocks.append({
-                "object": "block",
-                "type": "divider",
-                "divider": {}
-            })
-            i += 1
-            continue
-
-        # Otherwise, treat as paragraph (skip empty lines)
-        if line.strip():
-            blocks.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [{"type": "text", "text": {"content": line}}]
-                }
-            })
-        i += 1
-
-    return blocks
+    try:
+        return create_note_page(title, children)
+    except ApiError as e:
+        output_error(f"API request failed: {str(e)}")
 
 def create_note(title, content=None, content_file=None):
     """
@@ -151,68 +42,37 @@ def create_note(title, content=None, content_file=None):
     if not title or not title.strip():
         output_error("Title is required")
 
-    headers = get_headers()
-
-    # Get content from file or argument
-    if content_file:
-        try:
-            with open(content_file, 'r') as f:
-                content = f.read()
-        except Exception as e:
-            output_error(f"Failed to read content file: {str(e)}")
-
-    # Parse content into blocks if provided
-    children = []
-    if content:
-        children = parse_markdown_to_blocks(content)
-
-    # Build page creation payload
-    page_data = {
-        "parent": {
-            "database_id": NOTES_DB_ID
-        },
-        "properties": {
-            "Name": {
-                "title": [
-                    {
-                        "type": "text",
-                        "text": {
-                            "content": title.strip()
-                        }
-                    }
-                ]
-            },
-            "Archived": {
-                "checkbox": False
-            }
-        }
-    }
-
-    # Add children (content blocks) if any
-    if children:
-        page_data["children"] = children
-
-    # Create the page
-    url = f"{NOTION_BASE_URL}/pages"
-
+    # Content is parsed lazily into 100-block batches in the background: the
+    # first batch is sent with the page, the rest are appended as they arrive
     try:
-        response = requests.post(url, headers=headers, json=page_data, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        output_error(f"API request failed: {str(e)}")
-
-    page = response.json()
-    note_id = page.get('id')
+        with open_markdown(content, content_file) as lines:
+            batches = stream_block_batches(iter_markdown_blocks(lines))
+            try:
+                first_batch = next(batches, [])
+            except (OSError, ValueError) as e:
+                output_error(f"Failed to read content file: {str(e)}")
+            page = create_page(title, first_batch)
+            blocks_created = len(first_batch)
+
+            try:
+                blocks_created += append_block_batches(page['id'], batches)
+            except (ApiError, OSError, ValueError) as e:
+                output_error(
+                    f"Note created, but adding its content failed: {str(e)}",
+                    {"note_id": page['id'], "blocks_created": blocks_created}
+                )
+    except OSError as e:
+        output_error(f"Failed to read content file: {str(e)}")
 
     output_success({
         "action": "create",
         "note": {
-            "id": note_id,
+            "id": page.get('id'),
             "name": title.strip(),
             "url": page.get('url', '')
         },
         "content": {
-            "blocks_created": len(children)
+            "blocks_created": blocks_created
         }
     })
 
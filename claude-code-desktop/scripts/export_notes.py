@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Export the whole Notes database to markdown files or a JSONL archive.
+
+Notes are paged through oldest edit first and their block trees are fetched
+several notes at a time (from the block cache when it is current), then
+rendered exactly like `read_note.py --format text-only`.
+
+A state file records each exported note's last_edited_time, so later runs
+only fetch notes that changed. It also holds a watermark that advances as
+notes are written, in edit order, and is saved every few dozen notes: an
+interrupted export resumes from the watermark instead of starting over.
+
+Output formats:
+- markdown: one "<title> <id>.md" file per note with YAML front matter
+  (state in .notion-export.json inside the directory)
+- jsonl: one {"id", "title", "content", ...} record per line, the same
+  shape import_notes.py reads (state in <file>.state.json). Re-exported
+  notes are appended during a run and the file is compacted at the end;
+  if a run is interrupted, the last line for an ID wins.
+"""
+
+import argparse
+import json
+import os
+import re
+import threading
+from common import (
+    ApiError, MAX_CONCURRENCY, combine_filters, build_archived_filter, iter_concurrent,
+    extract_title, read_json_file, write_json_atomic,
+    output_success, output_error
+)
+from notes import is_archived, iter_notes
+from blocks import fetch_block_tree, blocks_to_markdown
+import block_cache
+
+EXPORT_STATE_FILE = ".notion-export.json"
+
+# Exported notes between state file saves
+STATE_SAVE_INTERVAL = 50
+
+# Longest title kept in a markdown file name
+MAX_FILENAME_TITLE = 80
+
+UNSAFE_FILENAME_CHARS = re.compile(r'[\x00-\x1f/\\:*?"<>|]+')
+
+# Failures listed in the result (the count always covers all of them)
+MAX_REPORTED_FAILURES = 50
+
+def note_filename(note_id, title):
+    """
+    Build a stable, filesystem-safe markdown file name for a note.
+
+    Args:
+        note_id: Note ID (keeps names unique)
+        title: Note title
+
+    Returns:
+        str: "<title> <id without dashes>.md"
+    """
+    safe_title = " ".join(UNSAFE_FILENAME_CHARS.sub(" ", title).split())
+    safe_title = safe_title[:MAX_FILENAME_TITLE].strip(" .") or "Untitled"
+    return f"{safe_title} {note_id.replace('-', '')}.md"
+
+def note_record(page, content):
+    """
+    Build the export record of a note.
+
+    Args:
+        page: Note page object
+        content: Note content as markdown
+
+    Returns:
+        dict: {"id", "title", "created", "updated", "archived", "project_ids", "content"}
+    """
+    relations = page.get('properties', {}).get('Project', {}).get('relation', [])
+    return {
+        "id": page['id'],
+        "title": extract_title(page),
+        "created": page.get('created_time'),
+        "updated": page.get('last_edited_time'),
+        "archived": is_archived(page),
+        "project_ids": [r.get('id') for r in relations],
+        "content": content
+    }
+
+def render_markdown_file(record):
+    """Render an export record as a markdown document with YAML front matter."""
+    front_matter = [
+        "---",
+        f"id: {record['id']}",
+        f"title: {json.dumps(record['title'], ensure_ascii=False)}",
+        f"created: {record['created']}",
+        f"updated: {record['updated']}",
+        f"archived: {'true' if record['archived'] else 'false'}",
+        f"project_ids: {json.dumps(record['project_ids'])}",
+        "---",
+        ""
+    ]
+    body = record['content']
+    return "\n".join(front_matter) + (body + "\n" if body else "")
+
+class MarkdownExport:
+    """Writes one markdown file per note into a directory."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.state_path = os.path.join(directory, EXPORT_STATE_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+    def exists(self, entry):
+        return os.path.exists(os.path.join(self.directory, entry['file']))
+
+    def write(self, record, previous=None):
+        filename = note_filename(record['id'], record['title'])
+        path = os.path.join(self.directory, filename)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(render_markdown_file(record))
+        os.replace(tmp_path, path)
+
+        # A renamed note gets a new file name
+        if previous and previous.get('file') and previous['file'] != filename:
+            self.remove(previous)
+        return filename
+
+    def remove(self, entry):
+        try:
+            os.remove(os.path.join(self.directory, entry['file']))
+        except FileNotFoundError:
+            pass
+
+    def finish(self):
+        pass
+
+class JsonlExport:
+    """Appends note records to a JSONL archive, compacting it when done."""
+
+    def __init__(self, path):
+        self.path = path
+        self.state_path = f"{path}.state.json"
+        self.removed = set()
+        self.appended = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def exists(self, entry):
+        return True
+
+    def write(self, record, previous=None):
+        self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.file.flush()
+        self.appended = True
+        return None
+
+    def remove(self, entry):
+        self.removed.add(entry['id'])
+
+    def finish(self):
+        self.file.close()
+        if self.appended or self.removed:
+            compact_jsonl(self.path, self.removed)
+
+def compact_jsonl(path, removed_ids=()):
+    """
+    Keep only the last record per ID in a JSONL archive.
+
+    Streams the file twice, so memory holds one line number per note.
+
+    Args:
+        path: JSONL archive
+        removed_ids: IDs to drop entirely
+    """
+    last_line = {}
+    with open(path, encoding='utf-8') as f:
+        for number, line in enumerate(f):
+            try:
+                last_line[json.loads(line)['id']] = number
+            except (ValueError, KeyError, TypeError):
+                continue
+
+    tmp_path = f"{path}.tmp"
+    with open(path, encoding='utf-8') as src, open(tmp_path, 'w', encoding='utf-8') as dst:
+        for number, line in enumerate(src):
+            try:
+                note_id = json.loads(line)['id']
+            except (ValueError, KeyError, TypeError):
+                continue
+            if last_line.get(note_id) == number and note_id not in removed_ids:
+                dst.write(line)
+    os.replace(tmp_path, path)
+
+def fetch_note_markdown(page):
+    """
+    Get a note's content as markdown, like read_note.py --format text-only.
+
+    A current copy in the block cache is used; fetched trees are not added
+    to it, so an export doesn't evict the notes being worked on.
+
+    Args:
+        page: Note page object
+
+    Returns:
+        str: Markdown content
+
+    Raises:
+        ApiError: If fetching the blocks fails
+    """
+    blocks = block_cache.get_blocks(page['id'], page.get('last_edited_time'))
+    if blocks is None:
+        blocks = fetch_block_tree(page['id'])
+    return blocks_to_markdown(blocks)
+
+def export_notes(output, format="markdown", full=False, include_archived=True,
+                 max_workers=MAX_CONCURRENCY):
+    """
+    Export the Notes database, fetching only notes changed since the last export.
+
+    Args:
+        output: Directory (markdown) or file path (jsonl)
+        format: "markdown" or "jsonl"
+        full: If True, check every note (not just those edited since the
+            watermark) and remove notes that no longer exist from the export
+        include_archived: If False, leave out notes with Archived checked
+        max_workers: Maximum number of notes fetched at once
+    """
+    try:
+        writer = JsonlExport(output) if format == "jsonl" else MarkdownExport(output)
+    except OSError as e:
+        output_error(f"Failed to open export output: {str(e)}")
+
+    state = read_json_file(writer.state_path, {})
+    notes_state = state.get('notes', {})
+    watermark = state.get('watermark')
+
+    def save_state():
+        write_json_atomic(writer.state_path, {"watermark": watermark, "notes": notes_state})
+
+    # Oldest edit first, so the watermark can advance as notes are written.
+    # Edit times have minute precision: on_or_after re-reads the watermark's
+    # minute, and unchanged notes in it are skipped below
+    edited_filter = None
+    if watermark and not full:
+        edited_filter = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": watermark}}
+    query_filter = combine_filters(edited_filter, build_archived_filter(include_archived))
+    sorts = [{"timestamp": "last_edited_time", "direction": "ascending"}]
+
+    def export_page(page):
+        entry = notes_state.get(page['id'])
+        if entry and entry['updated'] == page.get('last_edited_time') and writer.exists(entry):
+            return page, None, None
+        try:
+            return page, fetch_note_markdown(page), None
+        except ApiError as e:
+            return page, None, str(e)
+
+    counts = {"exported": 0, "unchanged": 0, "failed": 0, "removed": 0}
+    failures = []
+    seen = set()
+    advancing = True
+    unsaved = 0
+    completed = False
+    query_error = None
+
+    try:
+        for page, content, error in iter_concurrent(export_page, iter_notes(query_filter, sorts), max_workers):
+            seen.add(page['id'])
+            if error:
+                # The watermark must stay before a note that wasn't exported
+                advancing = False
+                counts['failed'] += 1
+                if len(failures) < MAX_REPORTED_FAILURES:
+                    failures.append({"id": page['id'], "title": extract_title(page), "error": error})
+                continue
+
+            if content is None:
+                counts['unchanged'] += 1
+            else:
+                record = note_record(page, content)
+                filename = writer.write(record, notes_state.get(page['id']))
+                notes_state[page['id']] = {"updated": page.get('last_edited_time'), "file": filename}
+                counts['exported'] += 1
+                unsaved += 1
+
+            if advancing:
+                watermark = page.get('last_edited_time') or watermark
+            if unsaved >= STATE_SAVE_INTERVAL:
+                save_state()
+                unsaved = 0
+        completed = True
+    except ApiError as e:
+        query_error = str(e)
+    except OSError as e:
+        query_error = f"Failed to write export: {str(e)}"
+
+    # A full pass that saw every note can drop notes deleted from Notion
+    if completed and full and not counts['failed']:
+        for note_id in [n for n in notes_state if n not in seen]:
+            writer.remove(dict(notes_state.pop(note_id), id=note_id))
+            counts['removed'] += 1
+
+    try:
+        writer.finish()
+        save_state()
+    except OSError as e:
+        output_error(f"Failed to save export: {str(e)}", counts)
+
+    result = {
+        "action": "export",
+        "format": format,
+        "output": output,
+        "watermark": watermark,
+        "total_exported_notes": len(notes_state)
+    }
+    result.update(counts)
+    result["failures"] = failures
+
+    if not completed:
+        output_error(f"Export interrupted: {query_error}. Run again to resume.", result)
+
+    output_success(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export the Ultimate Brain Notes database to markdown files or JSONL"
+    )
+    parser.add_argument("output", help="Output directory (markdown) or .jsonl file (jsonl)")
+    parser.add_argument("--format", choices=["markdown", "jsonl"], default="markdown",
+                        help="Output format (default: markdown)")
+    parser.add_argument("--full", action="store_true",
+                        help="Check every note and remove deleted notes from the export")
+    parser.add_argument("--skip-archived", action="store_true",
+                        help="Leave out notes with the Archived property checked")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENCY,
+                        help=f"Notes fetched at once (default: {MAX_CONCURRENCY})")
+
+    args = parser.parse_args()
+
+    export_notes(
+        output=args.output,
+        format=args.format,
+        full=args.full,
+        include_archived=not args.skip_archived,
+        max_workers=max(1, args.workers)
+    )
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Long-running HTTP gateway for the Notion skill scripts.
+
+n8n workflows can call this service with an HTTP Request node instead of
+spawning python3 for every tool call. The process keeps its pooled Notion
+connections, rate limiter and project-name cache warm between requests, and
+answers with the same JSON envelope the scripts print.
+
+Endpoints (POST with a JSON body using the n8n webhook field names):
+    /search    query, project_id, project_name, include_archived, limit, body, local
+    /read      id, name, project_name, format, no_cache; or ids, names (several notes)
+    /list      project_id, project_name, include_archived, limit, local
+    /projects  name, exact, include_archived, limit, local
+    /create    title, content
+    /edit      id, name, project_name, action, content
+    /archive   id, name, project_name, action; bulk mode: ids, or "bulk": true
+               with project_id, project_name, created_before, edited_before,
+               title_pattern; limit, dry_run
+    /combine   source_ids, target_id, create_new, no_preserve_titles,
+               no_archive, no_separator
+GET /health returns {"success": true, "data": {"status": "ok", ...}}.
+Add "trace": true to any body to get a "_meta.trace" section with the
+request's API calls and phases (see NOTION_SKILLS_TRACE in common.py).
+
+Usage:
+    python3 gateway.py --host 127.0.0.1 --port 8765
+"""
+
+import argparse
+import contextvars
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from common import run_captured, start_trace
+import projects
+import search_notes
+import search_projects
+import read_note
+import list_project_notes
+import create_note
+import edit_note
+import archive_note
+import combine_notes
+
+DEFAULT_PORT = 8765
+
+# Seconds before memoized project names are dropped, so renames show up
+GATEWAY_CACHE_TTL = 300
+
+# Largest accepted request body (note content included)
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+def handle_search(body):
+    if body.get('body'):
+        return run_captured(
+            search_notes.search_note_bodies,
+            query=body.get('query', ''),
+            project_id=body.get('project_id'),
+            project_name=body.get('project_name'),
+            include_archived=bool(body.get('include_archived')),
+            limit=int(body.get('limit') or 10)
+        )
+    return run_captured(
+        search_notes.search_notes,
+        query=body.get('query', ''),
+        project_id=body.get('project_id'),
+        project_name=body.get('project_name'),
+        include_archived=bool(body.get('include_archived')),
+        limit=int(body.get('limit') or 10),
+        use_project_map=bool(body.get('project_map')),
+        local=bool(body.get('local'))
+    )
+
+def handle_read(body):
+    if not body.get('id') and not body.get('name') and (body.get('ids') or body.get('names')):
+        ids = body.get('ids') or []
+        if isinstance(ids, str):
+            ids = ids.split()
+        names = body.get('names') or []
+        if isinstance(names, str):
+            names = [names]
+        return run_captured(
+            read_note.read_notes,
+            [{"id": note_id} for note_id in ids] + [{"name": name} for name in names],
+            project_name=body.get('project_name'),
+            format=body.get('format') or 'full',
+            use_cache=not body.get('no_cache')
+        )
+    return run_captured(
+        read_note.read_note,
+        note_id=body.get('id'),
+        note_name=body.get('name'),
+        project_name=body.get('project_name'),
+        format=body.get('format') or 'full',
+        use_cache=not body.get('no_cache')
+    )
+
+def handle_list(body):
+    return run_captured(
+        list_project_notes.list_project_notes,
+        project_id=body.get('project_id'),
+        project_name=body.get('project_name'),
+        include_archived=bool(body.get('include_archived')),
+        limit=int(body.get('limit') or 100),
+        local=bool(body.get('local'))
+    )
+
+def handle_projects(body):
+    return run_captured(
+        search_projects.search_projects,
+        name=body.get('name', ''),
+        exact_match=bool(body.get('exact')),
+        include_archived=bool(body.get('include_archived')),
+        limit=int(body.get('limit') or 10),
+        local=bool(body.get('local'))
+    )
+
+def handle_create(body):
+    return run_captured(
+        create_note.create_note,
+        title=body.get('title'),
+        content=body.get('content')
+    )
+
+def handle_edit(body):
+    return run_captured(
+        edit_note.edit_note,
+        note_id=body.get('id'),
+        note_name=body.get('name'),
+        project_name=body.get('project_name'),
+        action=body.get('action') or 'append',
+        content=body.get('content')
+    )
+
+# Filters that select notes in bulk archive mode; they need "bulk": true, so
+# a project_name sent to narrow a name lookup never archives a whole project
+BULK_ARCHIVE_FILTERS = ('project_id', 'project_name', 'created_before', 'edited_before', 'title_pattern')
+
+def handle_archive(body):
+    if not body.get('id') and not body.get('name') and (body.get('ids') or body.get('bulk')):
+        if not body.get('ids') and not any(body.get(key) for key in BULK_ARCHIVE_FILTERS):
+            return {"success": False, "error": "Bulk archive needs ids or at least one filter"}
+        ids = body.get('ids') or None
+        if isinstance(ids, str):
+            ids = ids.split()
+        return run_captured(
+            archive_note.bulk_archive,
+            note_ids=ids,
+            project_id=body.get('project_id'),
+            project_name=body.get('project_name'),
+            created_before=body.get('created_before'),
+            edited_before=body.get('edited_before'),
+            title_pattern=body.get('title_pattern'),
+            action=body.get('action') or 'archive',
+            limit=int(body['limit']) if body.get('limit') else None,
+            dry_run=bool(body.get('dry_run'))
+        )
+    return run_captured(
+        archive_note.archive_note,
+        note_id=body.get('id'),
+        note_name=body.get('name'),
+        project_name=body.get('project_name'),
+        action=body.get('action') or 'archive'
+    )
+
+def handle_combine(body):
+    source_ids = body.get('source_ids') or []
+    if isinstance(source_ids, str):
+        source_ids = source_ids.split()
+    return run_captured(
+        combine_notes.combine_notes,
+        source_ids=source_ids,
+        target_id=body.get('target_id'),
+        new_note_title=body.get('create_new'),
+        preserve_titles=not body.get('no_preserve_titles'),
+        archive_sources=not body.get('no_archive'),
+        separator=not body.get('no_separator')
+    )
+
+ROUTES = {
+    "/search": handle_search,
+    "/read": handle_read,
+    "/list": handle_list,
+    "/projects": handle_projects,
+    "/create": handle_create,
+    "/edit": handle_edit,
+    "/archive": handle_archive,
+    "/combine": handle_combine,
+}
+
+class CacheClock:
+    """Drops warm per-process caches once they are older than the TTL."""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.reset_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def tick(self):
+        with self.lock:
+            if time.monotonic() - self.reset_at < self.ttl:
+                return
+            self.reset_at = time.monotonic()
+        projects.clear_project_names()
+
+def run_handler(handler, body):
+    """Run a route handler, tracing it into "_meta.trace" if the body asks for it."""
+    if body.get('trace'):
+        start_trace("meta", name=handler.__name__)
+    return handler(body)
+
+def make_handler(cache_clock, token=None):
+    """Build the request handler class bound to this gateway's settings."""
+    started_at = time.time()
+
+    class GatewayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "NotionGateway/1.0"
+
+        def log_message(self, format, *args):
+            sys.stderr.write(f"[gateway] {self.address_string()} {format % args}\n")
+
+        def _send(self, status, envelope):
+            data = json.dumps(envelope, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self):
+            return not token or self.headers.get('X-Gateway-Token') == token
+
+        def do_GET(self):
+            if self.path != "/health":
+                return self._send(404, {"success": False, "error": f"Unknown endpoint: {self.path}"})
+            self._send(200, {"success": True, "data": {
+                "status": "ok",
+                "uptime_seconds": round(time.time() - started_at),
+                "endpoints": sorted(ROUTES)
+            }})
+
+        def do_POST(self):
+            # Always drain the body so a rejected request can't desync keep-alive
+            length = int(self.headers.get('Content-Length') or 0)
+            if length > MAX_BODY_BYTES:
+                self.close_connection = True
+                return self._send(413, {"success": False, "error": "Request body too large"})
+            raw = self.rfile.read(length)
+
+            if not self._authorized():
+                return self._send(401, {"success": False, "error": "Invalid or missing X-Gateway-Token"})
+
+            handler = ROUTES.get(self.path.rstrip('/'))
+            if handler is None:
+                return self._send(404, {"success": False, "error": f"Unknown endpoint: {self.path}"})
+
+            try:
+                body = json.loads(raw or b'{}')
+            except ValueError as e:
+                return self._send(400, {"success": False, "error": f"Invalid JSON body: {str(e)}"})
+            if not isinstance(body, dict):
+                return self._send(400, {"success": False, "error": "JSON body must be an object"})
+
+            cache_clock.tick()
+            try:
+                envelope = contextvars.copy_context().run(run_handler, handler, body)
+            except (TypeError, ValueError) as e:
+                envelope = {"success": False, "error": f"Invalid request: {str(e)}"}
+            except Exception as e:
+                return self._send(500, {"success": False, "error": f"Internal error: {str(e)}"})
+
+            self._send(200 if envelope.get('success') else 422, envelope)
+
+    return GatewayHandler
+
+def create_gateway(host="127.0.0.1", port=DEFAULT_PORT, token=None, cache_ttl=GATEWAY_CACHE_TTL):
+    """
+    Create the gateway server (call serve_forever() to run it).
+
+    Returns:
+        ThreadingHTTPServer
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(CacheClock(cache_ttl), token))
+    server.daemon_threads = True
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Serve the Notion skill scripts over HTTP for n8n"
+    )
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    parser.add_argument("--token", help="Require this value in the X-Gateway-Token header")
+    parser.add_argument("--cache-ttl", type=int, default=GATEWAY_CACHE_TTL,
+                        help="Seconds before cached project names are refreshed")
+
+    args = parser.parse_args()
+
+    server = create_gateway(args.host, args.port, args.token, args.cache_ttl)
+    sys.stderr.write(f"[gateway] Listening on http://{args.host}:{args.port}\n")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Import a Google Keep Takeout export into the Notes database.
+
+Takeout stores every Keep note as a JSON file (and an HTML copy) in its
+"Keep" folder. The export is read one note at a time, straight from the
+Takeout .zip or an extracted folder; the HTML copy is only parsed for notes
+that have no JSON file. Each note is mapped onto the page format of
+create_note.py:
+- text content is converted like create_note.py content
+- checklist items become to_do blocks (checked state kept)
+- links saved on the note become linked paragraphs
+- archived notes get Archived checked; trashed notes are skipped
+- labels go to a multi-select property (--label-property), or a
+  "Labels:" line at the end of the note
+
+Pages are created concurrently with the same checkpointing as
+import_notes.py, so an interrupted import can be re-run safely.
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import zipfile
+from html.parser import HTMLParser
+from common import MAX_CONCURRENCY, output_success, output_error
+from markdown_blocks import iter_markdown_blocks, make_blocks, make_rich_text
+from import_notes import ImportCheckpoint, default_checkpoint_path, import_records
+
+# Longest title taken from the start of an untitled note
+MAX_TITLE_LENGTH = 100
+
+# Checked and unchecked boxes in Keep's HTML checklists
+CHECKED_BULLET = '☑'
+
+class KeepHtmlParser(HTMLParser):
+    """
+    Extract a Keep note from its Takeout HTML file.
+
+    Produces the same fields as the JSON export: title, textContent,
+    listContent, labels, isArchived and isTrashed.
+    """
+
+    VOID_TAGS = ('br', 'img', 'input', 'meta', 'link', 'hr')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.note = {
+            "title": "",
+            "textContent": "",
+            "listContent": [],
+            "labels": [],
+            "isArchived": False,
+            "isTrashed": False
+        }
+        self.fields = [None]
+
+    def handle_starttag(self, tag, attrs):
+        classes = (dict(attrs).get('class') or '').split()
+        field = self.fields[-1]
+
+        if tag == 'br':
+            if field == 'textContent':
+                self.note['textContent'] += '\n'
+            return
+        if 'archived' in classes:
+            self.note['isArchived'] = True
+        if 'trashed' in classes:
+            self.note['isTrashed'] = True
+        if tag in self.VOID_TAGS:
+            return
+
+        if 'title' in classes:
+            field = 'title'
+        elif 'content' in classes:
+            field = 'textContent'
+        elif 'listitem' in classes:
+            self.note['listContent'].append({"text": "", "isChecked": 'checked' in classes})
+            field = 'listitem'
+        elif 'bullet' in classes and field == 'listitem':
+            field = 'bullet'
+        elif 'text' in classes and field == 'listitem':
+            field = 'listtext'
+        elif 'label-name' in classes:
+            self.note['labels'].append({"name": ""})
+            field = 'label'
+        elif 'heading' in classes:
+            field = None
+        self.fields.append(field)
+
+    def handle_endtag(self, tag):
+        if tag not in self.VOID_TAGS and len(self.fields) > 1:
+            self.fields.pop()
+
+    def handle_data(self, data):
+        field = self.fields[-1]
+        if field in ('title', 'textContent'):
+            self.note[field] += data
+        elif field == 'listtext':
+            self.note['listContent'][-1]['text'] += data
+        elif field == 'bullet' and CHECKED_BULLET in data:
+            self.note['listContent'][-1]['isChecked'] = True
+        elif field == 'label':
+            self.note['labels'][-1]['name'] += data
+
+def parse_keep_html(html):
+    """
+    Parse a Keep note from Takeout HTML.
+
+    Args:
+        html: HTML document text
+
+    Returns:
+        dict: Note fields in the JSON export's format
+    """
+    parser = KeepHtmlParser()
+    parser.feed(html)
+    parser.close()
+    note = parser.note
+    note['title'] = note['title'].strip()
+    note['textContent'] = note['textContent'].strip('\n')
+    return note
+
+def is_keep_note(data):
+    """Check whether parsed JSON looks like a Keep note."""
+    return isinstance(data, dict) and ('textContent' in data or 'listContent' in data)
+
+def iter_keep_files(source):
+    """
+    List the note files of a Takeout export, in a stable order.
+
+    Args:
+        source: Takeout .zip file, or a folder (the Takeout root or its
+            "Keep" folder)
+
+    Yields:
+        tuple: (key, read) where key is the file's path inside the export
+            and read() returns its text
+    """
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            names = sorted(n for n in archive.namelist() if not n.endswith('/'))
+            for name in select_note_files(names, posixpath):
+                yield name, lambda name=name: archive.read(name).decode('utf-8')
+        return
+
+    paths = []
+    for root, dirs, files in os.walk(source):
+        dirs.sort()
+        paths.extend(os.path.relpath(os.path.join(root, f), source) for f in sorted(files))
+    for path in select_note_files(paths, os.path):
+        full_path = os.path.join(source, path)
+        yield path, lambda full_path=full_path: read_text(full_path)
+
+def read_text(path):
+    """Read a UTF-8 text file."""
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def select_note_files(paths, pathmod):
+    """
+    Pick one file per note: the .json file, or the .html file if there is none.
+
+    Args:
+        paths: File paths in the export
+        pathmod: Path module matching the paths (os.path or posixpath)
+
+    Returns:
+        list: Selected paths, in input order
+    """
+    stems = {os.path.splitext(p)[0] for p in paths if p.lower().endswith('.json')}
+    selected = []
+    for path in paths:
+        stem, extension = os.path.splitext(path)
+        if extension.lower() == '.json' or (extension.lower() == '.html' and stem not in stems):
+            # Only files inside a Keep folder, or a folder of notes given directly
+            parent = pathmod.basename(pathmod.dirname(path))
+            if parent.lower() == 'keep' or not pathmod.dirname(path):
+                selected.append(path)
+    return selected
+
+def keep_title(note):
+    """
+    Get a note's title, falling back to the start of its content.
+
+    Args:
+        note: Keep note fields
+
+    Returns:
+        str: Title of at most MAX_TITLE_LENGTH characters
+    """
+    title = (note.get('title') or '').strip()
+    if not title:
+        first_lines = [line for line in (note.get('textContent') or '').split('\n') if line.strip()]
+        first_lines += [item.get('text', '') for item in note.get('listContent') or [] if item.get('text', '').strip()]
+        title = first_lines[0].strip() if first_lines else "Untitled Keep note"
+    if len(title) > MAX_TITLE_LENGTH:
+        title = title[:MAX_TITLE_LENGTH - 3].rstrip() + "..."
+    return title
+
+def keep_labels(note):
+    """Get a note's label names."""
+    return [label['name'].strip() for label in note.get('labels') or [] if label.get('name', '').strip()]
+
+def keep_to_blocks(note, include_labels=True):
+    """
+    Convert a Keep note's content into Notion blocks.
+
+    Args:
+        note: Keep note fields (JSON export format)
+        include_labels: Add a "Labels:" paragraph at the end
+
+    Returns:
+        list: Block objects
+    """
+    blocks = []
+
+    text = note.get('textContent') or ''
+    if text.strip():
+        blocks.extend(iter_markdown_blocks(text.split('\n')))
+
+    for item in note.get('listContent') or []:
+        blocks.extend(make_blocks(
+            "to_do",
+            make_rich_text(item.get('text', '')),
+            checked=bool(item.get('isChecked'))
+        ))
+
+    for annotation in note.get('annotations') or []:
+        url = annotation.get('url')
+        if url:
+            blocks.extend(make_blocks("paragraph", make_rich_text(annotation.get('title') or url, url=url)))
+
+    for attachment in note.get('attachments') or []:
+        name = os.path.basename(attachment.get('filePath') or '') or 'file'
+        blocks.extend(make_blocks("paragraph", make_rich_text(f"Attachment not imported: {name}", "italic")))
+
+    labels = keep_labels(note)
+    if include_labels and labels:
+        blocks.extend(make_blocks("paragraph", make_rich_text(f"Labels: {', '.join(labels)}")))
+
+    return blocks
+
+def keep_record(key, note, label_property=None):
+    """
+    Map a Keep note onto an import record (see import_notes.import_record).
+
+    Args:
+        key: Checkpoint key (the note's path in the export)
+        note: Keep note fields
+        label_property: Multi-select property for labels (None writes them
+            into the note body)
+
+    Returns:
+        dict: Import record
+    """
+    record = {
+        "key": key,
+        "title": keep_title(note),
+        "blocks": keep_to_blocks(note, include_labels=not label_property),
+        "archived": bool(note.get('isArchived'))
+    }
+
+    labels = keep_labels(note)
+    if label_property and labels:
+        # Commas are not allowed in select option names
+        record["properties"] = {
+            label_property: {
+                "multi_select": [{"name": label.replace(',', ' ')} for label in labels]
+            }
+        }
+    return record
+
+def iter_keep_records(source, include_trashed=False, label_property=None, skipped=None):
+    """
+    Read a Takeout export as import records, one note at a time.
+
+    Args:
+        source: Takeout .zip file or folder
+        include_trashed: Import notes that are in Keep's trash
+        label_property: See keep_record()
+        skipped: Optional list that collects the keys of trashed notes skipped
+
+    Yields:
+        dict: Import records ({"key", "error"} for unreadable files)
+    """
+    for key, read in iter_keep_files(source):
+        try:
+            text = read()
+            if key.lower().endswith('.json'):
+                note = json.loads(text)
+                if not is_keep_note(note):
+                    continue
+            else:
+                note = parse_keep_html(text)
+        except (OSError, ValueError, zipfile.BadZipFile) as e:
+            yield {"key": key, "error": f"Failed to read note: {str(e)}"}
+            continue
+
+        if note.get('isTrashed') and not include_trashed:
+            if skipped is not None:
+                skipped.append(key)
+            continue
+
+        yield keep_record(key, note, label_property)
+
+def import_keep(source, checkpoint_path=None, include_trashed=False, label_property=None,
+                max_workers=MAX_CONCURRENCY):
+    """
+    Import a Google Keep Takeout export into the Notes database.
+
+    Args:
+        source: Takeout .zip file or folder
+        checkpoint_path: Checkpoint file (defaults to one per source in the cache directory)
+        include_trashed: Import notes that are in Keep's trash
+        label_property: Multi-select property to store labels in
+        max_workers: Maximum number of notes imported at once
+    """
+    if not os.path.exists(source):
+        output_error(f"Takeout export not found: {source}")
+
+    checkpoint_path = checkpoint_path or default_checkpoint_path(source)
+    try:
+        checkpoint = ImportCheckpoint(checkpoint_path)
+    except OSError as e:
+        output_error(f"Failed to open checkpoint file: {str(e)}")
+
+    trashed = []
+    try:
+        records = iter_keep_records(source, include_trashed, label_property, trashed)
+        summary = import_records(records, checkpoint, max_workers)
+    except (OSError, zipfile.BadZipFile) as e:
+        output_error(f"Failed to read Takeout export: {str(e)}")
+    finally:
+        checkpoint.close()
+
+    result = {
+        "action": "import_keep",
+        "source": source,
+        "checkpoint": checkpoint_path,
+        "trashed_skipped": len(trashed)
+    }
+    result.update(summary)
+
+    if summary['failed'] and not (summary['created'] or summary['resumed'] or summary['skipped']):
+        output_error(f"Failed to import {summary['failed']} note(s)", result)
+
+    output_success(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import a Google Keep Takeout export into the Ultimate Brain Notes database"
+    )
+    parser.add_argument("source", help="Takeout .zip file, or the extracted Takeout or Keep folder")
+    parser.add_argument("--checkpoint",
+                        help="Checkpoint file for resuming (default: one per source in the cache directory)")
+    parser.add_argument("--label-property",
+                        help="Multi-select property of the Notes database to store Keep labels in "
+                             "(default: add a 'Labels:' line to each note)")
+    parser.add_argument("--include-trashed", action="store_true", help="Also import notes in Keep's trash")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENCY,
+                        help=f"Notes imported at once (default: {MAX_CONCURRENCY})")
+
+    args = parser.parse_args()
+
+    import_keep(
+        source=args.source,
+        checkpoint_path=args.checkpoint,
+        include_trashed=args.include_trashed,
+        label_property=args.label_property,
+        max_workers=max(1, args.workers)
+    )
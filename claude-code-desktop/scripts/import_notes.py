@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Import many notes into the Notes database in one run.
+
+Notes come from a directory of markdown files (the file name becomes the
+title) or a JSONL stream of {"title", "content"} records. Pages are created
+concurrently under the shared rate limiter with the same payload as
+create_note.py; bodies longer than 100 blocks are appended in follow-up
+batches.
+
+Progress is written to a checkpoint file as each page is created and each
+batch is appended, so an interrupted import can simply be run again: notes
+already imported are skipped, and a partly uploaded note (or one whose
+creation was cut off) continues after the blocks it already has instead of
+being created twice.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+from common import (
+    ApiError, MAX_CONCURRENCY, combine_filters, get_cache_path, iter_concurrent,
+    output_success, output_error
+)
+from notes import create_note_page, iter_notes
+from markdown_blocks import open_markdown, iter_markdown_blocks
+from blocks import fetch_block_children, iter_block_batches, insert_blocks
+
+MARKDOWN_EXTENSIONS = ('.md', '.markdown')
+
+# Failures listed in the result (the counts always cover all of them)
+MAX_REPORTED_FAILURES = 50
+
+class ImportCheckpoint:
+    """
+    Append-only JSONL log of import progress, shared by the worker threads.
+
+    Each line records a note's key, its page ID, the number of blocks
+    uploaded so far and whether the note is complete; the last line for a
+    key wins. A line without a page ID marks a page creation that was
+    started at "started_at". Without a path, progress is only kept in memory.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.lock = threading.Lock()
+        self.state = {}
+        self.file = None
+
+        if path:
+            try:
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                            self.state[entry['key']] = entry
+                        except (ValueError, KeyError, TypeError):
+                            # A crash can leave a partial last line
+                            continue
+            except FileNotFoundError:
+                pass
+            self.file = open(path, 'a', encoding='utf-8')
+
+    def get(self, key):
+        with self.lock:
+            return self.state.get(key)
+
+    def record(self, key, note_id, blocks, done, started_at=None):
+        entry = {"key": key, "id": note_id, "blocks": blocks, "done": done}
+        if started_at:
+            entry["started_at"] = started_at
+        with self.lock:
+            self._append(entry)
+
+    def _append(self, entry):
+        # Callers hold self.lock
+        self.state[entry['key']] = entry
+        if self.file:
+            self.file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            self.file.flush()
+
+    def adopt(self, key, note_ids):
+        """
+        Record the first of note_ids not already imported under another key.
+
+        Returns:
+            str: The adopted page ID, or None
+        """
+        with self.lock:
+            used = {entry['id'] for other, entry in self.state.items() if other != key and entry['id']}
+            for note_id in note_ids:
+                if note_id not in used:
+                    self._append({"key": key, "id": note_id, "blocks": 0, "done": False})
+                    return note_id
+        return None
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+def default_checkpoint_path(source):
+    """Get the default checkpoint file for an import source."""
+    digest = hashlib.sha1(os.path.abspath(source).encode('utf-8')).hexdigest()[:12]
+    return get_cache_path(f"import-{digest}.jsonl")
+
+def find_started_pages(title, started_at):
+    """
+    Find candidate pages of an import that was interrupted while creating one.
+
+    Args:
+        title: Title of the note
+        started_at: ISO time (minute precision) the creation was started
+
+    Returns:
+        list: IDs of notes with this exact title created since started_at
+
+    Raises:
+        ApiError: If the query fails
+    """
+    started_filter = combine_filters(
+        {"property": "Name", "title": {"equals": title.strip()}},
+        {"timestamp": "created_time", "created_time": {"on_or_after": started_at}}
+    )
+    return [page['id'] for page in iter_notes(started_filter, limit=100)]
+
+def iter_directory_records(directory):
+    """
+    Find markdown files in a directory tree, in a stable order.
+
+    Args:
+        directory: Directory to scan recursively
+
+    Yields:
+        dict: Records {"key", "title", "path"}, keyed by relative path
+    """
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            stem, extension = os.path.splitext(name)
+            if extension.lower() not in MARKDOWN_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            yield {
+                "key": os.path.relpath(path, directory),
+                "title": stem,
+                "path": path
+            }
+
+def iter_jsonl_records(lines):
+    """
+    Parse JSONL import records.
+
+    Each line is an object with "title" and optional "content" (markdown),
+    "archived" and "id". Records are keyed by "id" when present, else by
+    line number.
+
+    Args:
+        lines: Iterable of JSONL lines
+
+    Yields:
+        dict: Records {"key", "title", "content", "archived"}, or
+            {"key", "error"} for lines that can't be imported
+    """
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield {"key": f"line:{number}", "error": f"Invalid JSON: {str(e)}"}
+            continue
+        if not isinstance(data, dict):
+            yield {"key": f"line:{number}", "error": "Record must be a JSON object"}
+            continue
+
+        key = str(data['id']) if data.get('id') else f"line:{number}"
+        yield {
+            "key": key,
+            "title": data.get('title') or '',
+            "content": data.get('content') or '',
+            "archived": bool(data.get('archived'))
+        }
+
+def iter_record_blocks(record):
+    """
+    Get a record's content blocks.
+
+    Args:
+        record: Record with "blocks" (ready block objects), "path" (markdown
+            file) or "content" (markdown text)
+
+    Yields:
+        dict: Block objects
+    """
+    if 'blocks' in record:
+        yield from record['blocks']
+        return
+    with open_markdown(record.get('content'), record.get('path')) as lines:
+        yield from iter_markdown_blocks(lines)
+
+def import_record(record, checkpoint):
+    """
+    Import one record, resuming from its checkpoint state.
+
+    Args:
+        record: Import record (see iter_record_blocks) with "key" and "title",
+            and optional "archived" and "properties" for the page
+        checkpoint: ImportCheckpoint
+
+    Returns:
+        dict: {"key", "id", "status", "blocks"} where status is "created",
+            "resumed", "skipped" or "failed" (with "error")
+    """
+    key = record['key']
+    if record.get('error'):
+        return {"key": key, "status": "failed", "error": record['error']}
+    if not record.get('title', '').strip():
+        return {"key": key, "status": "failed", "error": "Missing title"}
+
+    state = checkpoint.get(key)
+    if state and state['done']:
+        return {"key": key, "id": state['id'], "status": "skipped", "blocks": state['blocks']}
+
+    note_id = None
+    uploaded = 0
+    try:
+        if state and not state['id']:
+            # Creation was interrupted: adopt the page if it was created.
+            # Pages already imported under another key (same title, same
+            # minute) are not candidates
+            note_id = checkpoint.adopt(key, find_started_pages(record['title'], state['started_at']))
+            state = dict(state, id=note_id) if note_id else None
+
+        blocks = iter_record_blocks(record)
+        if state:
+            # The page exists; skip the blocks it already has. They are
+            # counted rather than taken from the checkpoint, in case the
+            # last append reached Notion but was never recorded
+            note_id = state['id']
+            uploaded = len(fetch_block_children(note_id))
+            batches = iter_block_batches(itertools.islice(blocks, uploaded, None))
+            status = "resumed"
+        else:
+            batches = iter_block_batches(blocks)
+            first_batch = next(batches, [])
+            # Created times have minute precision
+            started_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:00Z')
+            checkpoint.record(key, None, 0, done=False, started_at=started_at)
+            page = create_note_page(
+                record['title'], first_batch,
+                archived=record.get('archived', False),
+                properties=record.get('properties')
+            )
+            note_id, uploaded = page['id'], len(first_batch)
+            status = "created"
+
+        # Record progress after every request
+        batch = next(batches, None)
+        checkpoint.record(key, note_id, uploaded, done=batch is None)
+        while batch is not None:
+            insert_blocks(note_id, batch)
+            uploaded += len(batch)
+            batch = next(batches, None)
+            checkpoint.record(key, note_id, uploaded, done=batch is None)
+    except (ApiError, OSError, ValueError) as e:
+        return {"key": key, "id": note_id, "status": "failed", "error": str(e), "blocks": uploaded}
+
+    return {"key": key, "id": note_id, "status": status, "blocks": uploaded}
+
+def import_records(records, checkpoint, max_workers=MAX_CONCURRENCY):
+    """
+    Import records concurrently and summarize the outcome.
+
+    Records are consumed lazily, a few ahead of the finished ones, so
+    arbitrarily large sources use bounded memory.
+
+    Args:
+        records: Iterable of import records
+        checkpoint: ImportCheckpoint
+        max_workers: Maximum number of notes imported at once
+
+    Returns:
+        dict: Counts per status, blocks in imported notes and the first failures
+    """
+    counts = {"created": 0, "resumed": 0, "skipped": 0, "failed": 0}
+    blocks = 0
+    failures = []
+
+    for result in iter_concurrent(lambda r: import_record(r, checkpoint), records, max_workers):
+        counts[result['status']] += 1
+        if result['status'] == "failed":
+            if len(failures) < MAX_REPORTED_FAILURES:
+                failures.append(result)
+        elif result['status'] != "skipped":
+            blocks += result['blocks']
+
+    return dict(
+        total=sum(counts.values()),
+        **counts,
+        blocks_imported=blocks,
+        failures=failures
+    )
+
+def import_notes(source, checkpoint_path=None, max_workers=MAX_CONCURRENCY):
+    """
+    Import a directory of markdown files or a JSONL file into the Notes database.
+
+    Args:
+        source: Directory path, JSONL file path, or "-" for JSONL on stdin
+        checkpoint_path: Checkpoint file (defaults to one per source in the
+            cache directory; stdin is only checkpointed when this is given)
+        max_workers: Maximum number of notes imported at once
+    """
+    if source != '-' and not os.path.exists(source):
+        output_error(f"Import source not found: {source}")
+
+    if checkpoint_path is None and source != '-':
+        checkpoint_path = default_checkpoint_path(source)
+
+    try:
+        checkpoint = ImportCheckpoint(checkpoint_path)
+    except OSError as e:
+        output_error(f"Failed to open checkpoint file: {str(e)}")
+
+    try:
+        if source == '-':
+            summary = import_records(iter_jsonl_records(sys.stdin), checkpoint, max_workers)
+        elif os.path.isdir(source):
+            summary = import_records(iter_directory_records(source), checkpoint, max_workers)
+        else:
+            with open(source, encoding='utf-8') as f:
+                summary = import_records(iter_jsonl_records(f), checkpoint, max_workers)
+    except (OSError, UnicodeDecodeError) as e:
+        output_error(f"Failed to read import source: {str(e)}")
+    finally:
+        checkpoint.close()
+
+    result = {
+        "action": "import",
+        "source": source,
+        "checkpoint": checkpoint_path
+    }
+    result.update(summary)
+
+    if summary['failed'] and not (summary['created'] or summary['resumed'] or summary['skipped']):
+        output_error(f"Failed to import {summary['failed']} note(s)", result)
+
+    output_success(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Import markdown files or JSONL records into the Ultimate Brain Notes database"
+    )
+    parser.add_argument("source",
+                        help="Directory of .md files, JSONL file of {title, content} records, or - for stdin")
+    parser.add_argument("--checkpoint",
+                        help="Checkpoint file for resuming (default: one per source in the cache directory)")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENCY,
+                        help=f"Notes imported at once (default: {MAX_CONCURRENCY})")
+
+    args = parser.parse_args()
+
+    import_notes(
+        source=args.source,
+        checkpoint_path=args.checkpoint,
+        max_workers=max(1, args.workers)
+    )
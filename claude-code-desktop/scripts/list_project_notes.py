@@ -6,16 +6,13 @@ This script queries the Notes database and returns all notes for a given project
 """
 
 import argparse
-import requests
 import sys
-import subprocess
-import json
-import time
 from common import (
-    NOTES_DB_ID, NOTION_BASE_URL, get_headers,
+    ApiError, MIRROR_MAX_STALENESS, NOTES_DB_ID, NOTION_BASE_URL, api_request,
     build_project_filter, build_archived_filter, combine_filters,
-    output_success, output_error, extract_title
+    output_success, output_error, extract_title, extract_archived
 )
+from projects import ProjectLookupError, resolve_project, choose_project
 
 def get_project_id_from_name(project_name):
     """
@@ -25,68 +22,64 @@ def get_project_id_from_name(project_name):
         project_name: Name of the project to find
 
     Returns:
-        str: Project ID
+        tuple: (project_id, project_name)
 
     Raises:
         SystemExit: If project not found or multiple matches
     """
-    import os
-
-    # Try to locate the search_projects.py script
-    script_path = "~/.claude/scripts/notion/search_projects.py"
-    if not os.path.exists(script_path):
-        # Fallback to other possible locations
-        fallback_paths = [
-            "/root/notion/scripts/skills/search_projects.py",
-            os.path.expanduser("~/.claude/scripts/notion/search_projects.py")
-        ]
-        for path in fallback_paths:
-            if os.path.exists(path):
-                script_path = path
-                break
-
     try:
-        # First try: exact match (case-insensitive)
-        result = subprocess.run(
-            ["python3", script_path,
-             "--name", project_name, "--exact", "--limit", "10"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-
-        # If exact match fails, try partial match
-        if result.returncode != 0:
-            result = subprocess.run(
-                ["python3", script_path,
-                 "--name", project_name, "--limit", "10"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-        if result.returncode != 0:
-            output_error(f"Project '{project_name}' not found. Try using the search_projects.py script directly to see available projects.")
-
-        data = json.loads(result.stdout)
-        if not data['success']:
-            output_error(f"Project '{project_name}' not found. Try using the search_projects.py script directly to see available projects.")
-
-        projects = data['data']['projects']
-        if len(projects) == 0:
-            output_error(f"No projects found matching '{project_name}'. Try using the search_projects.py script directly to see available projects.")
-        elif len(projects) > 1:
-            project_list = "\n".join([f"  - {p['name']}" for p in projects])
-            output_error(
-                f"Multiple projects match '{project_name}'. Please be more specific:",
-                {"matches": [p['name'] for p in projects]}
-            )
-
-        return projects[0]['id'], projects[0]['name']
-    except Exception as e:
-        output_error(f"Failed to search for project: {str(e)}")
-
-def list_project_notes(project_id=None, project_name=None, include_archived=False, limit=100):
+        project = resolve_project(project_name)
+    except ProjectLookupError as e:
+        output_error(e.message, e.details)
+
+    return project['id'], project['name']
+
+def list_project_notes_local(conn, project_id=None, project_name=None, include_archived=False, limit=100):
+    """
+    List a project's notes from the local mirror.
+
+    Args:
+        conn: Open mirror connection
+        project_id: Project ID (if not provided, project_name is required)
+        project_name: Project name to search for
+        include_archived: If True, include archived notes
+        limit: Maximum results to return
+    """
+    import mirror
+
+    if project_name and not project_id:
+        try:
+            project = choose_project(mirror.search_projects(conn, project_name), project_name)
+        except ProjectLookupError as e:
+            output_error(e.message, e.details)
+        project_id, project_name = project['id'], project['name']
+    elif project_id and not project_name:
+        project_name = mirror.get_project_name(conn, project_id)
+
+    notes = [
+        {
+            "id": note['id'],
+            "name": note['name'],
+            "created": note['created'],
+            "updated": note['updated'],
+            "archived": note['archived']
+        }
+        for note in mirror.list_project_notes(conn, project_id, include_archived, limit)
+    ]
+
+    output_success({
+        "project": {
+            "id": project_id,
+            "name": project_name or "Unknown"
+        },
+        "include_archived": include_archived,
+        "count": len(notes),
+        "notes": notes,
+        "source": "mirror"
+    })
+
+def list_project_notes(project_id=None, project_name=None, include_archived=False, limit=100,
+                       local=False, max_staleness=MIRROR_MAX_STALENESS):
     """
     List all notes for a specific project.
 
@@ -95,7 +88,17 @@ def list_project_notes(project_id=None, project_name=None, include_archived=Fals
         project_name: Project name to search for
         include_archived: If True, include archived notes
         limit: Maximum results to return
+        local: If True, answer from the local mirror when it is fresh enough
+        max_staleness: Maximum mirror age in seconds before falling back to the API
     """
+    if local:
+        # Loaded here: only --local needs the mirror (and SQLite)
+        import mirror
+
+        conn = mirror.open_fresh_mirror(max_staleness)
+        if conn is not None:
+            list_project_notes_local(conn, project_id, project_name, include_archived, limit)
+
     # Resolve project name to ID if needed
     if project_name and not project_id:
         project_id, resolved_name = get_project_id_from_name(project_name)
@@ -104,8 +107,6 @@ def list_project_notes(project_id=None, project_name=None, include_archived=Fals
     if not project_id:
         output_error("Either --project-id or --project-name must be provided")
 
-    headers = get_headers()
-
     # Build filters
     project_filter = build_project_filter(project_id)
     archived_filter = build_archived_filter(include_archived)
@@ -124,20 +125,19 @@ def list_project_notes(project_id=None, project_name=None, include_archived=Fals
 
     try:
         while True:
-            response = requests.post(url, headers=headers, json=body, timeout=10)
+            response = api_request("POST", url, json=body)
             response.raise_for_status()
 
             data = response.json()
             all_results.extend(data.get('results', []))
 
-            # Check if there are more results
-            if not data.get('has_more', False):
+            # Check if there are more results we still need
+            if not data.get('has_more', False) or len(all_results) >= limit:
                 break
 
             # Set up pagination
             body['start_cursor'] = data.get('next_cursor')
-            time.sleep(0.3)  # Rate limiting
-    except requests.exceptions.RequestException as e:
+    except ApiError as e:
         output_error(f"API request failed: {str(e)}")
 
     # Limit results
@@ -151,7 +151,7 @@ def list_project_notes(project_id=None, project_name=None, include_archived=Fals
             "name": extract_title(note),
             "created": note.get('created_time'),
             "updated": note.get('last_edited_time'),
-            "archived": note.get('archived', False)
+            "archived": extract_archived(note)
         })
 
     output_success({
@@ -172,6 +172,10 @@ if __name__ == "__main__":
     parser.add_argument("--project-name", help="Project name to search for")
     parser.add_argument("--include-archived", action="store_true", help="Include archived notes")
     parser.add_argument("--limit", type=int, default=100, help="Maximum results")
+    parser.add_argument("--local", action="store_true",
+                        help="Read from the local mirror (see sync_mirror.py), falling back to the API when stale")
+    parser.add_argument("--max-staleness", type=int, default=MIRROR_MAX_STALENESS,
+                        help="Maximum mirror age in seconds for --local")
 
     args = parser.parse_args()
 
@@ -182,5 +186,7 @@ if __name__ == "__main__":
         project_id=args.project_id,
         project_name=args.project_name,
         include_archived=args.include_archived,
-        limit=args.limit
+        limit=args.limit,
+        local=args.local,
+        max_staleness=args.max_staleness
     )
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Markdown to Notion block conversion shared by the Notion skill scripts.
+
+The converter is a single pass over the input lines. Each line is classified
+by one precompiled pattern, and inline formatting (bold, italics,
+strikethrough, inline code, links) is turned into rich text annotations.
+Text longer than Notion's 2000-character limit is split across several
+rich text objects, and rich text longer than the 100-object limit across
+several blocks.
+
+Supported syntax:
+- "# ", "## ", "### " headings
+- "- " / "* " bullets, "1. " numbered items, "> " quotes
+- ``` fenced code blocks (with optional language)
+- "---", "***", "___" dividers
+- Everything else non-empty becomes a paragraph
+"""
+
+import re
+from contextlib import contextmanager
+
+# Notion's limit on the content of one rich text object
+MAX_TEXT_LENGTH = 2000
+
+# Notion's limit on the number of rich text objects in one block
+MAX_RICH_TEXT_ITEMS = 100
+
+DIVIDERS = ('---', '***', '___')
+
+HEADING_TYPES = {1: "heading_1", 2: "heading_2", 3: "heading_3"}
+
+# Block-level syntax at the start of a line
+LINE_PATTERN = re.compile(r"""
+      (?P<heading>\#{1,3})\ (?P<heading_text>.*)
+    | [-*]\ (?P<bullet>.*)
+    | \d+\.\s(?P<number>.*)
+    | >\ (?P<quote>.*)
+""", re.VERBOSE)
+
+# Inline formatting; every alternative is bounded by its delimiters, so
+# scanning a line stays linear in its length
+INLINE_PATTERN = re.compile(r"""
+      `(?P<code>[^`]{1,2000})`
+    | \[(?P<link_text>[^\[\]]{1,2000})\]\((?P<url>[^()\s]{1,2000})\)
+    | \*\*(?P<bold>[^*]+)\*\*
+    | __(?P<bold_alt>[^_]+)__
+    | ~~(?P<strikethrough>[^~]+)~~
+    | (?<![\w*])\*(?P<italic>[^*\s][^*]*)\*(?![\w*])
+    | (?<![\w_])_(?P<italic_alt>[^_\s][^_]*)_(?![\w_])
+""", re.VERBOSE)
+
+# Annotation set by each inline group
+INLINE_ANNOTATIONS = {
+    "code": "code",
+    "bold": "bold",
+    "bold_alt": "bold",
+    "strikethrough": "strikethrough",
+    "italic": "italic",
+    "italic_alt": "italic",
+}
+
+def split_text(text, limit=MAX_TEXT_LENGTH):
+    """Split text into chunks of at most limit characters."""
+    return [text[i:i + limit] for i in range(0, len(text), limit)] or [""]
+
+def make_rich_text(text, annotation=None, url=None):
+    """
+    Build rich text objects for a run of text, split to Notion's length limit.
+
+    Args:
+        text: Plain text content
+        annotation: Optional annotation name to enable (e.g. "bold")
+        url: Optional link URL
+
+    Returns:
+        list: Rich text objects
+    """
+    items = []
+    for chunk in split_text(text):
+        item = {"type": "text", "text": {"content": chunk}}
+        if url:
+            item["text"]["link"] = {"url": url}
+        if annotation:
+            item["annotations"] = {annotation: True}
+        items.append(item)
+    return items
+
+def parse_inline(text):
+    """
+    Convert inline markdown into rich text objects.
+
+    Args:
+        text: One line of markdown text
+
+    Returns:
+        list: Rich text objects (plain runs have no annotations)
+    """
+    items = []
+    position = 0
+    for match in INLINE_PATTERN.finditer(text):
+        if match.start() > position:
+            items.extend(make_rich_text(text[position:match.start()]))
+
+        group = match.lastgroup
+        if group == "url":
+            items.extend(make_rich_text(match.group("link_text"), url=match.group("url")))
+        else:
+            items.extend(make_rich_text(match.group(group), INLINE_ANNOTATIONS[group]))
+        position = match.end()
+
+    if position < len(text) or not items:
+        items.extend(make_rich_text(text[position:]))
+    return items
+
+def make_blocks(block_type, rich_text, **extra):
+    """
+    Build one block (or several, if the rich text exceeds Notion's item limit).
+
+    Args:
+        block_type: Notion block type (e.g. "paragraph")
+        rich_text: Rich text objects
+        **extra: Extra fields for the block's type object (e.g. language)
+
+    Returns:
+        list: Block objects
+    """
+    blocks = []
+    for i in range(0, len(rich_text), MAX_RICH_TEXT_ITEMS):
+        blocks.append({
+            "object": "block",
+            "type": block_type,
+            block_type: dict(rich_text=rich_text[i:i + MAX_RICH_TEXT_ITEMS], **extra)
+        })
+    return blocks
+
+def iter_markdown_blocks(lines):
+    """
+    Convert markdown lines into Notion blocks, one block at a time.
+
+    Lines are consumed lazily, so a file object can be passed directly and
+    blocks can be uploaded while the rest of the file is still being read.
+
+    Args:
+        lines: Iterable of lines (trailing newlines are ignored)
+
+    Yields:
+        dict: Notion block objects, in document order
+    """
+    code_lines = None
+    language = None
+
+    for line in lines:
+        line = line.rstrip('\r\n')
+        stripped = line.strip()
+
+        # Inside a fenced code block, collect lines verbatim until the fence closes
+        if code_lines is not None:
+            if stripped.startswith('```'):
+                yield from make_blocks("code", make_rich_text('\n'.join(code_lines)), language=language)
+                code_lines = None
+            else:
+                code_lines.append(line)
+            continue
+
+        if stripped.startswith('```'):
+            language = stripped[3:].strip() or 'plain text'
+            code_lines = []
+            continue
+
+        match = LINE_PATTERN.match(line)
+        if match:
+            if match.group("heading"):
+                block_type = HEADING_TYPES[len(match.group("heading"))]
+                yield from make_blocks(block_type, parse_inline(match.group("heading_text")))
+            elif match.group("bullet") is not None:
+                yield from make_blocks("bulleted_list_item", parse_inline(match.group("bullet")))
+            elif match.group("number") is not None:
+                yield from make_blocks("numbered_list_item", parse_inline(match.group("number")))
+            else:
+                yield from make_blocks("quote", parse_inline(match.group("quote")))
+            continue
+
+        if stripped in DIVIDERS:
+            yield {"object": "block", "type": "divider", "divider": {}}
+        elif stripped:
+            yield from make_blocks("paragraph", parse_inline(line))
+
+    # An unclosed fence still produces its code block
+    if code_lines is not None:
+        yield from make_blocks("code", make_rich_text('\n'.join(code_lines)), language=language)
+
+def parse_markdown_to_blocks(content):
+    """
+    Parse markdown-like text into Notion blocks.
+
+    Args:
+        content: Text content to parse
+
+    Returns:
+        list: List of block objects
+    """
+    return list(iter_markdown_blocks(content.split('\n')))
+
+@contextmanager
+def open_markdown(content=None, content_file=None):
+    """
+    Open markdown input as an iterable of lines.
+
+    A content file is read lazily, line by line, so large files are never
+    loaded into memory at once.
+
+    Args:
+        content: Markdown text (used when content_file is not given)
+        content_file: Path to a markdown file
+
+    Yields:
+        iterable: Lines of markdown
+
+    Raises:
+        OSError: If the file can't be opened
+    """
+    if content_file:
+        with open(content_file, 'r', encoding='utf-8') as f:
+            yield f
+    else:
+        yield (content or '').split('\n')
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Summarize the metrics log that every script run appends to.
+
+Each run (from the command line or through the gateway) adds one JSONL
+record to metrics.jsonl in the cache directory: script, option names used,
+wall time, API calls, retries, 429s, timeouts, bytes and exit status (see
+NOTION_SKILLS_METRICS in common.py). This report reads the log and its
+rotated copies and aggregates them per operation: p50/p95/p99 wall time,
+API calls per run and how often runs were rate limited or timed out.
+
+With --prometheus, the same numbers are written to a file for
+node_exporter's textfile collector (run it from cron).
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from common import (
+    METRICS_BACKUPS, metrics_log_path, discard_metrics,
+    output_success, output_error
+)
+
+PERCENTILES = (50, 95, 99)
+
+DURATION_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)([mhdw])$')
+DURATION_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+
+def parse_since(value):
+    """
+    Parse a --since value.
+
+    Args:
+        value: Age like "24h", "7d", "30m", "2w", or an ISO date/time
+
+    Returns:
+        datetime: Timezone-aware cutoff
+    """
+    match = DURATION_PATTERN.match(value.strip().lower())
+    if match:
+        amount = float(match.group(1))
+        return datetime.now(timezone.utc) - timedelta(**{DURATION_UNITS[match.group(2)]: amount})
+    try:
+        cutoff = datetime.fromisoformat(value)
+    except ValueError:
+        output_error(f"Invalid --since value: {value} (use e.g. 24h, 7d or 2024-12-01)")
+    return cutoff if cutoff.tzinfo else cutoff.astimezone()
+
+def iter_metrics(path):
+    """
+    Read the metrics log and its rotated copies, oldest first.
+
+    Args:
+        path: Metrics log file
+
+    Yields:
+        dict: Metrics records (unreadable lines are skipped)
+    """
+    for candidate in [f"{path}.{i}" for i in range(METRICS_BACKUPS, 0, -1)] + [path]:
+        try:
+            with open(candidate, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and record.get('script'):
+                        yield record
+        except FileNotFoundError:
+            continue
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[rank]
+
+def operation_key(record, by):
+    """Group records by script, or by script and the options it was run with."""
+    if by == "args":
+        return " ".join([record['script']] + list(record.get('args') or []))
+    return record['script']
+
+def summarize(records, by="script"):
+    """
+    Aggregate metrics records per operation.
+
+    Args:
+        records: Iterable of metrics records
+        by: "script" or "args" (script plus option names)
+
+    Returns:
+        list: One summary dict per operation, sorted by name
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(operation_key(record, by), []).append(record)
+
+    operations = []
+    for key, runs in sorted(groups.items()):
+        count = len(runs)
+        wall = sorted(r.get('wall_ms', 0) for r in runs)
+        calls = sorted(r.get('api_calls', 0) for r in runs)
+
+        statuses = {}
+        endpoints = {}
+        for r in runs:
+            statuses[r.get('status', 'exit')] = statuses.get(r.get('status', 'exit'), 0) + 1
+            for endpoint, n in (r.get('endpoints') or {}).items():
+                endpoints[endpoint] = endpoints.get(endpoint, 0) + n
+
+        def total(field):
+            return sum(r.get(field, 0) for r in runs)
+
+        operations.append({
+            "operation": key,
+            "runs": count,
+            "status": statuses,
+            "wall_ms": dict(
+                {f"p{p}": percentile(wall, p) for p in PERCENTILES},
+                mean=round(sum(wall) / count, 1),
+                max=wall[-1]
+            ),
+            "api_calls": dict(
+                {f"p{p}": percentile(calls, p) for p in PERCENTILES},
+                per_run=round(sum(calls) / count, 2),
+                max=calls[-1],
+                total=sum(calls)
+            ),
+            "retries": total('retries'),
+            "throttled": total('throttled'),
+            "throttled_runs": sum(1 for r in runs if r.get('throttled')),
+            "timeouts": total('timeouts'),
+            "timeout_runs": sum(1 for r in runs if r.get('timeouts')),
+            "errors": total('errors'),
+            "bytes_sent": total('bytes_sent'),
+            "bytes_received": total('bytes_received'),
+            "endpoints_per_run": {
+                endpoint: round(n / count, 2)
+                for endpoint, n in sorted(endpoints.items(), key=lambda item: -item[1])
+            }
+        })
+    return operations
+
+def prometheus_label(value):
+    """Escape a Prometheus label value."""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def render_prometheus(operations):
+    """
+    Render operation summaries in the Prometheus text exposition format.
+
+    All values are gauges over the reported window, since the log rotates.
+
+    Returns:
+        str: Textfile collector content
+    """
+    metrics = [
+        ("notion_skills_runs", "Script runs in the metrics log window, by outcome",
+         lambda op: [({"status": s}, n) for s, n in sorted(op['status'].items())]),
+        ("notion_skills_wall_seconds", "Wall time of script runs (quantiles over the window)",
+         lambda op: [({"quantile": f"{p / 100:g}"}, op['wall_ms'][f"p{p}"] / 1000) for p in PERCENTILES]),
+        ("notion_skills_api_calls_per_run", "Notion API calls per script run (mean over the window)",
+         lambda op: [({}, op['api_calls']['per_run'])]),
+        ("notion_skills_api_calls", "Notion API calls in the window",
+         lambda op: [({}, op['api_calls']['total'])]),
+        ("notion_skills_api_retries", "Retried Notion API calls (409/429) in the window",
+         lambda op: [({}, op['retries'])]),
+        ("notion_skills_api_throttled", "429 responses in the window",
+         lambda op: [({}, op['throttled'])]),
+        ("notion_skills_api_timeouts", "Notion API calls that timed out in the window",
+         lambda op: [({}, op['timeouts'])]),
+        ("notion_skills_api_errors", "Failed Notion API calls in the window",
+         lambda op: [({}, op['errors'])]),
+        ("notion_skills_api_bytes", "Request and response body bytes in the window",
+         lambda op: [({"direction": "sent"}, op['bytes_sent']), ({"direction": "received"}, op['bytes_received'])]),
+    ]
+
+    lines = []
+    for name, help_text, samples in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for op in operations:
+            for labels, value in samples(op):
+                labels = dict({"operation": op['operation']}, **labels)
+                label_text = ",".join(f'{k}="{prometheus_label(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value:g}")
+    return "\n".join(lines) + "\n"
+
+def write_text_atomic(path, text):
+    """Write a file so the collector never reads a partial one."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+def print_tables(operations, runs, since):
+    """Print the latency and API call tables."""
+    window = f" since {since}" if since else ""
+    print(f"{runs} runs{window}\n")
+    print(f"{'operation':<32} {'runs':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for op in operations:
+        wall = op['wall_ms']
+        failed = op['runs'] - op['status'].get('success', 0)
+        print(f"{op['operation'][:32]:<32} {op['runs']:>6} {wall['p50']:>9} {wall['p95']:>9} "
+              f"{wall['p99']:>9} {wall['max']:>9} {failed:>7}")
+
+    print(f"\n{'operation':<32} {'calls/run':>9} {'p95':>6} {'max':>6} {'retries':>8} {'429s':>6} {'timeouts':>8}")
+    for op in operations:
+        calls = op['api_calls']
+        print(f"{op['operation'][:32]:<32} {calls['per_run']:>9} {calls['p95']:>6} {calls['max']:>6} "
+              f"{op['retries']:>8} {op['throttled']:>6} {op['timeouts']:>8}")
+
+def metrics_report(log=None, since=None, script=None, by="script", table=False, prometheus=None):
+    """
+    Aggregate the metrics log into per-operation latency and API call numbers.
+
+    Args:
+        log: Metrics log file (default: the one the scripts write)
+        since: Only include runs since this age or date (e.g. "24h")
+        script: Only include runs of this script
+        by: "script", or "args" to split scripts by the options used
+        table: Print text tables instead of JSON
+        prometheus: Also write a textfile collector file to this path
+    """
+    # The report itself is not a run worth measuring
+    discard_metrics()
+
+    log = log or metrics_log_path()
+    if not log:
+        output_error("Metrics are turned off (NOTION_SKILLS_METRICS=0)")
+
+    cutoff = parse_since(since) if since else None
+    records = []
+    for record in iter_metrics(log):
+        if script and record['script'] != script:
+            continue
+        if cutoff:
+            try:
+                if datetime.fromisoformat(record.get('ts', '')) < cutoff:
+                    continue
+            except (TypeError, ValueError):
+                continue
+        records.append(record)
+
+    operations = summarize(records, by)
+
+    if prometheus:
+        try:
+            write_text_atomic(prometheus, render_prometheus(operations))
+        except OSError as e:
+            output_error(f"Failed to write Prometheus file: {str(e)}")
+
+    if table:
+        print_tables(operations, len(records), since)
+        return
+
+    output_success({
+        "log": log,
+        "since": cutoff.isoformat() if cutoff else None,
+        "runs": len(records),
+        "operations": operations,
+        "prometheus_file": prometheus
+    })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Report p50/p95/p99 latency and API calls per operation from the scripts' metrics log"
+    )
+    parser.add_argument("--log", help="Metrics log file (default: metrics.jsonl in the cache directory)")
+    parser.add_argument("--since", help="Only runs in this window, e.g. 24h, 7d, or since a date (2024-12-01)")
+    parser.add_argument("--script", help="Only runs of this script, e.g. read_note")
+    parser.add_argument("--by", choices=["script", "args"], default="script",
+                        help="Group by script, or by script and the options used (default: script)")
+    parser.add_argument("--table", action="store_true", help="Print text tables instead of JSON")
+    parser.add_argument("--prometheus", help="Also write a Prometheus textfile collector file (.prom)")
+
+    args = parser.parse_args()
+
+    metrics_report(
+        log=args.log,
+        since=args.since,
+        script=args.script,
+        by=args.by,
+        table=args.table,
+        prometheus=args.prometheus
+    )
@@ -0,0 +1,719 @@
+#!/usr/bin/env python3
+"""
+Local SQLite mirror of the Notes and Projects databases.
+
+The mirror stores titles, the Archived flag, Project relations and
+created/edited times. After the first full sync, only pages whose
+last_edited_time is at or after the previous sync's watermark are pulled.
+Scripts use it in --local mode when it is fresh enough, and fall back to
+the live API otherwise.
+
+Note titles are also indexed by trigram, so read_note.py, edit_note.py and
+archive_note.py can resolve a partial or misspelled note name without API
+calls (see notes.find_note_by_name).
+
+When SQLite has FTS5, note bodies can also be indexed for full-text search
+with BM25 ranking. Only notes edited since they were last indexed are
+re-fetched.
+"""
+
+import math
+import os
+import re
+import sqlite3
+import time
+
+from common import (
+    ApiError, CACHE_DIR, MIRROR_MAX_STALENESS, NOTES_DB_ID, PROJECTS_DB_ID, NOTION_BASE_URL, MAX_CONCURRENCY, api_request,
+    extract_title, extract_archived, get_cache_path, map_concurrent, is_fresh_since_edit, trace_phase
+)
+from projects import extract_status
+from notes import MIN_TITLE_COVERAGE, title_trigrams
+from blocks import fetch_block_tree, blocks_to_plain_text
+
+MIRROR_FILE = "mirror.sqlite3"
+
+# Age (seconds) after which a sync is a full one. Database queries don't
+# return pages trashed in Notion, so only a full sync can drop them
+FULL_SYNC_INTERVAL = 24 * 60 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_lower TEXT NOT NULL,
+    archived INTEGER NOT NULL DEFAULT 0,
+    created_time TEXT,
+    last_edited_time TEXT,
+    url TEXT
+);
+CREATE TABLE IF NOT EXISTS note_projects (
+    note_id TEXT NOT NULL,
+    project_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (note_id, project_id)
+);
+CREATE INDEX IF NOT EXISTS idx_note_projects_project ON note_projects (project_id);
+CREATE INDEX IF NOT EXISTS idx_notes_title_lower ON notes (title_lower);
+CREATE TABLE IF NOT EXISTS note_trigrams (
+    trigram TEXT NOT NULL,
+    note_id TEXT NOT NULL,
+    PRIMARY KEY (trigram, note_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_note_trigrams_note ON note_trigrams (note_id);
+CREATE TABLE IF NOT EXISTS trigram_stats (
+    trigram TEXT PRIMARY KEY,
+    notes INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS note_trigrams_insert AFTER INSERT ON note_trigrams BEGIN
+    INSERT INTO trigram_stats (trigram, notes) VALUES (new.trigram, 1)
+    ON CONFLICT (trigram) DO UPDATE SET notes = notes + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS note_trigrams_delete AFTER DELETE ON note_trigrams BEGIN
+    UPDATE trigram_stats SET notes = notes - 1 WHERE trigram = old.trigram;
+END;
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    title_lower TEXT NOT NULL,
+    archived INTEGER NOT NULL DEFAULT 0,
+    status TEXT,
+    created_time TEXT,
+    last_edited_time TEXT
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    database_id TEXT PRIMARY KEY,
+    watermark TEXT,
+    synced_at REAL,
+    full_synced_at REAL
+);
+"""
+
+# Full-text index of note titles and bodies (requires SQLite FTS5)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS note_fts USING fts5(
+    title, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS note_bodies (
+    note_id TEXT PRIMARY KEY,
+    fts_rowid INTEGER NOT NULL,
+    last_edited_time TEXT,
+    indexed_at REAL
+);
+"""
+
+# Notes fetched concurrently per index batch (committed after each batch)
+INDEX_BATCH_SIZE = 50
+
+# Notes sharing the most trigrams with a name that are scored in Python
+TRIGRAM_CANDIDATES = 20
+
+def is_trashed(page):
+    """Check whether a page was archived or deleted in Notion itself."""
+    return bool(page.get('archived') or page.get('in_trash'))
+
+def extract_project_ids(page):
+    """Extract related project IDs from a note page, in relation order."""
+    project_prop = page.get('properties', {}).get('Project', {})
+    if project_prop.get('type') != 'relation':
+        return []
+    return [r.get('id') for r in project_prop.get('relation', []) if r.get('id')]
+
+# ============================================================================
+# CONNECTION
+# ============================================================================
+
+def connect(path=None):
+    """
+    Open the mirror database, creating the schema if needed.
+
+    WAL mode lets concurrently spawned scripts read while a sync writes.
+
+    Args:
+        path: Database path (defaults to MIRROR_FILE in the cache directory)
+
+    Returns:
+        sqlite3.Connection
+    """
+    conn = sqlite3.connect(path or get_cache_path(MIRROR_FILE), timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    # Mirrors created before full syncs were tracked
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(sync_state)")}
+    if 'full_synced_at' not in columns:
+        conn.execute("ALTER TABLE sync_state ADD COLUMN full_synced_at REAL")
+    try:
+        conn.executescript(FTS_SCHEMA)
+    except sqlite3.OperationalError:
+        pass  # SQLite built without FTS5: body search is unavailable
+    return conn
+
+def has_fts(conn):
+    """Check whether the full-text index exists in this mirror."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'note_fts'"
+    ).fetchone() is not None
+
+def get_sync_state(conn, database_id):
+    """
+    Get the sync state of one database.
+
+    Returns:
+        tuple: (watermark, synced_at), or (None, None) if never synced
+    """
+    row = conn.execute(
+        "SELECT watermark, synced_at FROM sync_state WHERE database_id = ?",
+        (database_id,)
+    ).fetchone()
+    if row is None:
+        return None, None
+    return row['watermark'], row['synced_at']
+
+def full_sync_due(conn, database_id, interval=FULL_SYNC_INTERVAL):
+    """Check whether a database's last full sync is older than interval seconds."""
+    row = conn.execute(
+        "SELECT full_synced_at FROM sync_state WHERE database_id = ?", (database_id,)
+    ).fetchone()
+    return row is None or row['full_synced_at'] is None or time.time() - row['full_synced_at'] > interval
+
+def open_fresh_mirror(max_staleness=MIRROR_MAX_STALENESS):
+    """
+    Open the mirror only if both databases were synced recently enough.
+
+    Args:
+        max_staleness: Maximum age of the last sync, in seconds
+
+    Returns:
+        sqlite3.Connection or None if the mirror is missing or stale
+    """
+    # A mirror that was never synced isn't created here
+    if not os.path.exists(os.path.join(CACHE_DIR, MIRROR_FILE)):
+        return None
+    try:
+        conn = connect()
+    except (sqlite3.Error, OSError):
+        return None
+
+    now = time.time()
+    for database_id in (NOTES_DB_ID, PROJECTS_DB_ID):
+        _, synced_at = get_sync_state(conn, database_id)
+        if synced_at is None or now - synced_at > max_staleness:
+            conn.close()
+            return None
+    return conn
+
+# ============================================================================
+# SYNC
+# ============================================================================
+
+def _upsert_note(conn, page):
+    title = extract_title(page)
+    conn.execute(
+        """INSERT OR REPLACE INTO notes
+           (id, title, title_lower, archived, created_time, last_edited_time, url)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (page['id'], title, title.lower(), int(extract_archived(page)),
+         page.get('created_time'), page.get('last_edited_time'), page.get('url', ''))
+    )
+    conn.execute("DELETE FROM note_projects WHERE note_id = ?", (page['id'],))
+    conn.executemany(
+        "INSERT OR IGNORE INTO note_projects (note_id, project_id, position) VALUES (?, ?, ?)",
+        [(page['id'], project_id, i) for i, project_id in enumerate(extract_project_ids(page))]
+    )
+    _index_title(conn, page['id'], title)
+
+def _index_title(conn, note_id, title):
+    conn.execute("DELETE FROM note_trigrams WHERE note_id = ?", (note_id,))
+    conn.executemany(
+        "INSERT OR IGNORE INTO note_trigrams (trigram, note_id) VALUES (?, ?)",
+        [(gram, note_id) for gram in title_trigrams(title)]
+    )
+
+def index_missing_titles(conn):
+    """
+    Add notes mirrored before the title index existed to it.
+
+    Returns:
+        int: Number of notes indexed
+    """
+    rows = conn.execute(
+        "SELECT id, title FROM notes n "
+        "WHERE NOT EXISTS (SELECT 1 FROM note_trigrams t WHERE t.note_id = n.id)"
+    ).fetchall()
+    for row in rows:
+        _index_title(conn, row['id'], row['title'])
+    return len(rows)
+
+def _upsert_project(conn, page):
+    title = extract_title(page)
+    conn.execute(
+        """INSERT OR REPLACE INTO projects
+           (id, title, title_lower, archived, status, created_time, last_edited_time)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (page['id'], title, title.lower(), int(extract_archived(page)),
+         extract_status(page), page.get('created_time'), page.get('last_edited_time'))
+    )
+
+def _edited_since_query(edited_since, page_size=100):
+    body = {
+        "page_size": page_size,
+        "sorts": [{"timestamp": "last_edited_time", "direction": "ascending"}]
+    }
+    if edited_since:
+        body["filter"] = {
+            "timestamp": "last_edited_time",
+            "last_edited_time": {"on_or_after": edited_since}
+        }
+    return body
+
+def fetch_changed_pages(database_id, edited_since, limit=100):
+    """
+    Fetch the pages edited since a sync's watermark, in a single request.
+
+    Args:
+        database_id: Database to query
+        edited_since: The sync's watermark (ISO timestamp)
+        limit: Most pages to fetch (at most 100)
+
+    Returns:
+        list: Page objects, or None if more than limit pages changed
+
+    Raises:
+        ApiError: If the API request fails
+    """
+    response = api_request(
+        "POST", f"{NOTION_BASE_URL}/databases/{database_id}/query",
+        json=_edited_since_query(edited_since, limit)
+    )
+    response.raise_for_status()
+    data = response.json()
+    if data.get('has_more', False):
+        return None
+    return data.get('results', [])
+
+def iter_database_pages(database_id, edited_since=None):
+    """
+    Page through a database, oldest edit first.
+
+    Args:
+        database_id: Database to query
+        edited_since: Optional ISO timestamp; only pages edited at or after it
+
+    Yields:
+        dict: Page objects
+
+    Raises:
+        ApiError: If the API request fails
+    """
+    url = f"{NOTION_BASE_URL}/databases/{database_id}/query"
+    body = _edited_since_query(edited_since)
+
+    while True:
+        response = api_request("POST", url, json=body)
+        response.raise_for_status()
+        data = response.json()
+        yield from data.get('results', [])
+        if not data.get('has_more', False):
+            break
+        body['start_cursor'] = data.get('next_cursor')
+
+def remove_page(conn, table, page_id):
+    """Drop one page (and, for notes, its project links and title index) from the mirror."""
+    conn.execute(f"DELETE FROM {table} WHERE id = ?", (page_id,))
+    if table == "notes":
+        conn.execute("DELETE FROM note_projects WHERE note_id = ?", (page_id,))
+        conn.execute("DELETE FROM note_trigrams WHERE note_id = ?", (page_id,))
+
+def sync_database(conn, database_id, full=False):
+    """
+    Pull new and changed pages of one database into the mirror.
+
+    Notion's last_edited_time has minute precision, so the watermark query
+    uses on_or_after and re-reads pages edited in the watermark's minute.
+    Pages archived or deleted in Notion are dropped when the query returns
+    them; a full sync also drops rows for pages it no longer returns.
+
+    Args:
+        conn: Mirror connection
+        database_id: NOTES_DB_ID or PROJECTS_DB_ID
+        full: If True, ignore the watermark and rebuild this table
+
+    Returns:
+        int: Number of pages pulled
+    """
+    watermark, _ = get_sync_state(conn, database_id)
+    started_at = time.time()
+    upsert = _upsert_project if database_id == PROJECTS_DB_ID else _upsert_note
+    table = "projects" if database_id == PROJECTS_DB_ID else "notes"
+
+    seen = []
+    new_watermark = watermark
+    for page in iter_database_pages(database_id, None if full else watermark):
+        if is_trashed(page):
+            remove_page(conn, table, page['id'])
+            continue
+        upsert(conn, page)
+        seen.append(page['id'])
+        edited = page.get('last_edited_time')
+        if edited and (new_watermark is None or edited > new_watermark):
+            new_watermark = edited
+
+    if full:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS seen_ids (id TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM seen_ids")
+        conn.executemany("INSERT OR IGNORE INTO seen_ids (id) VALUES (?)", [(i,) for i in seen])
+        conn.execute(f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM seen_ids)")
+        if table == "notes":
+            conn.execute("DELETE FROM note_projects WHERE note_id NOT IN (SELECT id FROM seen_ids)")
+            conn.execute("DELETE FROM note_trigrams WHERE note_id NOT IN (SELECT id FROM seen_ids)")
+    if table == "notes":
+        index_missing_titles(conn)
+
+    conn.execute(
+        """INSERT INTO sync_state (database_id, watermark, synced_at, full_synced_at) VALUES (?, ?, ?, ?)
+           ON CONFLICT (database_id) DO UPDATE SET watermark = excluded.watermark,
+           synced_at = excluded.synced_at,
+           full_synced_at = COALESCE(excluded.full_synced_at, sync_state.full_synced_at)""",
+        (database_id, new_watermark, started_at, started_at if full else None)
+    )
+    conn.commit()
+    return len(seen)
+
+def _fetch_note_text(note_id):
+    """Fetch a note's body as plain text, or None if it can't be read."""
+    try:
+        return blocks_to_plain_text(fetch_block_tree(note_id))
+    except ApiError:
+        return None
+
+def _index_body(conn, note_id, title, body, last_edited_time, indexed_at):
+    row = conn.execute(
+        "SELECT fts_rowid FROM note_bodies WHERE note_id = ?", (note_id,)
+    ).fetchone()
+    if row:
+        conn.execute("DELETE FROM note_fts WHERE rowid = ?", (row['fts_rowid'],))
+    cursor = conn.execute("INSERT INTO note_fts (title, body) VALUES (?, ?)", (title, body))
+    conn.execute(
+        "INSERT OR REPLACE INTO note_bodies (note_id, fts_rowid, last_edited_time, indexed_at) "
+        "VALUES (?, ?, ?, ?)",
+        (note_id, cursor.lastrowid, last_edited_time, indexed_at)
+    )
+
+def index_bodies(conn, max_workers=MAX_CONCURRENCY):
+    """
+    Bring the full-text index up to date with the mirrored notes.
+
+    Notes whose body was indexed before their last edit are re-fetched
+    (concurrently, in batches); index rows of deleted notes are dropped.
+
+    Args:
+        conn: Mirror connection
+        max_workers: Concurrent block fetches
+
+    Returns:
+        dict: {"indexed": int, "failed": int}
+    """
+    if not has_fts(conn):
+        raise sqlite3.OperationalError("SQLite FTS5 is not available")
+
+    conn.execute(
+        "DELETE FROM note_fts WHERE rowid IN "
+        "(SELECT fts_rowid FROM note_bodies WHERE note_id NOT IN (SELECT id FROM notes))"
+    )
+    conn.execute("DELETE FROM note_bodies WHERE note_id NOT IN (SELECT id FROM notes)")
+    conn.commit()
+
+    rows = conn.execute(
+        """SELECT n.id, n.title, n.last_edited_time,
+                  b.last_edited_time AS indexed_edit, b.indexed_at
+           FROM notes n LEFT JOIN note_bodies b ON b.note_id = n.id"""
+    ).fetchall()
+    pending = [
+        row for row in rows
+        if row['indexed_edit'] != row['last_edited_time']
+        or not is_fresh_since_edit(row['last_edited_time'], row['indexed_at'])
+    ]
+
+    indexed = failed = 0
+    for start in range(0, len(pending), INDEX_BATCH_SIZE):
+        batch = pending[start:start + INDEX_BATCH_SIZE]
+        fetched_at = time.time()
+        texts = map_concurrent(_fetch_note_text, [row['id'] for row in batch], max_workers)
+        for row, text in zip(batch, texts):
+            if text is None:
+                failed += 1
+                continue
+            _index_body(conn, row['id'], row['title'], text, row['last_edited_time'], fetched_at)
+            indexed += 1
+        conn.commit()
+
+    return {"indexed": indexed, "failed": failed}
+
+@trace_phase("sync mirror")
+def sync(full=False, bodies=False):
+    """
+    Sync both databases into the mirror.
+
+    A sync is full, even if not asked to be, once the last full sync is
+    older than FULL_SYNC_INTERVAL, so pages trashed in Notion leave the
+    mirror within a day.
+
+    Args:
+        full: If True, rebuild instead of pulling changes since the watermark
+        bodies: If True, also update the full-text index of note bodies
+
+    Returns:
+        dict: Pages pulled per database and sync duration
+    """
+    started = time.monotonic()
+    conn = connect()
+    try:
+        full = full or any(full_sync_due(conn, db) for db in (PROJECTS_DB_ID, NOTES_DB_ID))
+        projects_synced = sync_database(conn, PROJECTS_DB_ID, full=full)
+        notes_synced = sync_database(conn, NOTES_DB_ID, full=full)
+        body_result = index_bodies(conn) if bodies else None
+        totals = {
+            "notes": conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0],
+            "projects": conn.execute("SELECT COUNT(*) FROM projects").fetchone()[0]
+        }
+    finally:
+        conn.close()
+
+    result = {
+        "full": full,
+        "pulled": {"notes": notes_synced, "projects": projects_synced},
+        "totals": totals,
+        "duration_ms": round((time.monotonic() - started) * 1000)
+    }
+    if body_result is not None:
+        result["bodies"] = body_result
+    return result
+
+# ============================================================================
+# LOCAL QUERIES
+# ============================================================================
+
+def _escape_like(text):
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def _note_record(row):
+    return {
+        "id": row['id'],
+        "name": row['title'],
+        "project_name": row['project_name'],
+        "created": row['created_time'],
+        "updated": row['last_edited_time'],
+        "archived": bool(row['archived'])
+    }
+
+NOTE_COLUMNS = """
+    n.id, n.title, n.archived, n.created_time, n.last_edited_time,
+    (SELECT p.title FROM note_projects np JOIN projects p ON p.id = np.project_id
+     WHERE np.note_id = n.id ORDER BY np.position LIMIT 1) AS project_name
+"""
+
+def search_notes(conn, query, project_id=None, include_archived=False, limit=20):
+    """
+    Search mirrored note titles (case-insensitive substring match).
+
+    Returns:
+        list: Note records with id, name, project_name, created, updated, archived
+    """
+    sql = f"SELECT {NOTE_COLUMNS} FROM notes n WHERE n.title_lower LIKE ? ESCAPE '\\'"
+    params = [f"%{_escape_like(query.lower())}%"]
+    if not include_archived:
+        sql += " AND n.archived = 0"
+    if project_id:
+        sql += " AND n.id IN (SELECT note_id FROM note_projects WHERE project_id = ?)"
+        params.append(project_id)
+    sql += " ORDER BY n.created_time DESC LIMIT ?"
+    params.append(limit)
+    return [_note_record(row) for row in conn.execute(sql, params)]
+
+def _title_match_record(row):
+    return {
+        "id": row['id'],
+        "name": row['title'],
+        "updated": row['last_edited_time'],
+        "archived": bool(row['archived']),
+        "project_id": row['project_id']
+    }
+
+# First related project of a note, for telling identical titles apart
+FIRST_PROJECT_ID = """(SELECT np.project_id FROM note_projects np WHERE np.note_id = n.id
+                       ORDER BY np.position LIMIT 1) AS project_id"""
+
+def find_notes_by_title(conn, title, project_id=None, include_archived=False):
+    """
+    Find mirrored notes with exactly this title (case-insensitive).
+
+    Returns:
+        list: {"id", "name", "updated", "archived", "project_id"} dicts, newest edit first
+    """
+    sql = f"SELECT id, title, last_edited_time, archived, {FIRST_PROJECT_ID} FROM notes n WHERE n.title_lower = ?"
+    params = [title.strip().lower()]
+    if not include_archived:
+        sql += " AND n.archived = 0"
+    if project_id:
+        sql += " AND n.id IN (SELECT note_id FROM note_projects WHERE project_id = ?)"
+        params.append(project_id)
+    sql += " ORDER BY n.last_edited_time DESC"
+    return [_title_match_record(row) for row in conn.execute(sql, params)]
+
+def match_note_titles(conn, name, project_id=None, include_archived=False,
+                      min_coverage=MIN_TITLE_COVERAGE, limit=TRIGRAM_CANDIDATES):
+    """
+    Find mirrored notes whose titles may match a name, from the trigram index.
+
+    Only the name's rarest trigrams are looked up: a title containing at
+    least min_coverage of the name's trigrams must contain one of them, so
+    common trigrams (such as those of "notes") never need to be scanned.
+    notes.rank_title_matches scores the candidates.
+
+    Args:
+        conn: Mirror connection
+        name: Note name as typed (partial or misspelled)
+        project_id: Optional project ID to limit search
+        include_archived: If True, include archived notes
+        min_coverage: Share of the name's trigrams a title must contain
+        limit: Maximum candidates to return
+
+    Returns:
+        list: {"id", "name", "updated", "archived", "project_id"} dicts, most shared rare trigrams first
+    """
+    grams = list(title_trigrams(name))
+    if not grams:
+        return []
+
+    counts = dict(conn.execute(
+        f"SELECT trigram, notes FROM trigram_stats WHERE notes > 0 AND trigram IN ({', '.join('?' * len(grams))})",
+        grams
+    ).fetchall())
+    needed = len(counts) - math.ceil(min_coverage * len(grams)) + 1
+    if needed <= 0:
+        return []
+    rare = sorted(counts, key=counts.get)[:needed]
+
+    sql = f"""SELECT n.id, n.title, n.last_edited_time, n.archived, {FIRST_PROJECT_ID}
+              FROM (SELECT note_id, COUNT(*) AS shared FROM note_trigrams
+                    WHERE trigram IN ({", ".join("?" * len(rare))}) GROUP BY note_id) c
+              JOIN notes n ON n.id = c.note_id
+              WHERE 1 = 1"""
+    params = rare
+    if not include_archived:
+        sql += " AND n.archived = 0"
+    if project_id:
+        sql += " AND n.id IN (SELECT note_id FROM note_projects WHERE project_id = ?)"
+        params.append(project_id)
+    sql += " ORDER BY c.shared DESC, n.last_edited_time DESC LIMIT ?"
+    params.append(limit)
+    return [_title_match_record(row) for row in conn.execute(sql, params)]
+
+def list_project_notes(conn, project_id, include_archived=False, limit=100):
+    """
+    List mirrored notes related to a project.
+
+    Returns:
+        list: Note records with id, name, project_name, created, updated, archived
+    """
+    sql = (f"SELECT {NOTE_COLUMNS} FROM notes n "
+           "WHERE n.id IN (SELECT note_id FROM note_projects WHERE project_id = ?)")
+    params = [project_id]
+    if not include_archived:
+        sql += " AND n.archived = 0"
+    sql += " ORDER BY n.created_time DESC LIMIT ?"
+    params.append(limit)
+    return [_note_record(row) for row in conn.execute(sql, params)]
+
+def search_projects(conn, name, include_archived=False, limit=100):
+    """
+    Search mirrored project titles (case-insensitive substring match).
+
+    Returns:
+        list: Project records with id, name, status, archived
+    """
+    sql = "SELECT * FROM projects WHERE title_lower LIKE ? ESCAPE '\\'"
+    params = [f"%{_escape_like(name.lower())}%"]
+    if not include_archived:
+        sql += " AND archived = 0"
+    sql += " ORDER BY title LIMIT ?"
+    params.append(limit)
+    return [
+        {"id": row['id'], "name": row['title'], "status": row['status'],
+         "archived": bool(row['archived'])}
+        for row in conn.execute(sql, params)
+    ]
+
+def get_project_name(conn, project_id):
+    """Get a mirrored project's name, or None if it isn't mirrored."""
+    row = conn.execute("SELECT title FROM projects WHERE id = ?", (project_id,)).fetchone()
+    return row['title'] if row else None
+
+def build_fts_query(text):
+    """
+    Turn free text into a safe FTS5 query.
+
+    Every word must match; the last word also matches as a prefix so that
+    partially typed words still find results.
+
+    Args:
+        text: User search text
+
+    Returns:
+        str: FTS5 MATCH expression, or None if the text has no words
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return " ".join(terms)
+
+def search_bodies(conn, query, project_id=None, include_archived=False, limit=20):
+    """
+    Full-text search over indexed note titles and bodies, ranked by BM25.
+
+    Args:
+        conn: Mirror connection
+        query: Free-text search terms
+        project_id: Optional project ID to limit search
+        include_archived: If True, include archived notes
+        limit: Maximum results to return
+
+    Returns:
+        list: Note records with score and a highlighted snippet
+    """
+    match = build_fts_query(query)
+    if match is None:
+        return []
+
+    sql = f"""SELECT {NOTE_COLUMNS},
+                     bm25(note_fts, 2.0, 1.0) AS rank,
+                     snippet(note_fts, -1, '**', '**', '…', 16) AS snippet
+              FROM note_fts
+              JOIN note_bodies b ON b.fts_rowid = note_fts.rowid
+              JOIN notes n ON n.id = b.note_id
+              WHERE note_fts MATCH ?"""
+    params = [match]
+    if not include_archived:
+        sql += " AND n.archived = 0"
+    if project_id:
+        sql += " AND n.id IN (SELECT note_id FROM note_projects WHERE project_id = ?)"
+        params.append(project_id)
+    sql += " ORDER BY rank LIMIT ?"
+    params.append(limit)
+
+    results = []
+    for row in conn.execute(sql, params):
+        record = _note_record(row)
+        record["score"] = round(-row['rank'], 4)
+        record["snippet"] = row['snippet']
+        results.append(record)
+    return results
+
+def count_indexed_bodies(conn):
+    """Number of notes in the full-text index (0 if FTS5 is unavailable)."""
+    if not has_fts(conn):
+        return 0
+    return conn.execute("SELECT COUNT(*) FROM note_bodies").fetchone()[0]
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+Note lookups and updates shared by the Notion skill scripts.
+
+This module builds note pages, pages through Notes database queries and
+toggles the Archived property, so single-note scripts, bulk imports, bulk
+sweeps and combine_notes.py share one implementation. It also resolves note
+names for read_note.py, edit_note.py and archive_note.py: from the trigram
+title index in a fresh local mirror (checked against the notes edited since
+its last sync), and with a live "title contains" query otherwise.
+"""
+
+import re
+
+from common import (
+    ApiError, NOTES_DB_ID, NOTION_BASE_URL, api_request, note_key,
+    build_title_filter, build_project_filter, build_archived_filter, combine_filters,
+    extract_title, trace_phase
+)
+from projects import ProjectLookupError, resolve_project, choose_project, get_project_names
+
+# Share of a name's trigrams a title must contain to be resolved from the index
+MIN_TITLE_COVERAGE = 0.6
+
+# Name lookups use the mirror's title index if it was synced within this many seconds
+NOTE_INDEX_MAX_STALENESS = 24 * 60 * 60
+
+# Page size of the live lookup query
+NAME_QUERY_PAGE_SIZE = 20
+
+WORD_PATTERN = re.compile(r'\w+')
+
+class NoteLookupError(Exception):
+    """
+    Raised when a note name cannot be resolved to a note.
+
+    Attributes:
+        message: Human-readable error message
+        details: Optional dict with structured details (e.g. "matches")
+    """
+
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+
+def is_archived(page):
+    """Get the Archived checkbox of a note page."""
+    return page.get('properties', {}).get('Archived', {}).get('checkbox', False)
+
+def first_project_id(page):
+    """Get the ID of the first project a note is related to, or None."""
+    project_prop = page.get('properties', {}).get('Project', {})
+    if project_prop.get('type') == 'relation':
+        relations = project_prop.get('relation', [])
+        if relations:
+            return relations[0].get('id')
+    return None
+
+def build_note_page(title, children=None, archived=False, properties=None):
+    """
+    Build the page creation payload for a note in the Notes database.
+
+    Args:
+        title: Title of the note
+        children: Initial block objects (at most 100)
+        archived: Value of the Archived property
+        properties: Optional extra page properties
+
+    Returns:
+        dict: Request body for POST /pages
+    """
+    page_data = {
+        "parent": {
+            "database_id": NOTES_DB_ID
+        },
+        "properties": {
+            "Name": {
+                "title": [
+                    {
+                        "type": "text",
+                        "text": {
+                            "content": title.strip()
+                        }
+                    }
+                ]
+            },
+            "Archived": {
+                "checkbox": archived
+            }
+        }
+    }
+
+    if properties:
+        page_data["properties"].update(properties)
+
+    # Add children (content blocks) if any
+    if children:
+        page_data["children"] = children
+
+    return page_data
+
+@trace_phase("create page")
+def create_note_page(title, children=None, archived=False, properties=None):
+    """
+    Create a note page, with up to 100 initial content blocks.
+
+    Args:
+        title: Title of the note
+        children: Initial block objects (at most 100)
+        archived: Value of the Archived property
+        properties: Optional extra page properties
+
+    Returns:
+        dict: The created page object
+
+    Raises:
+        ApiError: If the request fails
+    """
+    url = f"{NOTION_BASE_URL}/pages"
+    response = api_request("POST", url, json=build_note_page(title, children, archived, properties))
+    response.raise_for_status()
+    return response.json()
+
+def iter_notes(filter=None, sorts=None, limit=None):
+    """
+    Page through a Notes database query.
+
+    Args:
+        filter: Optional filter object
+        sorts: Optional list of sort objects
+        limit: Maximum number of notes to yield (None for all)
+
+    Yields:
+        dict: Note page objects
+
+    Raises:
+        ApiError: If a query fails
+    """
+    url = f"{NOTION_BASE_URL}/databases/{NOTES_DB_ID}/query"
+    body = {"page_size": min(limit, 100) if limit else 100}
+    if filter:
+        body["filter"] = filter
+    if sorts:
+        body["sorts"] = sorts
+
+    count = 0
+    while True:
+        response = api_request("POST", url, json=body)
+        response.raise_for_status()
+        data = response.json()
+
+        for page in data.get('results', []):
+            yield page
+            count += 1
+            if limit and count >= limit:
+                return
+
+        if not data.get('has_more', False):
+            return
+        body['start_cursor'] = data.get('next_cursor')
+
+def set_archived(note_id, archived=True):
+    """
+    Set a note's Archived checkbox.
+
+    Args:
+        note_id: Note ID
+        archived: New value of the Archived property
+
+    Returns:
+        dict: Updated page object
+
+    Raises:
+        ApiError: If the update fails
+    """
+    url = f"{NOTION_BASE_URL}/pages/{note_id}"
+    update_data = {
+        "properties": {
+            "Archived": {
+                "checkbox": archived
+            }
+        }
+    }
+    response = api_request("PATCH", url, json=update_data)
+    response.raise_for_status()
+    return response.json()
+
+# ============================================================================
+# NAME RESOLUTION
+# ============================================================================
+
+def title_trigrams(text):
+    """
+    Get the set of trigrams of a title, for fuzzy matching.
+
+    Each word is lowercased and padded (two spaces before, one after), so
+    short words and word starts carry weight, as in PostgreSQL's pg_trgm.
+
+    Args:
+        text: Title or name
+
+    Returns:
+        set: Three-character strings
+    """
+    grams = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def rank_title_matches(candidates, name):
+    """
+    Score and order candidate notes by how well their titles match a name.
+
+    An exact case-insensitive title wins. Otherwise notes are ordered by
+    coverage (share of the name's trigrams found in the title), then by
+    similarity (shared trigrams over all trigrams of both, so shorter
+    titles win), then by most recent edit. See ambiguous_matches() for
+    when the order alone doesn't decide.
+
+    Args:
+        candidates: Dicts with "id", "name", "updated" and "project_id"
+        name: The name that was asked for
+
+    Returns:
+        list: The candidates with "exact", "coverage" and "similarity" added, best first
+    """
+    wanted = name.strip().lower()
+    name_grams = title_trigrams(name)
+    for candidate in candidates:
+        grams = title_trigrams(candidate['name'])
+        shared = len(name_grams & grams)
+        union = len(name_grams | grams)
+        candidate['exact'] = candidate['name'].strip().lower() == wanted
+        candidate['coverage'] = round(shared / len(name_grams), 3) if name_grams else 0.0
+        candidate['similarity'] = round(shared / union, 3) if union else 0.0
+    return sorted(
+        candidates,
+        key=lambda c: (c['exact'], c['coverage'], c['similarity'], c.get('updated') or ''),
+        reverse=True
+    )
+
+def ambiguous_matches(ranked):
+    """
+    Get the best-ranked candidates that only their edit time tells apart.
+
+    Titles that match equally well without being exact (e.g. "Meeting notes
+    Sep" and "Meeting notes Oct" for "meeting notes") are ambiguous.
+    Identical titles are told apart by project: within one project the most
+    recently edited note wins, across projects the caller has to name the
+    project.
+
+    Args:
+        ranked: Candidates from rank_title_matches()
+
+    Returns:
+        list: The tied candidates, or [] if the first one is a clear winner
+    """
+    if not ranked:
+        return []
+    best = ranked[0]
+    score = (best['exact'], best['coverage'], best['similarity'])
+    tied = [c for c in ranked if (c['exact'], c['coverage'], c['similarity']) == score]
+    if len(tied) < 2:
+        return []
+    if best['exact'] and len({c.get('project_id') for c in tied}) == 1:
+        return []
+    return tied
+
+def ambiguous_match_error(note_name, tied):
+    """Build the "Multiple notes match" error, naming each tied note's project."""
+    tied = tied[:5]
+    project_names = get_project_names(c.get('project_id') for c in tied)
+    return NoteLookupError(
+        f"Multiple notes match '{note_name}'. Please be more specific (or give the project):",
+        {"matches": [
+            {"id": c['id'], "name": c['name'], "project": project_names.get(c.get('project_id'))}
+            for c in tied
+        ]}
+    )
+
+def find_note_in_index(note_name, project_name=None, include_archived=False,
+                       max_staleness=NOTE_INDEX_MAX_STALENESS):
+    """
+    Resolve a note name from the mirror's title index.
+
+    Notes edited since the last sync are fetched with one query (edited at
+    or after the sync's watermark) and replace their mirrored rows, so notes
+    created, renamed or archived since then are matched as they are now.
+
+    Args:
+        note_name: Name of the note to find (exact, partial or misspelled)
+        project_name: Optional project name to limit search
+        include_archived: Whether to include archived notes
+        max_staleness: Maximum age of the mirror's last sync, in seconds
+
+    Returns:
+        dict: Best candidate (see rank_title_matches), or None if the mirror
+              is missing or stale, more notes changed since the sync than one
+              query returns, or no title matches well enough
+
+    Raises:
+        NoteLookupError: If several notes match equally well
+    """
+    # Loaded here: only name lookups need the mirror (and SQLite)
+    import sqlite3
+    import mirror
+
+    conn = mirror.open_fresh_mirror(max_staleness)
+    if conn is None:
+        return None
+
+    # Archived notes are ranked too: if the best title belongs to a note that
+    # is filtered out, a different note must not win in its place
+    try:
+        project_id = None
+        if project_name:
+            project_id = choose_project(mirror.search_projects(conn, project_name), project_name)['id']
+        watermark, _ = mirror.get_sync_state(conn, NOTES_DB_ID)
+        # Exact titles are an indexed lookup; the trigram index is for the rest
+        candidates = mirror.find_notes_by_title(conn, note_name, project_id, include_archived=True)
+        if not candidates:
+            candidates = mirror.match_note_titles(conn, note_name, project_id, include_archived=True)
+    except (ProjectLookupError, sqlite3.Error):
+        # Unknown to the mirror, or the mirror is unreadable: ask the API
+        return None
+    finally:
+        conn.close()
+
+    try:
+        changed = mirror.fetch_changed_pages(NOTES_DB_ID, watermark)
+    except ApiError:
+        return None
+    if changed is None:
+        return None
+
+    changed_ids = {note_key(page['id']) for page in changed}
+    candidates = [c for c in candidates if note_key(c['id']) not in changed_ids]
+    for page in changed:
+        if mirror.is_trashed(page):
+            continue
+        if project_id and note_key(project_id) not in {note_key(p) for p in mirror.extract_project_ids(page)}:
+            continue
+        candidates.append({
+            "id": page['id'],
+            "name": extract_title(page),
+            "updated": page.get('last_edited_time'),
+            "archived": is_archived(page),
+            "project_id": first_project_id(page)
+        })
+
+    ranked = rank_title_matches(candidates, note_name)
+    if not ranked or not (ranked[0]['exact'] or ranked[0]['coverage'] >= MIN_TITLE_COVERAGE):
+        return None
+    if ranked[0]['archived'] and not include_archived:
+        return None
+    ranked = [c for c in ranked if include_archived or not c['archived']]
+    tied = ambiguous_matches(ranked)
+    if tied:
+        raise ambiguous_match_error(note_name, tied)
+    return ranked[0]
+
+def find_note_live(note_name, project_name=None, include_archived=False):
+    """
+    Resolve a note name with a "title contains" query of the Notes database.
+
+    Args:
+        note_name: Name of the note to find
+        project_name: Optional project name to limit search
+        include_archived: Whether to include archived notes
+
+    Returns:
+        dict: Best candidate (see rank_title_matches)
+
+    Raises:
+        NoteLookupError: If the project or note can't be found, several
+                         notes match equally well, or the query fails
+    """
+    project_id = None
+    if project_name:
+        try:
+            project_id = resolve_project(project_name)['id']
+        except ProjectLookupError as e:
+            raise NoteLookupError(e.message, e.details)
+
+    project_filter = build_project_filter(project_id) if project_id else None
+    combined_filter = combine_filters(
+        build_title_filter(note_name), build_archived_filter(include_archived), project_filter
+    )
+
+    try:
+        pages = list(iter_notes(combined_filter, limit=NAME_QUERY_PAGE_SIZE))
+    except ApiError as e:
+        raise NoteLookupError(f"API request failed: {str(e)}")
+
+    if not pages:
+        raise NoteLookupError(f"No notes found matching '{note_name}'")
+
+    ranked = rank_title_matches([
+        {
+            "id": page['id'],
+            "name": extract_title(page),
+            "updated": page.get('last_edited_time'),
+            "project_id": first_project_id(page)
+        }
+        for page in pages
+    ], note_name)
+    tied = ambiguous_matches(ranked)
+    if tied:
+        raise ambiguous_match_error(note_name, tied)
+    return ranked[0]
+
+@trace_phase("find note")
+def find_note_by_name(note_name, project_name=None, include_archived=False, use_index=True):
+    """
+    Find a note by name (and optionally by project).
+
+    While the mirror is fresh, the name is resolved from its title index
+    (exact, partial or misspelled), with one query for the notes edited
+    since the last sync. When the mirror is stale or missing, or has no
+    good match, the Notes database is queried live with "title contains".
+    Among several matches the closest title wins; equally close titles
+    raise an error listing them (see ambiguous_matches).
+
+    Args:
+        note_name: Name of the note to find
+        project_name: Optional project name to limit search
+        include_archived: Whether to include archived notes
+        use_index: If False, always query the API
+
+    Returns:
+        str: Note ID
+
+    Raises:
+        NoteLookupError: If no note matches, or several match equally well
+    """
+    match = find_note_in_index(note_name, project_name, include_archived) if use_index else None
+    if match is None:
+        match = find_note_live(note_name, project_name, include_archived)
+    return match['id']
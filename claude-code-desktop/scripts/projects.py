@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Project lookups shared by the Notion skill scripts.
+
+This module resolves project names to project records in-process, so scripts
+no longer shell out to search_projects.py to find a project ID. It also maps
+project IDs back to names, once per distinct ID per process, optionally backed
+by a persistent ID->name map built from a single scan of the Projects database.
+"""
+
+import threading
+import time
+
+from common import (
+    ApiError, PROJECTS_DB_ID, NOTION_BASE_URL, api_request,
+    build_title_filter, build_archived_filter, combine_filters,
+    extract_title, extract_archived, map_concurrent,
+    get_cache_path, read_json_file, write_json_atomic, trace_phase
+)
+
+# Persistent ID->name map, rebuilt when older than this many seconds
+PROJECT_MAP_FILE = "project_names.json"
+PROJECT_MAP_MAX_AGE = 24 * 60 * 60
+
+# Per-process memo of project ID -> name (None when the page can't be read)
+_project_names = {}
+_project_names_lock = threading.Lock()
+
+class ProjectLookupError(Exception):
+    """
+    Raised when a project name cannot be resolved to exactly one project.
+
+    Attributes:
+        message: Human-readable error message
+        details: Optional dict with structured details (e.g. "matches")
+    """
+
+    def __init__(self, message, details=None):
+        super().__init__(message)
+        self.message = message
+        self.details = details
+
+def extract_status(page):
+    """Extract status from a project page."""
+    status_prop = page.get('properties', {}).get('Status', {})
+    if status_prop.get('type') == 'status':
+        status_obj = status_prop.get('status', {})
+        return status_obj.get('name', 'Unknown')
+    return None
+
+def format_project(page):
+    """
+    Convert a project page object into the compact project record.
+
+    Args:
+        page: Notion page object from the Projects database
+
+    Returns:
+        dict: {"id", "name", "status", "archived"}
+    """
+    return {
+        "id": page['id'],
+        "name": extract_title(page),
+        "status": extract_status(page),
+        "archived": extract_archived(page)
+    }
+
+def query_projects(name, include_archived=False, limit=100):
+    """
+    Query the Projects database for titles containing a name.
+
+    Args:
+        name: Text to search for in project titles
+        include_archived: If True, include archived projects
+        limit: Page size of the query (max 100)
+
+    Returns:
+        list: Project page objects
+
+    Raises:
+        ProjectLookupError: If the API request fails
+    """
+    title_filter = build_title_filter(name)
+    archived_filter = build_archived_filter(include_archived)
+    combined_filter = combine_filters(title_filter, archived_filter)
+
+    body = {
+        "page_size": min(limit, 100)
+    }
+    if combined_filter:
+        body["filter"] = combined_filter
+
+    url = f"{NOTION_BASE_URL}/databases/{PROJECTS_DB_ID}/query"
+
+    try:
+        response = api_request("POST", url, json=body)
+        response.raise_for_status()
+    except ApiError as e:
+        raise ProjectLookupError(f"API request failed: {str(e)}")
+
+    return response.json().get('results', [])
+
+def exact_matches(pages, name):
+    """Filter project pages to case-insensitive exact title matches."""
+    return [p for p in pages if extract_title(p).lower() == name.lower()]
+
+@trace_phase("resolve project")
+def resolve_project(name, include_archived=False):
+    """
+    Resolve a project name to a single project.
+
+    A single "title contains" query is made. An exact case-insensitive title
+    match wins; otherwise a lone partial match is accepted.
+
+    Args:
+        name: Project name (exact or partial)
+        include_archived: If True, include archived projects
+
+    Returns:
+        dict: Project record, see format_project()
+
+    Raises:
+        ProjectLookupError: If no project or more than one project matches
+    """
+    pages = query_projects(name, include_archived)
+    return choose_project([format_project(p) for p in pages], name)
+
+def choose_project(projects, name):
+    """
+    Pick the single project a name refers to from partial-match candidates.
+
+    Args:
+        projects: Project records whose names contain the name
+        name: The name that was searched for
+
+    Returns:
+        dict: The exact case-insensitive match, or the only candidate
+
+    Raises:
+        ProjectLookupError: If no project or more than one project matches
+    """
+    candidates = [p for p in projects if p['name'].lower() == name.lower()] or projects
+
+    if not candidates:
+        raise ProjectLookupError(
+            f"No projects found matching '{name}'. Try using the search_projects.py script directly to see available projects.",
+            {"query": name}
+        )
+    if len(candidates) > 1:
+        raise ProjectLookupError(
+            f"Multiple projects match '{name}'. Please be more specific:",
+            {"matches": [p['name'] for p in candidates[:10]]}
+        )
+
+    return candidates[0]
+
+def get_project_name(project_id):
+    """
+    Get a project's name from its ID, fetching the page at most once per process.
+
+    Args:
+        project_id: Project page ID
+
+    Returns:
+        str: Project name or None if not found
+    """
+    with _project_names_lock:
+        if project_id in _project_names:
+            return _project_names[project_id]
+
+    name = None
+    url = f"{NOTION_BASE_URL}/pages/{project_id}"
+    try:
+        response = api_request("GET", url)
+        if response.status_code == 200:
+            name = extract_title(response.json())
+    except ApiError:
+        pass
+
+    with _project_names_lock:
+        _project_names[project_id] = name
+    return name
+
+def clear_project_names():
+    """Forget memoized project names (for long-running processes)."""
+    with _project_names_lock:
+        _project_names.clear()
+
+def scan_project_names():
+    """
+    Page through the whole Projects database and collect every project name.
+
+    Returns:
+        dict: Project ID -> name (archived projects included)
+
+    Raises:
+        ApiError: If the API request fails
+    """
+    url = f"{NOTION_BASE_URL}/databases/{PROJECTS_DB_ID}/query"
+    body = {"page_size": 100}
+    names = {}
+
+    while True:
+        response = api_request("POST", url, json=body)
+        response.raise_for_status()
+        data = response.json()
+        for page in data.get('results', []):
+            names[page['id']] = extract_title(page)
+        if not data.get('has_more', False):
+            break
+        body['start_cursor'] = data.get('next_cursor')
+
+    return names
+
+def load_project_map(max_age=PROJECT_MAP_MAX_AGE, refresh=False):
+    """
+    Load the persistent project ID->name map, rebuilding it when stale.
+
+    Args:
+        max_age: Maximum age in seconds before the map is rebuilt
+        refresh: If True, always rebuild the map
+
+    Returns:
+        dict: Project ID -> name (empty if the map can't be built)
+    """
+    path = get_cache_path(PROJECT_MAP_FILE)
+    cached = read_json_file(path, {})
+    if not refresh and cached and time.time() - cached.get('synced_at', 0) < max_age:
+        return cached.get('projects', {})
+
+    try:
+        names = scan_project_names()
+    except ApiError:
+        # Fall back to whatever we had; missing IDs are fetched individually
+        return cached.get('projects', {})
+
+    write_json_atomic(path, {"synced_at": time.time(), "projects": names})
+    return names
+
+def get_project_names(project_ids, use_map=False):
+    """
+    Resolve many project IDs to names, once per distinct ID.
+
+    Args:
+        project_ids: Iterable of project IDs (duplicates and None allowed)
+        use_map: If True, consult the persistent project map first
+
+    Returns:
+        dict: Project ID -> name (None if not found)
+    """
+    distinct_ids = list(dict.fromkeys(pid for pid in project_ids if pid))
+    if not distinct_ids:
+        return {}
+
+    if use_map:
+        project_map = load_project_map()
+        with _project_names_lock:
+            for pid in distinct_ids:
+                if pid in project_map:
+                    _project_names.setdefault(pid, project_map[pid])
+
+    names = map_concurrent(get_project_name, distinct_ids)
+    return dict(zip(distinct_ids, names))
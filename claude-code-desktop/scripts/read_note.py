@@ -3,155 +3,177 @@
 Read the full content of a Notion note.
 
 This script fetches a note's metadata and content blocks, returning them in JSON format.
+Several notes can be read in one invocation (repeat --id/--name, or pass a
+JSON list with --stdin): they are fetched concurrently and returned as a list.
 """
 
 import argparse
-import requests
-import sys
-import subprocess
 import json
+import sys
 import time
 from common import (
-    NOTES_DB_ID, NOTION_BASE_URL, get_headers,
-    build_title_filter, build_project_filter, build_archived_filter, combine_filters,
-    output_success, output_error, extract_title, extract_block_text
+    ApiError, NOTION_BASE_URL, MAX_CONCURRENCY, api_request, map_concurrent, note_key,
+    output_success, output_error, extract_title, extract_archived, extract_block_text, trace_phase
+)
+from notes import NoteLookupError, find_note_by_name, first_project_id
+from projects import get_project_name, get_project_names
+from blocks import (
+    fetch_block_tree, iter_block_children, walk_block_tree, iter_blocks,
+    format_block_tree, blocks_to_markdown
 )
+import block_cache
 
-def get_project_name_from_id(project_id):
-    """Get project name from ID by fetching the page."""
-    headers = get_headers()
-    url = f"{NOTION_BASE_URL}/pages/{project_id}"
+# Characters of note text in the "summary" format
+SUMMARY_CHARS = 500
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            page = response.json()
-            return extract_title(page)
-    except:
-        pass
+# Block types listed by the "outline" format, with their heading level
+HEADING_LEVELS = {"heading_1": 1, "heading_2": 2, "heading_3": 3}
 
-    return None
+def fetch_note_page(note_id):
+    """
+    Fetch a note's page object.
 
-def find_note_by_name(note_name, project_name=None):
+    Raises:
+        ApiError: If the request fails
+    """
+    response = api_request("GET", f"{NOTION_BASE_URL}/pages/{note_id}")
+    response.raise_for_status()
+    return response.json()
+
+def fetch_note_content(note_id, last_edited_time=None, format="full", use_cache=True):
     """
-    Find a note by name (and optionally by project).
+    Get the "content" part of a note's output in the given format.
+
+    When last_edited_time is given, an unchanged note is served from the
+    on-disk block cache without fetching its blocks. Otherwise "full" and
+    "text-only" fetch the whole block tree (and cache it), while "summary"
+    and "outline" only fetch what they show: the summary walks the note in
+    document order and stops requesting blocks once it has SUMMARY_CHARS of
+    text, and the outline reads the top-level blocks without their children.
+    Those partial reads are not cached.
 
     Args:
-        note_name: Name of the note to find
-        project_name: Optional project name to limit search
+        note_id: Note ID
+        last_edited_time: The page's last_edited_time (enables the cache)
+        format: Output format ("full", "text-only", "summary" or "outline")
+        use_cache: If False, always fetch from the API
 
     Returns:
-        str: Note ID
+        dict: Content as returned under "content"
 
     Raises:
-        SystemExit: If note not found or multiple matches
+        ApiError: If fetching the blocks fails
     """
-    # Build search query
-    headers = get_headers()
-    title_filter = build_title_filter(note_name)
-
-    # If project name provided, resolve it first
-    project_id = None
-    if project_name:
-        import os
-        # Try to locate the search_projects.py script
-        script_path = "~/.claude/scripts/notion/search_projects.py"
-        if not os.path.exists(script_path):
-            fallback_paths = [
-                "/root/notion/scripts/skills/search_projects.py",
-                os.path.expanduser("~/.claude/scripts/notion/search_projects.py")
-            ]
-            for path in fallback_paths:
-                if os.path.exists(path):
-                    script_path = path
-                    break
-
-        try:
-            result = subprocess.run(
-                ["python3", script_path,
-                 "--name", project_name, "--limit", "1"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            if result.returncode == 0:
-                data = json.loads(result.stdout)
-                if data['success']:
-                    project_id = data['data']['projects'][0]['id']
-        except:
-            pass
-
-    project_filter = build_project_filter(project_id) if project_id else None
-    archived_filter = build_archived_filter(include_archived=False)
-    combined_filter = combine_filters(title_filter, archived_filter, project_filter)
-
-    body = {"page_size": 20}
-    if combined_filter:
-        body["filter"] = combined_filter
-
-    url = f"{NOTION_BASE_URL}/databases/{NOTES_DB_ID}/query"
+    use_cache = use_cache and bool(last_edited_time)
+    blocks = block_cache.get_blocks(note_id, last_edited_time) if use_cache else None
 
-    try:
-        response = requests.post(url, headers=headers, json=body, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        output_error(f"API request failed: {str(e)}")
-
-    results = response.json().get('results', [])
-
-    if not results:
-        output_error(f"No notes found matching '{note_name}'")
-
-    # Check for exact match
-    exact_matches = [r for r in results if extract_title(r).lower() == note_name.lower()]
-    if exact_matches:
-        return exact_matches[0]['id']
-
-    # If multiple matches, ask for clarification
-    if len(results) > 1:
-        matches = [extract_title(r) for r in results[:5]]
-        output_error(
-            f"Multiple notes match '{note_name}'. Please be more specific:",
-            {"matches": matches}
-        )
+    if blocks is None and format in ("summary", "outline"):
+        with trace_phase("fetch blocks"):
+            if format == "summary":
+                return {"summary": summarize_blocks(walk_block_tree(note_id))}
+            return outline_blocks(iter_block_children(note_id))
 
-    return results[0]['id']
+    if blocks is None:
+        fetched_at = time.time()
+        blocks = fetch_block_tree(note_id)
+        if use_cache:
+            block_cache.put_blocks(note_id, last_edited_time, blocks, fetched_at)
 
-def get_note_content(note_id):
+    if format == "text-only":
+        # Markdown-like text, nested blocks indented
+        return {"text": blocks_to_markdown(blocks)}
+    if format == "summary":
+        return {"summary": summarize_blocks(iter_blocks(blocks))}
+    if format == "outline":
+        return outline_blocks(blocks)
+
+    # format == "full": full block structure (nested blocks under "children")
+    formatted_blocks = format_block_tree(blocks)
+    return {
+        "block_count": len(formatted_blocks),
+        "blocks": formatted_blocks
+    }
+
+def summarize_blocks(blocks):
     """
-    Get full content blocks of a note.
+    Get the first SUMMARY_CHARS characters of a note's text.
 
     Args:
-        note_id: Note ID
+        blocks: Blocks in document order; a lazy walk is only consumed until
+                the text runs past SUMMARY_CHARS
 
     Returns:
-        list: List of block objects
+        str: Summary text, with "..." if the note has more
     """
-    headers = get_headers()
-    url = f"{NOTION_BASE_URL}/blocks/{note_id}/children"
-    blocks = []
+    text_lines = []
+    length = -1
+    for block in blocks:
+        block_text = extract_block_text(block).get('text', '')
+        if block_text:
+            text_lines.append(block_text)
+            length += len(block_text) + 1
+            if length > SUMMARY_CHARS:
+                break
 
-    try:
-        while True:
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
+    full_text = " ".join(text_lines)
+    return full_text[:SUMMARY_CHARS] + ("..." if len(full_text) > SUMMARY_CHARS else "")
 
-            data = response.json()
-            blocks.extend(data.get('results', []))
+def outline_blocks(blocks):
+    """
+    List the headings among a note's top-level blocks.
 
-            # Check for pagination
-            if not data.get('has_more', False):
-                break
+    Args:
+        blocks: Top-level blocks in document order (children are ignored)
 
-            # Get next page
-            url = f"{NOTION_BASE_URL}/blocks/{note_id}/children?start_cursor={data.get('next_cursor')}"
-            time.sleep(0.3)  # Rate limiting
-    except requests.exceptions.RequestException as e:
-        output_error(f"Failed to fetch note content: {str(e)}")
+    Returns:
+        dict: {"block_count", "headings": [{"offset", "level", "text", "id"}]},
+              offset being the heading's position among the top-level blocks
+    """
+    headings = []
+    block_count = 0
+    for offset, block in enumerate(blocks):
+        block_count += 1
+        level = HEADING_LEVELS.get(block.get('type'))
+        if level:
+            headings.append({
+                "offset": offset,
+                "level": level,
+                "text": extract_block_text(block).get('text', ''),
+                "id": block.get('id')
+            })
+    return {"block_count": block_count, "headings": headings}
+
+def format_note(note_id, page, content, format="full", project_name=None):
+    """
+    Build the result of reading one note.
+
+    Args:
+        note_id: Note ID as requested
+        page: Note page object
+        content: Content from fetch_note_content()
+        format: "full", "text-only", "summary" or "outline"
+        project_name: Name of the note's first project (all but text-only)
 
-    return blocks
+    Returns:
+        dict: {"note": {...}, "content": {...}}
+    """
+    note = {
+        "id": note_id,
+        "name": extract_title(page)
+    }
+    if format != "text-only":
+        note["project"] = project_name
+    if format == "full":
+        note.update({
+            "created": page.get('created_time'),
+            "updated": page.get('last_edited_time'),
+            "archived": extract_archived(page),
+            # Pages read by ID can be in Notion's trash, which queries never return
+            "in_trash": bool(page.get('in_trash') or page.get('archived'))
+        })
+    return {"note": note, "content": content}
 
-def read_note(note_id=None, note_name=None, project_name=None, format="full"):
+def read_note(note_id=None, note_name=None, project_name=None, format="full", use_cache=True):
     """
     Read a note's content.
 
@@ -159,139 +181,201 @@ def read_note(note_id=None, note_name=None, project_name=None, format="full"):
         note_id: Note ID (if not provided, note_name is required)
         note_name: Note name to search for
         project_name: Optional project name to limit search
-        format: Output format ("full", "text-only", or "summary")
+        format: Output format ("full", "text-only", "summary" or "outline")
+        use_cache: If False, bypass the on-disk block cache
     """
     # Resolve note name to ID if needed
     if note_name and not note_id:
-        note_id = find_note_by_name(note_name, project_name)
+        try:
+            note_id = find_note_by_name(note_name, project_name)
+        except NoteLookupError as e:
+            output_error(e.message, e.details)
 
     if not note_id:
         output_error("Either --id or --name must be provided")
 
-    headers = get_headers()
-
     # Get note metadata
-    url = f"{NOTION_BASE_URL}/pages/{note_id}"
-
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
+        page = fetch_note_page(note_id)
+    except ApiError as e:
         output_error(f"Failed to fetch note: {str(e)}")
 
-    page = response.json()
-    note_title = extract_title(page)
-
-    # Get project if assigned
+    # The text-only format doesn't show the project
     note_project = None
-    project_prop = page.get('properties', {}).get('Project', {})
-    if project_prop.get('type') == 'relation':
-        relations = project_prop.get('relation', [])
-        if relations:
-            note_project_id = relations[0].get('id')
-            note_project = get_project_name_from_id(note_project_id)
+    if format != "text-only" and first_project_id(page):
+        note_project = get_project_name(first_project_id(page))
 
     # Get content blocks
-    blocks = get_note_content(note_id)
+    try:
+        content = fetch_note_content(note_id, page.get('last_edited_time'), format, use_cache)
+    except ApiError as e:
+        output_error(f"Failed to fetch note content: {str(e)}")
 
-    # Format output based on requested format
-    if format == "text-only":
-        # Convert blocks to markdown-like text
-        text_lines = []
-        for block in blocks:
-            block_data = extract_block_text(block)
-            block_text = block_data.get('text', '')
-            if block_data.get('type') == 'heading_1':
-                text_lines.append(f"# {block_text}")
-            elif block_data.get('type') == 'heading_2':
-                text_lines.append(f"## {block_text}")
-            elif block_data.get('type') == 'heading_3':
-                text_lines.append(f"### {block_text}")
-            elif block_data.get('type') == 'code':
-                language = block_data.get('language', 'plain text')
-                text_lines.append(f"```{language}\n{block_text}\n```")
-            elif block_data.get('type') == 'bulleted_list_item':
-                text_lines.append(f"- {block_text}")
-            elif block_data.get('type') == 'numbered_list_item':
-                text_lines.append(f"1. {block_text}")
-            elif block_data.get('type') == 'divider':
-                text_lines.append("---")
-            elif block_text:
-                text_lines.append(block_text)
-
-        output_success({
-            "note": {
-                "id": note_id,
-                "name": note_title
-            },
-            "content": {
-                "text": "\n\n".join(text_lines)
-            }
-        })
+    output_success(format_note(note_id, page, content, format, note_project))
 
-    elif format == "summary":
-        # Get first 500 characters
-        text_lines = []
-        for block in blocks:
-            block_data = extract_block_text(block)
-            block_text = block_data.get('text', '')
-            if block_text:
-                text_lines.append(block_text)
-
-        full_text = " ".join(text_lines)
-        summary = full_text[:500] + ("..." if len(full_text) > 500 else "")
-
-        output_success({
-            "note": {
-                "id": note_id,
-                "name": note_title,
-                "project": note_project
-            },
-            "content": {
-                "summary": summary
-            }
-        })
+# ============================================================================
+# BATCH READS
+# ============================================================================
 
-    else:  # format == "full"
-        # Return full block structure
-        formatted_blocks = []
-        for block in blocks:
-            block_data = extract_block_text(block)
-            formatted_blocks.append(block_data)
-
-        output_success({
-            "note": {
-                "id": note_id,
-                "name": note_title,
-                "project": note_project,
-                "created": page.get('created_time'),
-                "updated": page.get('last_edited_time'),
-                "archived": page.get('archived', False)
-            },
-            "content": {
-                "block_count": len(formatted_blocks),
-                "blocks": formatted_blocks
-            }
-        })
+def parse_note_refs(text):
+    """
+    Parse a JSON list of notes to read (e.g. from stdin).
+
+    Items are note IDs, or objects with "id", or with "name" and an optional
+    "project_name", so the "notes" of search_notes.py and
+    list_project_notes.py output can be passed as they are.
+
+    Args:
+        text: JSON text
+
+    Returns:
+        list: {"id"} or {"name", "project_name"} dicts
+
+    Raises:
+        ValueError: If the text isn't a list of IDs or note objects
+    """
+    items = json.loads(text)
+    if isinstance(items, dict):
+        items = items.get('notes', items.get('data', {}).get('notes'))
+    if not isinstance(items, list):
+        raise ValueError("expected a JSON list of note IDs or {\"id\"}/{\"name\"} objects")
+
+    refs = []
+    for item in items:
+        if isinstance(item, str) and item.strip():
+            refs.append({"id": item.strip()})
+        elif isinstance(item, dict) and item.get('id'):
+            refs.append({"id": item['id']})
+        elif isinstance(item, dict) and item.get('name'):
+            refs.append({"name": item['name'], "project_name": item.get('project_name')})
+        else:
+            raise ValueError(f"not a note ID or note object: {json.dumps(item)[:100]}")
+    return refs
+
+def read_notes(refs, project_name=None, format="full", use_cache=True, max_workers=MAX_CONCURRENCY):
+    """
+    Read several notes in one invocation.
+
+    Names are resolved first, then each distinct note's page and block tree
+    are fetched concurrently (unchanged notes from the block cache), and
+    the notes' projects are looked up once per distinct project. A note
+    that can't be read gets an "error" entry instead of failing the batch.
+
+    Args:
+        refs: {"id"} or {"name", optional "project_name"} dicts, in output order
+        project_name: Project name that limits name searches without their own
+        format: Output format ("full", "text-only", "summary" or "outline")
+        use_cache: If False, bypass the on-disk block cache
+        max_workers: Notes fetched at once
+    """
+    if not refs:
+        output_error("No notes to read")
+
+    def resolve(ref):
+        if ref.get('id'):
+            return ref['id'], None
+        try:
+            return find_note_by_name(ref['name'], ref.get('project_name') or project_name), None
+        except NoteLookupError as e:
+            return None, e.message
+
+    def load(note_id):
+        try:
+            page = fetch_note_page(note_id)
+        except ApiError as e:
+            return None, None, f"Failed to fetch note: {str(e)}"
+        try:
+            return page, fetch_note_content(note_id, page.get('last_edited_time'), format, use_cache), None
+        except ApiError as e:
+            return page, None, f"Failed to fetch note content: {str(e)}"
+
+    resolved = map_concurrent(resolve, refs, max_workers)
+
+    # The same note asked for twice (by ID and by name, or with and without
+    # dashes in the ID) is fetched once
+    distinct = {}
+    for note_id, _ in resolved:
+        if note_id:
+            distinct.setdefault(note_key(note_id), note_id)
+    loaded = dict(zip(distinct, map_concurrent(load, list(distinct.values()), max_workers)))
+
+    project_names = {}
+    if format != "text-only":
+        project_names = get_project_names(
+            first_project_id(page) for page, _, _ in loaded.values() if page
+        )
+
+    results = []
+    failed = 0
+    for ref, (note_id, error) in zip(refs, resolved):
+        if note_id:
+            page, content, error = loaded[note_key(note_id)]
+        if error:
+            failed += 1
+            entry = {key: value for key, value in ref.items() if value}
+            if note_id:
+                entry['id'] = note_id
+            entry['error'] = error
+            results.append(entry)
+            continue
+        results.append(format_note(
+            note_id, page, content, format, project_names.get(first_project_id(page))
+        ))
+
+    if failed == len(results):
+        output_error(f"Failed to read {'the note' if failed == 1 else f'all {failed} notes'}", {"notes": results})
+
+    output_success({
+        "format": format,
+        "count": len(results),
+        "failed": failed,
+        "notes": results
+    })
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
-        description="Read the full content of a note"
+        description="Read the full content of one or more notes"
     )
-    parser.add_argument("--id", help="Note ID to read")
-    parser.add_argument("--name", help="Note name to search for")
+    parser.add_argument("--id", nargs="+", action="extend", default=[],
+                        help="Note ID(s) to read")
+    parser.add_argument("--name", nargs="+", action="extend", default=[],
+                        help="Note name(s) to search for")
+    parser.add_argument("--stdin", action="store_true",
+                        help="Read a JSON list of note IDs or {\"id\"}/{\"name\"} objects from stdin")
     parser.add_argument("--project-name", help="Optional project name for name search")
-    parser.add_argument("--format", choices=["full", "text-only", "summary"], default="full",
+    parser.add_argument("--format", choices=["full", "text-only", "summary", "outline"], default="full",
                         help="Output format")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Fetch the content from Notion even if a cached copy is current")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENCY,
+                        help=f"Notes fetched at once when reading several (default: {MAX_CONCURRENCY})")
 
     args = parser.parse_args()
 
-    if not args.id and not args.name:
-        output_error("Either --id or --name must be provided")
+    refs = [{"id": note_id} for note_id in args.id] + [{"name": name} for name in args.name]
+    if args.stdin:
+        try:
+            refs += parse_note_refs(sys.stdin.read())
+        except ValueError as e:
+            output_error(f"Invalid note list on stdin: {str(e)}")
+
+    if not refs:
+        output_error("Either --id, --name or --stdin must be provided")
+
+    # One note keeps the single-note output; several return a list
+    if len(refs) == 1 and not args.stdin:
+        read_note(
+            note_id=refs[0].get('id'),
+            note_name=refs[0].get('name'),
+            project_name=args.project_name,
+            format=args.format,
+            use_cache=not args.no_cache
+        )
 
-    read_note(
-        note_id=args.id,
-        note_name=args.name,
+    read_notes(
+        refs,
         project_name=args.project_name,
-        format=args.format
+        format=args.format,
+        use_cache=not args.no_cache,
+        max_workers=max(1, args.workers)
     )
@@ -6,15 +6,14 @@ This script searches the Notes database by title and optionally filters by proje
 """
 
 import argparse
-import requests
 import sys
-import subprocess
-import json
-import time
 from common import (
-    NOTES_DB_ID, NOTION_BASE_URL, get_headers,
+    ApiError, MIRROR_MAX_STALENESS, NOTES_DB_ID, NOTION_BASE_URL, api_request,
     build_title_filter, build_project_filter, build_archived_filter, combine_filters,
-    output_success, output_error, extract_title
+    output_success, output_error, extract_title, extract_archived
+)
+from projects import (
+    ProjectLookupError, resolve_project, choose_project, get_project_name, get_project_names
 )
 
 def get_project_id_from_name(project_name):
@@ -30,74 +29,115 @@ def get_project_id_from_name(project_name):
     Raises:
         SystemExit: If project not found or multiple matches
     """
-    import os
-
-    # Try to locate the search_projects.py script
-    script_path = "~/.claude/scripts/notion/search_projects.py"
-    if not os.path.exists(script_path):
-        fallback_paths = [
-            "/root/notion/scripts/skills/search_projects.py",
-            os.path.expanduser("~/.claude/scripts/notion/search_projects.py")
-        ]
-        for path in fallback_paths:
-            if os.path.exists(path):
-                script_path = path
-                break
-
     try:
-        result = subprocess.run(
-            ["python3", script_path,
-             "--name", project_name, "--limit", "10"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
+        project = resolve_project(project_name)
+    except ProjectLookupError as e:
+        output_error(e.message, e.details)
+
+    return project['id'], project['name']
+
+def search_notes_local(conn, query, project_id=None, project_name=None, include_archived=False, limit=20):
+    """
+    Search for notes in the local mirror.
 
-        if result.returncode != 0:
-            output_error(f"Project '{project_name}' not found")
+    Args:
+        conn: Open mirror connection
+        query: Search term for note titles
+        project_id: Optional project ID to limit search
+        project_name: Optional project name to limit search
+        include_archived: If True, include archived notes
+        limit: Maximum results to return
+    """
+    import mirror
 
-        data = json.loads(result.stdout)
-        if not data['success']:
-            output_error(f"Project '{project_name}' not found")
+    if project_name and not project_id:
+        try:
+            project = choose_project(mirror.search_projects(conn, project_name), project_name)
+        except ProjectLookupError as e:
+            output_error(e.message, e.details)
+        project_id, project_name = project['id'], project['name']
+    elif project_id and not project_name:
+        project_name = mirror.get_project_name(conn, project_id)
 
-        projects = data['data']['projects']
-        if len(projects) == 0:
-            output_error(f"No projects found matching '{project_name}'")
-        elif len(projects) > 1:
-            project_list = "\n".join([f"  - {p['name']}" for p in projects])
-            output_error(
-                f"Multiple projects match '{project_name}'. Please be more specific:",
-                {"matches": [p['name'] for p in projects]}
-            )
+    notes = [
+        {
+            "id": note['id'],
+            "name": note['name'],
+            "project_name": note['project_name'],
+            "created": note['created'],
+            "archived": note['archived']
+        }
+        for note in mirror.search_notes(conn, query, project_id, include_archived, limit)
+    ]
 
-        return projects[0]['id'], projects[0]['name']
-    except Exception as e:
-        output_error(f"Failed to search for project: {str(e)}")
+    output_success({
+        "query": query,
+        "project": project_name if project_id else None,
+        "include_archived": include_archived,
+        "count": len(notes),
+        "notes": notes,
+        "source": "mirror"
+    })
 
-def get_project_name_from_id(project_id):
+def search_note_bodies(query, project_id=None, project_name=None, include_archived=False, limit=20):
     """
-    Get project name from ID by fetching the page.
+    Full-text search over note contents using the local index.
 
-    Args:
-        project_id: Project page ID
+    Results are ranked by BM25 and include a highlighted snippet. The index
+    is built by sync_mirror.py --bodies; there is no API equivalent.
 
-    Returns:
-        str: Project name or None if not found
+    Args:
+        query: Words to search for in note titles and bodies
+        project_id: Optional project ID to limit search
+        project_name: Optional project name to limit search
+        include_archived: If True, include archived notes
+        limit: Maximum results to return
     """
-    headers = get_headers()
-    url = f"{NOTION_BASE_URL}/pages/{project_id}"
+    import mirror
 
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        if response.status_code == 200:
-            page = response.json()
-            return extract_title(page)
-    except:
-        pass
+    conn = mirror.connect()
+    if not mirror.count_indexed_bodies(conn):
+        output_error(
+            "Note contents are not indexed yet. Run: sync_mirror.py --bodies",
+            {"fts5_available": mirror.has_fts(conn)}
+        )
 
-    return None
+    if project_name and not project_id:
+        try:
+            project = choose_project(mirror.search_projects(conn, project_name), project_name)
+        except ProjectLookupError as e:
+            output_error(e.message, e.details)
+        project_id, project_name = project['id'], project['name']
+    elif project_id and not project_name:
+        project_name = mirror.get_project_name(conn, project_id)
+
+    notes = [
+        {
+            "id": note['id'],
+            "name": note['name'],
+            "project_name": note['project_name'],
+            "created": note['created'],
+            "archived": note['archived'],
+            "score": note['score'],
+            "snippet": note['snippet']
+        }
+        for note in mirror.search_bodies(conn, query, project_id, include_archived, limit)
+    ]
+
+    _, synced_at = mirror.get_sync_state(conn, NOTES_DB_ID)
+    output_success({
+        "query": query,
+        "mode": "body",
+        "project": project_name if project_id else None,
+        "include_archived": include_archived,
+        "count": len(notes),
+        "notes": notes,
+        "source": "mirror",
+        "synced_at": synced_at
+    })
 
-def search_notes(query, project_id=None, project_name=None, include_archived=False, limit=20):
+def search_notes(query, project_id=None, project_name=None, include_archived=False, limit=20,
+                 use_project_map=False, local=False, max_staleness=MIRROR_MAX_STALENESS):
     """
     Search for notes by keyword.
 
@@ -107,15 +147,24 @@ def search_notes(query, project_id=None, project_name=None, include_archived=Fal
         project_name: Optional project name to limit search
         include_archived: If True, include archived notes
         limit: Maximum results to return
+        use_project_map: If True, name projects from the persistent project map
+        local: If True, answer from the local mirror when it is fresh enough
+        max_staleness: Maximum mirror age in seconds before falling back to the API
     """
+    if local:
+        # Loaded here: only --local needs the mirror (and SQLite)
+        import mirror
+
+        conn = mirror.open_fresh_mirror(max_staleness)
+        if conn is not None:
+            search_notes_local(conn, query, project_id, project_name, include_archived, limit)
+
     # Resolve project name to ID if needed
     if project_name and not project_id:
         project_id, project_name = get_project_id_from_name(project_name)
     elif project_id and not project_name:
         # Try to get name from ID
-        project_name = get_project_name_from_id(project_id)
-
-    headers = get_headers()
+        project_name = get_project_name(project_id)
 
     # Build filters
     title_filter = build_title_filter(query)
@@ -136,20 +185,19 @@ def search_notes(query, project_id=None, project_name=None, include_archived=Fal
 
     try:
         while True:
-            response = requests.post(url, headers=headers, json=body, timeout=10)
+            response = api_request("POST", url, json=body)
             response.raise_for_status()
 
             data = response.json()
             all_results.extend(data.get('results', []))
 
-            # Check if there are more results
-            if not data.get('has_more', False):
+            # Check if there are more results we still need
+            if not data.get('has_more', False) or len(all_results) >= limit:
                 break
 
             # Set up pagination
             body['start_cursor'] = data.get('next_cursor')
-            time.sleep(0.3)  # Rate limiting
-    except requests.exceptions.RequestException as e:
+    except ApiError as e:
         output_error(f"API request failed: {str(e)}")
 
     # Limit results
@@ -165,24 +213,28 @@ def search_notes(query, project_id=None, project_name=None, include_archived=Fal
             "notes": []
         })
 
-    # Format results
-    notes = []
+    # Collect project relations, then resolve each distinct project once
+    note_project_ids = []
     for note in all_results:
-        # Try to get project relation
-        note_project = None
+        note_project_id = None
         project_prop = note.get('properties', {}).get('Project', {})
         if project_prop.get('type') == 'relation':
             relations = project_prop.get('relation', [])
             if relations:
                 note_project_id = relations[0].get('id')
-                note_project = get_project_name_from_id(note_project_id)
+        note_project_ids.append(note_project_id)
+
+    project_names = get_project_names(note_project_ids, use_map=use_project_map)
 
+    # Format results
+    notes = []
+    for note, note_project_id in zip(all_results, note_project_ids):
         notes.append({
             "id": note['id'],
             "name": extract_title(note),
-            "project_name": note_project,
+            "project_name": project_names.get(note_project_id),
             "created": note.get('created_time'),
-            "archived": note.get('archived', False)
+            "archived": extract_archived(note)
         })
 
     output_success({
@@ -198,17 +250,37 @@ if __name__ == "__main__":
         description="Search for notes by keyword"
     )
     parser.add_argument("--query", required=True, help="Search term for note titles")
+    parser.add_argument("--body", action="store_true",
+                        help="Full-text search of note contents (uses the local index, see sync_mirror.py --bodies)")
     parser.add_argument("--project-id", help="Optional project ID to limit search")
     parser.add_argument("--project-name", help="Optional project name to limit search")
     parser.add_argument("--include-archived", action="store_true", help="Include archived notes")
     parser.add_argument("--limit", type=int, default=20, help="Maximum results")
+    parser.add_argument("--project-map", action="store_true",
+                        help="Name projects from the cached project map (one scan per day)")
+    parser.add_argument("--local", action="store_true",
+                        help="Search the local mirror (see sync_mirror.py), falling back to the API when stale")
+    parser.add_argument("--max-staleness", type=int, default=MIRROR_MAX_STALENESS,
+                        help="Maximum mirror age in seconds for --local")
 
     args = parser.parse_args()
 
+    if args.body:
+        search_note_bodies(
+            query=args.query,
+            project_id=args.project_id,
+            project_name=args.project_name,
+            include_archived=args.include_archived,
+            limit=args.limit
+        )
+
     search_notes(
         query=args.query,
         project_id=args.project_id,
         project_name=args.project_name,
         include_archived=args.include_archived,
-        limit=args.limit
+        limit=args.limit,
+        use_project_map=args.project_map,
+        local=args.local,
+        max_staleness=args.max_staleness
     )
@@ -6,24 +6,13 @@ This script searches the Projects database and returns matching project records.
 """
 
 import argparse
-import requests
-import sys
-import time
-from common import (
-    PROJECTS_DB_ID, NOTION_BASE_URL, get_headers,
-    build_title_filter, build_archived_filter, combine_filters,
-    output_success, output_error, extract_title
+from common import MIRROR_MAX_STALENESS, output_success, output_error
+from projects import (
+    ProjectLookupError, query_projects, exact_matches, format_project
 )
 
-def extract_status(page):
-    """Extract status from a project page."""
-    status_prop = page.get('properties', {}).get('Status', {})
-    if status_prop.get('type') == 'status':
-        status_obj = status_prop.get('status', {})
-        return status_obj.get('name', 'Unknown')
-    return None
-
-def search_projects(name, exact_match=False, include_archived=False, limit=10):
+def search_projects(name, exact_match=False, include_archived=False, limit=10,
+                    local=False, max_staleness=MIRROR_MAX_STALENESS):
     """
     Search for projects by name.
 
@@ -32,67 +21,56 @@ def search_projects(name, exact_match=False, include_archived=False, limit=10):
         exact_match: If True, require exact match
         include_archived: If True, include archived projects
         limit: Maximum results to return
+        local: If True, answer from the local mirror when it is fresh enough
+        max_staleness: Maximum mirror age in seconds before falling back to the API
 
     Returns:
         dict: Search results with project list
     """
-    headers = get_headers()
-
-    # Build filters
-    title_filter = build_title_filter(name)
-    archived_filter = build_archived_filter(include_archived)
-    combined_filter = combine_filters(title_filter, archived_filter)
-
-    # Build request body
-    body = {
-        "page_size": min(limit, 100)
-    }
-    if combined_filter:
-        body["filter"] = combined_filter
+    conn = None
+    if local:
+        # Loaded here: only --local needs the mirror (and SQLite)
+        import mirror
 
-    # Execute query
-    url = f"{NOTION_BASE_URL}/databases/{PROJECTS_DB_ID}/query"
+        conn = mirror.open_fresh_mirror(max_staleness)
 
-    try:
-        response = requests.post(url, headers=headers, json=body, timeout=10)
-        response.raise_for_status()
-    except requests.exceptions.RequestException as e:
-        output_error(f"API request failed: {str(e)}")
+    if conn is not None:
+        projects = mirror.search_projects(conn, name, include_archived, limit)
+        if exact_match:
+            projects = [p for p in projects if p['name'].lower() == name.lower()]
+    else:
+        try:
+            results = query_projects(name, include_archived, limit)
+        except ProjectLookupError as e:
+            output_error(e.message, e.details)
 
-    data = response.json()
-    results = data.get('results', [])
+        # If exact match requested, filter results
+        if exact_match:
+            results = exact_matches(results, name)
 
-    # If exact match requested, filter results
-    if exact_match:
-        results = [r for r in results if extract_title(r).lower() == name.lower()]
+        projects = [format_project(project) for project in results]
 
     # Limit results
-    results = results[:limit]
+    projects = projects[:limit]
 
     # If no results found
-    if not results:
+    if not projects:
         output_error(
             f"No projects found matching '{name}'",
             {"query": name, "exact_match": exact_match}
         )
 
-    # Format results
-    projects = []
-    for project in results:
-        projects.append({
-            "id": project['id'],
-            "name": extract_title(project),
-            "status": extract_status(project),
-            "archived": project.get('archived', False)
-        })
-
-    output_success({
+    result = {
         "query": name,
         "exact_match": exact_match,
         "include_archived": include_archived,
         "count": len(projects),
         "projects": projects
-    })
+    }
+    if conn is not None:
+        result["source"] = "mirror"
+
+    output_success(result)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(
@@ -102,6 +80,10 @@ if __name__ == "__main__":
     parser.add_argument("--exact", action="store_true", help="Require exact match")
     parser.add_argument("--include-archived", action="store_true", help="Include archived projects")
     parser.add_argument("--limit", type=int, default=10, help="Maximum results")
+    parser.add_argument("--local", action="store_true",
+                        help="Search the local mirror (see sync_mirror.py), falling back to the API when stale")
+    parser.add_argument("--max-staleness", type=int, default=MIRROR_MAX_STALENESS,
+                        help="Maximum mirror age in seconds for --local")
 
     args = parser.parse_args()
 
@@ -109,5 +91,7 @@ if __name__ == "__main__":
         name=args.name,
         exact_match=args.exact,
         include_archived=args.include_archived,
-        limit=args.limit
+        limit=args.limit,
+        local=args.local,
+        max_staleness=args.max_staleness
     )
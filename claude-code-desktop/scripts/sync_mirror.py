@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Sync the local SQLite mirror of the Notes and Projects databases.
+
+The first run pulls every page; later runs only pull pages edited since the
+previous sync. Run it from cron (e.g. every 5 minutes) so that --local
+searches stay fresh. With --bodies, note contents are also indexed for
+search_notes.py --body.
+"""
+
+import argparse
+import sqlite3
+from common import ApiError, output_success, output_error
+import mirror
+
+def sync_mirror(full=False, bodies=False):
+    """
+    Sync the mirror and report what was pulled.
+
+    Args:
+        full: If True, rebuild the mirror from scratch
+        bodies: If True, also update the full-text index of note bodies
+    """
+    try:
+        result = mirror.sync(full=full, bodies=bodies)
+    except ApiError as e:
+        output_error(f"API request failed: {str(e)}")
+    except sqlite3.OperationalError as e:
+        output_error(f"Local mirror error: {str(e)}")
+
+    output_success(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Sync the local mirror of the Notes and Projects databases"
+    )
+    parser.add_argument("--full", action="store_true",
+                        help="Rebuild the mirror (also drops deleted pages)")
+    parser.add_argument("--bodies", action="store_true",
+                        help="Also index note contents for full-text search (needs SQLite FTS5)")
+
+    args = parser.parse_args()
+
+    sync_mirror(full=args.full, bodies=args.bodies)
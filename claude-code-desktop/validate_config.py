@@ -87,6 +87,12 @@ class ConfigValidator:
             "create_note.py",
             "edit_note.py",
             "search_projects.py",
+            "projects.py",
+            "notes.py",
+            "blocks.py",
+            "block_cache.py",
+            "markdown_blocks.py",
+            "mirror.py",
         ]
 
         missing = []
@@ -155,7 +161,7 @@ class ConfigValidator:
 
     def check_python_imports(self):
         """Check if required Python libraries are available."""
-        required_modules = ["requests", "json", "sys"]
+        required_modules = ["json", "sys", "sqlite3"]
 
         for module in required_modules:
             try:
@@ -164,6 +170,15 @@ class ConfigValidator:
                 self.warnings.append(f"Missing Python module: {module}")
                 return False
 
+        # Optional: without it the scripts use the standard library transport
+        try:
+            __import__("requests")
+        except ImportError:
+            self.warnings.append(
+                "Python 'requests' library not found; scripts will use the built-in "
+                "urllib transport (NOTION_SKILLS_TRANSPORT=urllib)"
+            )
+
         return True
 
     def check_api_connectivity(self):